@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Load harness for the QR/kiosk check-in endpoint.
+
+Builds a throwaway test database, creates a session and N residents, then
+drives POST /api/attendance/check-in/ for every resident (plus a share of
+repeat scans) and reports sustained check-ins/sec and latency percentiles for
+the buffered write path, followed by the flush throughput into
+AttendanceRecord.
+
+Usage:
+    python scripts/checkin_load_test.py --residents 500 --repeat-ratio 0.2
+
+Point DATABASE_URL / the DB_* settings at PostgreSQL to measure the UNLOGGED
+buffer; the default SQLite run measures the request path only.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import django
+
+if __name__ == "__main__":
+    project_root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(project_root))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sims_project.settings")
+    django.setup()
+
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+
+def run(residents: int, repeat_ratio: float) -> None:
+    from sims.attendance.checkin import checkin_token, flush_checkins
+    from sims.attendance.models import AttendanceRecord, Session
+    from sims.users.models import User
+
+    users = User.objects.bulk_create(
+        User(username=f"load{idx}", role="pg", specialty="surgery", year="1")
+        for idx in range(residents)
+    )
+    session = Session.objects.create(
+        title="Load test grand round",
+        date=date.today(),
+        start_time="00:00",
+        end_time="23:59",
+        status="ongoing",
+    )
+    token = checkin_token(session)
+    url = reverse("attendance_api:checkin")
+
+    scans = users + random.sample(users, int(len(users) * repeat_ratio))
+    random.shuffle(scans)
+    client = APIClient()
+    latencies = []
+    started = time.perf_counter()
+    for user in scans:
+        client.force_authenticate(user)
+        tick = time.perf_counter()
+        response = client.post(url, {"token": token})
+        latencies.append(time.perf_counter() - tick)
+        if response.status_code != 202:
+            raise SystemExit(f"Unexpected {response.status_code}: {response.data}")
+    elapsed = time.perf_counter() - started
+
+    tick = time.perf_counter()
+    flushed = flush_checkins()
+    flush_elapsed = time.perf_counter() - tick
+
+    latencies.sort()
+    print(f"Check-ins:  {len(scans)} requests ({len(scans) - len(users)} repeats)")
+    print(f"Throughput: {len(scans) / elapsed:,.0f} check-ins/sec over {elapsed:.2f}s")
+    print(
+        "Latency:    p50 {:.1f}ms, p95 {:.1f}ms, max {:.1f}ms".format(
+            statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            latencies[-1] * 1000,
+        )
+    )
+    print(
+        f"Flush:      {flushed} buffered rows in {flush_elapsed:.2f}s "
+        f"({flushed / max(flush_elapsed, 1e-9):,.0f} rows/sec)"
+    )
+    print(f"Records:    {AttendanceRecord.objects.filter(session=session).count()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--residents", type=int, default=500)
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        run(args.residents, args.repeat_ratio)
+    finally:
+        runner.teardown_databases(old_config)
+
+
+if __name__ == "__main__":
+    main()
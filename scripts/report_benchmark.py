@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark for logbook summary report rendering.
+
+Builds a throwaway test database, bulk-loads N logbook entries and renders the
+logbook summary through ReportService, reporting wall time, peak Python heap
+and output size for each format. The heap is measured on a second, traced run
+because tracemalloc itself slows rendering several-fold.
+
+Usage:
+    python scripts/report_benchmark.py --rows 10000 100000 --formats pdf xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import django
+
+if __name__ == "__main__":
+    project_root = Path(__file__).resolve().parent.parent
+    sys.path.insert(0, str(project_root))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sims_project.settings")
+    django.setup()
+
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+
+def load_entries(count: int):
+    from sims.logbook.models import LogbookEntry
+    from sims.users.models import User
+
+    admin = User.objects.create_user(username="bench-admin", role="admin")
+    supervisor = User.objects.create_user(
+        username="bench-sup", role="supervisor", specialty="surgery", first_name="Sam"
+    )
+    pg = User.objects.create_user(
+        username="bench-pg",
+        role="pg",
+        specialty="surgery",
+        year="1",
+        supervisor=supervisor,
+        first_name="Pat",
+        last_name="Resident",
+    )
+    start = date(2024, 1, 1)
+    batch = []
+    for index in range(count):
+        batch.append(
+            LogbookEntry(
+                pg=pg,
+                supervisor=supervisor,
+                case_title=f"Benchmark case {index}",
+                date=start + timedelta(days=index % 365),
+                location_of_activity="Ward",
+                patient_history_summary="History",
+                management_action="Action",
+                topic_subtopic="Topic",
+                status="approved",
+            )
+        )
+        if len(batch) == 5000:
+            LogbookEntry.objects.bulk_create(batch)
+            batch = []
+    LogbookEntry.objects.bulk_create(batch)
+    return admin
+
+
+def run(rows: list, formats: list) -> None:
+    from sims.reports.models import ReportTemplate
+    from sims.reports.services import ReportService
+    from sims.users.models import User
+
+    template, _ = ReportTemplate.objects.get_or_create(
+        slug="logbook-summary",
+        defaults={"name": "Logbook Summary", "template_name": "reports/logbook_summary.html"},
+    )
+    for count in rows:
+        admin = load_entries(count)
+        for fmt in formats:
+            tick = time.perf_counter()
+            report = ReportService(admin).generate(template, {}, fmt)
+            elapsed = time.perf_counter() - tick
+            report.discard()
+
+            tracemalloc.start()
+            report = ReportService(admin).generate(template, {}, fmt)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{count:>7} rows  {fmt:<4}  {elapsed:7.2f}s  "
+                f"peak {peak / 2**20:7.1f} MiB  output {report.size / 2**20:6.1f} MiB"
+            )
+            report.discard()
+        User.objects.filter(username__startswith="bench-").delete()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--formats", nargs="+", default=["pdf"])
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        run(args.rows, args.formats)
+    finally:
+        runner.teardown_databases(old_config)
+
+
+if __name__ == "__main__":
+    main()
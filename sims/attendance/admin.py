@@ -9,7 +9,18 @@ from .models import AttendanceRecord, EligibilitySummary, Session
 class SessionAdmin(admin.ModelAdmin):
     """Admin for attendance sessions."""
 
-    list_display = ["title", "session_type", "date", "start_time", "status", "rotation"]
+    list_display = [
+        "title",
+        "session_type",
+        "date",
+        "start_time",
+        "status",
+        "rotation",
+        "present_count",
+        "late_count",
+        "absent_count",
+        "excused_count",
+    ]
     list_filter = ["session_type", "status", "date"]
     search_fields = ["title", "module_name", "location"]
     date_hierarchy = "date"
@@ -2,7 +2,9 @@
 
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import MultiPartParser
@@ -10,7 +12,10 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .services import calculate_attendance_summary, process_csv_upload
+from .checkin import checkin_token, enqueue_checkin, session_id_for_token
+from .counters import COUNTER_FIELDS, session_counts, session_roster
+from .models import AttendanceRecord, Session
+from .services import calculate_attendance_summary, mark_attendance, process_csv_upload
 
 User = get_user_model()
 
@@ -148,4 +153,142 @@ class AttendanceSummaryView(APIView):
         return Response(summary)
 
 
-__all__ = ["BulkAttendanceUploadView", "AttendanceSummaryView"]
+def _can_mark(user, session: Session) -> bool:
+    return getattr(user, "role", None) in ["supervisor", "admin"] or (
+        session.instructor_id is not None and session.instructor_id == user.id
+    )
+
+
+class SessionRosterView(APIView):
+    """
+    GET /api/attendance/sessions/<pk>/roster/
+
+    Live per-status counts and the ``user_id -> status`` roster for a session.
+
+    Counts come from the session's denormalised counters and the roster from
+    the short-lived cache, so polling during check-in never recounts records.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        session = get_object_or_404(Session, pk=pk)
+        if not _can_mark(request.user, session):
+            raise PermissionDenied("Only supervisors, admins and the instructor can view rosters")
+
+        roster = session_roster(session.pk)
+        return Response(
+            {
+                "session_id": session.pk,
+                "title": session.title,
+                "date": session.date.isoformat(),
+                "status": session.status,
+                "counts": session_counts(session),
+                "roster": [
+                    {"user_id": user_id, "status": mark} for user_id, mark in sorted(roster.items())
+                ],
+            }
+        )
+
+
+class MarkAttendanceView(APIView):
+    """
+    POST /api/attendance/sessions/<pk>/mark/
+
+    Mark one user's attendance in a session.
+
+    Body: ``user_id``, ``status`` (present/absent/late/excused), optional ``remarks``.
+    Responds with whether anything changed and the session's updated counts.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request, pk: int) -> Response:
+        session = get_object_or_404(Session, pk=pk)
+        if not _can_mark(request.user, session):
+            raise PermissionDenied(
+                "Only supervisors, admins and the instructor can mark attendance"
+            )
+
+        try:
+            user_id = int(request.data.get("user_id"))
+        except (TypeError, ValueError):
+            raise ValidationError({"user_id": "A valid user_id is required"})
+
+        status_value = str(request.data.get("status", "")).strip().lower()
+        valid_statuses = [choice for choice, _ in AttendanceRecord.STATUS_CHOICES]
+        if status_value not in valid_statuses:
+            raise ValidationError({"status": f"Status must be one of: {', '.join(valid_statuses)}"})
+
+        # Users already on the roster were validated when first marked.
+        if user_id not in session_roster(session.pk):
+            if not User.objects.filter(pk=user_id).exists():
+                raise ValidationError({"user_id": "User not found"})
+
+        changed = mark_attendance(
+            session, user_id, status_value, request.user, remarks=request.data.get("remarks")
+        )
+        if changed:
+            session.refresh_from_db(fields=COUNTER_FIELDS)
+        return Response({"changed": changed, "counts": session_counts(session)})
+
+
+class CheckInTokenView(APIView):
+    """
+    GET /api/attendance/sessions/<pk>/check-in-token/
+
+    Short-lived signed token for the session's QR code or kiosk screen.
+
+    Clients should fetch a fresh token before ``expires_in`` seconds elapse.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        session = get_object_or_404(Session, pk=pk)
+        if not _can_mark(request.user, session):
+            raise PermissionDenied(
+                "Only supervisors, admins and the instructor can display check-in codes"
+            )
+        if session.status in ["completed", "cancelled"]:
+            raise ValidationError({"session": f"Session is {session.status}"})
+
+        return Response(
+            {
+                "session_id": session.pk,
+                "token": checkin_token(session),
+                "expires_in": settings.ATTENDANCE_CHECKIN_TOKEN_SECONDS,
+            }
+        )
+
+
+class CheckInView(APIView):
+    """
+    POST /api/attendance/check-in/
+
+    Self check-in by scanning a session's QR code.
+
+    Body: ``token`` from the check-in-token endpoint. The check-in is buffered
+    and written to attendance records by the ``flush_checkins`` task; repeat
+    scans for the same session are accepted and ignored.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        session_id = session_id_for_token(str(request.data.get("token", "")))
+        if session_id is None:
+            raise ValidationError({"token": "Check-in code is invalid or has expired"})
+
+        enqueue_checkin(request.user.id, session_id)
+        return Response({"session_id": session_id, "queued": True}, status=status.HTTP_202_ACCEPTED)
+
+
+__all__ = [
+    "AttendanceSummaryView",
+    "BulkAttendanceUploadView",
+    "CheckInTokenView",
+    "CheckInView",
+    "MarkAttendanceView",
+    "SessionRosterView",
+]
@@ -5,3 +5,7 @@ class AttendanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sims.attendance"
     verbose_name = "Attendance & Eligibility"
+
+    def ready(self):
+        # Session counter upkeep and the cached eligibility threshold.
+        from . import signals  # noqa: F401
@@ -0,0 +1,138 @@
+"""QR/kiosk check-in: signed session tokens, a write buffer and its flusher."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import refresh_session_counts
+from .models import AttendanceRecord, PendingCheckIn, Session
+
+TOKEN_SALT = "sims.attendance.checkin"
+FLUSH_BATCH_SIZE = 5000
+
+
+def checkin_token(session: Session) -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(session.pk))
+
+
+def session_id_for_token(token: str) -> Optional[int]:
+    """Session id from a signed check-in token, or ``None`` if it is forged or expired."""
+
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.ATTENDANCE_CHECKIN_TOKEN_SECONDS
+        )
+    except signing.BadSignature:
+        return None
+    return int(value)
+
+
+def enqueue_checkin(user_id: int, session_id: int, checked_in_at: Optional[datetime] = None):
+    """
+    Buffer one check-in with a single conflict-ignoring INSERT.
+
+    The first scan for a (user, session) pair wins; later scans are no-ops both
+    here and, once flushed, against the attendance record itself.
+    """
+    PendingCheckIn.objects.bulk_create(
+        [
+            PendingCheckIn(
+                user_id=user_id,
+                session_id=session_id,
+                checked_in_at=checked_in_at or timezone.now(),
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _late_after(sessions: Dict[int, Tuple]) -> Dict[int, datetime]:
+    grace = timedelta(minutes=settings.ATTENDANCE_LATE_AFTER_MINUTES)
+    tz = timezone.get_current_timezone()
+    return {
+        pk: timezone.make_aware(datetime.combine(day, start), tz) + grace
+        for pk, (day, start) in sessions.items()
+    }
+
+
+def _flush_batch(batch_size: int) -> int:
+    with transaction.atomic():
+        pending = list(
+            PendingCheckIn.objects.select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", "user_id", "session_id", "checked_in_at")[:batch_size]
+        )
+        if not pending:
+            return 0
+
+        session_ids = {session_id for _, _, session_id, _ in pending}
+        late_after = _late_after(
+            {
+                pk: (day, start)
+                for pk, day, start in Session.objects.filter(pk__in=session_ids).values_list(
+                    "pk", "date", "start_time"
+                )
+            }
+        )
+        # Someone already checked in (or marked with a check-in time) keeps that record.
+        checked_in = set(
+            AttendanceRecord.objects.filter(
+                session_id__in=session_ids,
+                user_id__in={user_id for _, user_id, _, _ in pending},
+                check_in_time__isnull=False,
+            ).values_list("user_id", "session_id")
+        )
+
+        records: List[AttendanceRecord] = []
+        for _, user_id, session_id, checked_in_at in pending:
+            if (user_id, session_id) in checked_in or session_id not in late_after:
+                continue
+            records.append(
+                AttendanceRecord(
+                    user_id=user_id,
+                    session_id=session_id,
+                    status="late" if checked_in_at > late_after[session_id] else "present",
+                    check_in_time=checked_in_at,
+                    recorded_by_id=user_id,
+                )
+            )
+        AttendanceRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["user", "session"],
+            update_fields=["status", "check_in_time", "recorded_by", "updated_at"],
+        )
+        refresh_session_counts(session_ids)
+        PendingCheckIn.objects.filter(pk__in=[pk for pk, _, _, _ in pending]).delete()
+    return len(pending)
+
+
+def flush_checkins(batch_size: int = FLUSH_BATCH_SIZE) -> int:
+    """
+    Drain the buffer into ``AttendanceRecord`` a batch at a time; returns rows drained.
+
+    Each batch is locked with ``SKIP LOCKED`` so concurrent flushers split the
+    work, and costs three reads, one upsert, a recount of the touched sessions
+    and one DELETE.
+    """
+    drained = 0
+    while True:
+        flushed = _flush_batch(batch_size)
+        drained += flushed
+        if flushed < batch_size:
+            return drained
+
+
+__all__ = [
+    "FLUSH_BATCH_SIZE",
+    "checkin_token",
+    "enqueue_checkin",
+    "flush_checkins",
+    "session_id_for_token",
+]
@@ -0,0 +1,123 @@
+"""Maintain the per-status counters on ``Session`` and the cached session roster."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from sims.attendance.models import AttendanceRecord, Session
+
+COUNTER_FIELDS = list(Session.COUNTER_FIELDS)
+# Changes through AttendanceRecord.save()/delete() and recounts drop the cached
+# roster once committed, so the timeout only bounds drift from raw SQL edits.
+ROSTER_CACHE_SECONDS = 5 * 60
+ROSTER_CACHE_KEY = "attendance:roster:{session_id}"
+
+State = Optional[Tuple[int, str]]
+
+
+def counter_field(status: str) -> str:
+    return f"{status}_count"
+
+
+def session_counts(session: Session) -> Dict[str, int]:
+    return {
+        status: getattr(session, counter_field(status))
+        for status, _ in AttendanceRecord.STATUS_CHOICES
+    }
+
+
+def record_changed(user_id: int, old: State, new: State) -> None:
+    """
+    Move one record between counters with ``F()`` updates and drop the roster.
+
+    ``old``/``new`` are ``(session_id, status)`` before and after the change;
+    ``None`` means the record did not exist / no longer exists. Cached rosters
+    are dropped after commit rather than patched, so a rolled-back change or a
+    concurrent tap can never leave a stale roster behind.
+    """
+    if old == new:
+        return
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    if old:
+        deltas[old[0]][counter_field(old[1])] -= 1
+    if new:
+        deltas[new[0]][counter_field(new[1])] += 1
+
+    for session_id, fields in deltas.items():
+        # Saves move counters from the row-locked stored status; deletes use the
+        # loaded one, so a decrement is floored at zero and a recount repairs it.
+        changes = {
+            name: Greatest(F(name) + delta, 0) if delta < 0 else F(name) + delta
+            for name, delta in fields.items()
+            if delta
+        }
+        if changes:
+            Session.objects.filter(pk=session_id).update(**changes)
+
+    session_ids = list(deltas)
+    transaction.on_commit(lambda: invalidate_rosters(session_ids))
+
+
+def refresh_session_counts(session_ids: Iterable[int]) -> int:
+    """Recount the given sessions from their records with two queries in total."""
+
+    session_ids = sorted({pk for pk in session_ids if pk})
+    if not session_ids:
+        return 0
+    rows = (
+        AttendanceRecord.objects.filter(session_id__in=session_ids)
+        .values_list("session_id", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    counts: Dict[int, Dict[str, int]] = defaultdict(dict)
+    for session_id, status, count in rows:
+        counts[session_id][counter_field(status)] = count
+
+    sessions = [
+        Session(pk=pk, **{name: counts[pk].get(name, 0) for name in COUNTER_FIELDS})
+        for pk in session_ids
+    ]
+    # bulk_update leaves updated_at alone, so a recount is not mistaken for an edit.
+    Session.objects.bulk_update(sessions, COUNTER_FIELDS, batch_size=500)
+    invalidate_rosters(session_ids)
+    return len(sessions)
+
+
+def _roster_key(session_id: int) -> str:
+    return ROSTER_CACHE_KEY.format(session_id=session_id)
+
+
+def session_roster(session_id: int) -> Dict[int, str]:
+    """``{user_id: status}`` for everyone marked in the session, cached between taps."""
+
+    key = _roster_key(session_id)
+    roster = cache.get(key)
+    if roster is None:
+        roster = dict(
+            AttendanceRecord.objects.filter(session_id=session_id).values_list("user_id", "status")
+        )
+        cache.set(key, roster, ROSTER_CACHE_SECONDS)
+    return roster
+
+
+def invalidate_rosters(session_ids: Iterable[int]) -> None:
+    cache.delete_many([_roster_key(pk) for pk in session_ids])
+
+
+__all__ = [
+    "COUNTER_FIELDS",
+    "ROSTER_CACHE_SECONDS",
+    "counter_field",
+    "invalidate_rosters",
+    "record_changed",
+    "refresh_session_counts",
+    "session_counts",
+    "session_roster",
+]
@@ -0,0 +1,197 @@
+"""Cohort eligibility: attendance counts for many users from one grouped query."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+
+from .models import AttendanceRecord, EligibilitySummary, Session
+
+User = get_user_model()
+
+COUNTED_SESSION_STATUSES = ("completed", "ongoing")
+ATTENDED_STATUSES = ("present", "late")
+SUMMARY_BATCH_SIZE = 1000
+SUMMARY_UPDATE_FIELDS = [
+    "total_sessions",
+    "attended_sessions",
+    "percentage_present",
+    "is_eligible",
+    "threshold_percentage",
+    "updated_at",
+]
+
+
+@dataclass(frozen=True)
+class AttendanceCounts:
+    total_sessions: int
+    attended: int = 0
+    present: int = 0
+    late: int = 0
+    absent: int = 0
+    excused: int = 0
+
+    @property
+    def percentage_present(self) -> float:
+        if not self.total_sessions:
+            return 0.0
+        return round((self.attended / self.total_sessions) * 100, 2)
+
+
+@dataclass
+class RecomputeResult:
+    users: int = 0
+    eligible: int = 0
+    total_sessions: int = 0
+
+
+@lru_cache(maxsize=None)
+def get_attendance_threshold() -> float:
+    """``settings.ATTENDANCE_THRESHOLD`` (75% by default), read once per process."""
+    return float(getattr(settings, "ATTENDANCE_THRESHOLD", 75.0))
+
+
+def latest_eligibility(
+    user_ids: Iterable[int], on_or_before: date
+) -> Dict[int, Tuple[bool, float]]:
+    """
+    Latest ``(is_eligible, percentage_present)`` per user, in one query.
+
+    Uses each user's most recent summary ending on or before ``on_or_before``;
+    users without one are absent from the mapping.
+    """
+    rows = (
+        EligibilitySummary.objects.filter(user_id__in=user_ids, end_date__lte=on_or_before)
+        .order_by("user_id", "-end_date", "-pk")
+        .values_list("user_id", "is_eligible", "percentage_present")
+    )
+    latest: Dict[int, Tuple[bool, float]] = {}
+    for user_id, is_eligible, percentage in rows:
+        latest.setdefault(user_id, (is_eligible, percentage))
+    return latest
+
+
+def counted_sessions(start_date: date, end_date: date):
+    return Session.objects.filter(
+        date__gte=start_date, date__lte=end_date, status__in=COUNTED_SESSION_STATUSES
+    )
+
+
+def attendance_counts(
+    start_date: date, end_date: date, user_ids: Optional[Iterable[int]] = None
+) -> Tuple[int, Dict[int, AttendanceCounts]]:
+    """
+    Session total for the range and per-user status counts.
+
+    ``user_ids`` may be a list or a ``values("pk")`` queryset, which is sent
+    as a subquery rather than an ``IN`` list.
+
+    The per-user counts come from a single ``GROUP BY user_id`` over
+    ``AttendanceRecord`` joined to ``Session``; users without records are absent
+    from the mapping.
+    """
+    total_sessions = counted_sessions(start_date, end_date).count()
+    records = AttendanceRecord.objects.filter(
+        session__date__gte=start_date,
+        session__date__lte=end_date,
+        session__status__in=COUNTED_SESSION_STATUSES,
+    )
+    if user_ids is not None:
+        records = records.filter(user_id__in=user_ids)
+    rows = (
+        records.values("user_id")
+        .annotate(
+            attended=Count("id", filter=Q(status__in=ATTENDED_STATUSES)),
+            present=Count("id", filter=Q(status="present")),
+            late=Count("id", filter=Q(status="late")),
+            absent=Count("id", filter=Q(status="absent")),
+            excused=Count("id", filter=Q(status="excused")),
+        )
+        .order_by()
+    )
+    counts = {
+        row.pop("user_id"): AttendanceCounts(total_sessions=total_sessions, **row) for row in rows
+    }
+    return total_sessions, counts
+
+
+def default_cohort():
+    return User.objects.filter(role="pg", is_active=True)
+
+
+def previous_month(today: Optional[date] = None) -> Tuple[date, date]:
+    """First and last day of the calendar month before ``today``."""
+
+    today = today or date.today()
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+
+def recompute_eligibility(
+    start_date: date,
+    end_date: date,
+    period: str = "monthly",
+    users=None,
+    threshold: Optional[float] = None,
+    batch_size: int = SUMMARY_BATCH_SIZE,
+) -> RecomputeResult:
+    """
+    Upsert ``EligibilitySummary`` rows for every user in ``users`` (active PGs by default).
+
+    Users with no attendance records still get a summary with zero attended.
+    """
+    if threshold is None:
+        threshold = get_attendance_threshold()
+    cohort = default_cohort() if users is None else users
+    user_ids = list(cohort.values_list("pk", flat=True))
+    total_sessions, counts = attendance_counts(start_date, end_date, cohort.values("pk"))
+    empty = AttendanceCounts(total_sessions=total_sessions)
+
+    result = RecomputeResult(users=len(user_ids), total_sessions=total_sessions)
+    summaries = []
+    for user_id in user_ids:
+        user_counts = counts.get(user_id, empty)
+        percentage = user_counts.percentage_present
+        is_eligible = percentage >= threshold
+        result.eligible += is_eligible
+        summaries.append(
+            EligibilitySummary(
+                user_id=user_id,
+                period=period,
+                start_date=start_date,
+                end_date=end_date,
+                total_sessions=total_sessions,
+                attended_sessions=user_counts.attended,
+                percentage_present=percentage,
+                is_eligible=is_eligible,
+                threshold_percentage=threshold,
+            )
+        )
+
+    EligibilitySummary.objects.bulk_create(
+        summaries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user", "period", "start_date", "end_date"],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+    return result
+
+
+__all__ = [
+    "AttendanceCounts",
+    "RecomputeResult",
+    "attendance_counts",
+    "counted_sessions",
+    "default_cohort",
+    "get_attendance_threshold",
+    "latest_eligibility",
+    "previous_month",
+    "recompute_eligibility",
+]
@@ -0,0 +1,192 @@
+"""Batched attendance ingest: resolve ids per batch, then upsert with one statement."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import refresh_session_counts
+from .models import AttendanceRecord, Session
+
+User = get_user_model()
+
+INGEST_BATCH_SIZE = 2000
+VALID_STATUSES = [choice for choice, _ in AttendanceRecord.STATUS_CHOICES]
+UPSERT_FIELDS = ["status", "check_in_time", "remarks", "recorded_by", "updated_at"]
+
+
+@dataclass
+class IngestResult:
+    success_count: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict:
+        messages = [message for _, message in sorted(self.errors)]
+        return {
+            "success": not messages,
+            "success_count": self.success_count,
+            "error_count": len(messages),
+            "errors": messages,
+        }
+
+
+class IngestAborted(Exception):
+    """An upload failed part-way; ``result`` holds the batches that already committed."""
+
+    def __init__(self, result: IngestResult):
+        super().__init__(result.errors[-1][1])
+        self.result = result
+
+
+def _parse_row(row_num: int, row: dict, errors: List[Tuple[int, str]]) -> Optional[dict]:
+    """Validate one CSV row without touching the database."""
+
+    try:
+        session_id = int(row["session_id"])
+        user_id = int(row["user_id"])
+    except ValueError as exc:
+        errors.append((row_num, f"Row {row_num}: {exc}"))
+        return None
+
+    status = row["status"].strip().lower()
+    if status not in VALID_STATUSES:
+        errors.append(
+            (
+                row_num,
+                f"Row {row_num}: Invalid status '{status}'. "
+                f"Must be one of: {', '.join(VALID_STATUSES)}",
+            )
+        )
+        return None
+
+    check_in_time = None
+    if row.get("check_in_time"):
+        try:
+            check_in_time = datetime.fromisoformat(row["check_in_time"])
+        except ValueError:
+            errors.append(
+                (
+                    row_num,
+                    f"Row {row_num}: Invalid check_in_time format. "
+                    "Use ISO format (YYYY-MM-DD HH:MM:SS)",
+                )
+            )
+            return None
+        if timezone.is_naive(check_in_time):
+            check_in_time = timezone.make_aware(check_in_time)
+
+    return {
+        "row_num": row_num,
+        "session_id": session_id,
+        "user_id": user_id,
+        "status": status,
+        "check_in_time": check_in_time,
+        "remarks": row.get("remarks", ""),
+    }
+
+
+def _resolve(model, wanted: Set[int], known: Set[int], missing: Set[int]) -> None:
+    """Sort ``wanted`` ids into ``known``/``missing`` with one query for the unseen ones."""
+
+    unseen = wanted - known - missing
+    if not unseen:
+        return
+    found = set(model.objects.filter(pk__in=unseen).values_list("pk", flat=True))
+    known.update(found)
+    missing.update(unseen - found)
+
+
+def ingest_attendance_rows(
+    rows: Iterable[dict], uploaded_by, batch_size: int = INGEST_BATCH_SIZE
+) -> IngestResult:
+    """
+    Upsert attendance rows in batches.
+
+    Each batch costs two lookups (only for ids not seen in earlier batches),
+    one ``INSERT ... ON CONFLICT (user_id, session_id) DO UPDATE`` and a
+    recount of the sessions it touched, and commits on its own so the table is
+    never held for the whole upload. ``success_count`` only counts committed
+    rows; if a batch fails, :class:`IngestAborted` carries that partial result.
+    """
+    result = IngestResult()
+    sessions: Set[int] = set()
+    users: Set[int] = set()
+    missing_sessions: Set[int] = set()
+    missing_users: Set[int] = set()
+
+    batch: List[dict] = []
+
+    def flush() -> None:
+        _resolve(Session, {item["session_id"] for item in batch}, sessions, missing_sessions)
+        _resolve(User, {item["user_id"] for item in batch}, users, missing_users)
+
+        # Later rows for the same (user, session) win, as repeated
+        # update_or_create calls would; one INSERT may not touch a row twice.
+        records: Dict[Tuple[int, int], AttendanceRecord] = {}
+        accepted = 0
+        for item in batch:
+            row_num = item["row_num"]
+            if item["session_id"] in missing_sessions:
+                result.errors.append(
+                    (row_num, f"Row {row_num}: Session with ID {item['session_id']} not found")
+                )
+                continue
+            if item["user_id"] in missing_users:
+                result.errors.append(
+                    (row_num, f"Row {row_num}: User with ID {item['user_id']} not found")
+                )
+                continue
+            records[(item["user_id"], item["session_id"])] = AttendanceRecord(
+                user_id=item["user_id"],
+                session_id=item["session_id"],
+                status=item["status"],
+                check_in_time=item["check_in_time"],
+                remarks=item["remarks"],
+                recorded_by=uploaded_by,
+            )
+            accepted += 1
+
+        if records:
+            with transaction.atomic():
+                AttendanceRecord.objects.bulk_create(
+                    list(records.values()),
+                    update_conflicts=True,
+                    unique_fields=["user", "session"],
+                    update_fields=UPSERT_FIELDS,
+                )
+                # The upsert bypasses AttendanceRecord.save(), so recount the
+                # touched sessions instead of adjusting them row by row.
+                refresh_session_counts({session_id for _, session_id in records})
+        result.success_count += accepted
+        batch.clear()
+
+    row_num = 1  # header is row 1
+    try:
+        for row_num, row in enumerate(rows, start=2):
+            parsed = _parse_row(row_num, row, result.errors)
+            if parsed is None:
+                continue
+            batch.append(parsed)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except Exception as exc:
+        failed_at = batch[0]["row_num"] if batch else row_num
+        result.errors.append(
+            (
+                failed_at,
+                f"Row {failed_at}: upload stopped ({exc}); "
+                f"{result.success_count} rows before it were saved",
+            )
+        )
+        raise IngestAborted(result) from exc
+    return result
+
+
+__all__ = ["INGEST_BATCH_SIZE", "IngestAborted", "IngestResult", "ingest_attendance_rows"]
@@ -0,0 +1,35 @@
+"""Management command to rebuild the denormalised attendance counters on sessions."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from sims.attendance.counters import refresh_session_counts
+from sims.attendance.models import Session
+
+
+class Command(BaseCommand):
+    help = "Recompute present/late/absent/excused counts on attendance sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions recomputed per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        ids = Session.objects.order_by("pk").values_list("pk", flat=True)
+
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            updated += refresh_session_counts(batch)
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled counters for {updated} sessions"))
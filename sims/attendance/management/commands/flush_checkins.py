@@ -0,0 +1,23 @@
+"""Management command to drain buffered QR/kiosk check-ins."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from sims.attendance.checkin import FLUSH_BATCH_SIZE, flush_checkins
+
+
+class Command(BaseCommand):
+    help = "Move buffered QR/kiosk check-ins into attendance records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=FLUSH_BATCH_SIZE,
+            help=f"Check-ins upserted per transaction (default: {FLUSH_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        drained = flush_checkins(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"Flushed {drained} check-ins"))
@@ -0,0 +1,60 @@
+"""Management command to recompute eligibility summaries for a whole cohort."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sims.attendance.eligibility import default_cohort, previous_month, recompute_eligibility
+from sims.attendance.models import EligibilitySummary
+
+
+class Command(BaseCommand):
+    help = "Recompute attendance eligibility summaries for all active PGs over a period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--period",
+            default="monthly",
+            choices=[choice for choice, _ in EligibilitySummary.PERIOD_CHOICES],
+            help="Period label stored on the summaries (default: monthly)",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="First day of the period (YYYY-MM-DD); defaults to the start of last month",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Last day of the period (YYYY-MM-DD); defaults to the end of last month",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Limit to this user id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        start_date, end_date = options["start_date"], options["end_date"]
+        if bool(start_date) != bool(end_date):
+            raise CommandError("--start-date and --end-date must be given together")
+        if not start_date:
+            start_date, end_date = previous_month()
+        if start_date > end_date:
+            raise CommandError("--start-date must not be after --end-date")
+
+        users = default_cohort()
+        if options["user_ids"]:
+            users = users.filter(pk__in=options["user_ids"])
+
+        result = recompute_eligibility(start_date, end_date, period=options["period"], users=users)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recomputed {result.users} eligibility summaries for {start_date} to {end_date} "
+                f"({result.eligible} eligible, {result.total_sessions} sessions)"
+            )
+        )
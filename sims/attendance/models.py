@@ -6,7 +6,7 @@ Created for SIMS production-ready release.
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 
 class Session(models.Model):
@@ -77,9 +77,18 @@ class Session(models.Model):
 
     notes = models.TextField(blank=True, help_text="Additional notes about the session")
 
+    # Denormalised from AttendanceRecord by sims.attendance.counters; adjusted with
+    # F() on every record save/delete and rebuilt with `manage.py backfill_session_counters`.
+    present_count = models.PositiveIntegerField(default=0, editable=False)
+    late_count = models.PositiveIntegerField(default=0, editable=False)
+    absent_count = models.PositiveIntegerField(default=0, editable=False)
+    excused_count = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COUNTER_FIELDS = ("present_count", "late_count", "absent_count", "excused_count")
+
     class Meta:
         verbose_name = "Attendance Session"
         verbose_name_plural = "Attendance Sessions"
@@ -92,6 +101,20 @@ class Session(models.Model):
     def __str__(self):
         return f"{self.title} - {self.date}"
 
+    def save(self, *args, **kwargs):
+        # The counters are owned by sims.attendance.counters; an ordinary save must
+        # not write back whatever stale copy this instance holds.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class AttendanceRecord(models.Model):
     """
@@ -155,6 +178,64 @@ class AttendanceRecord(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.session.title} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = (instance.__dict__.get("session_id"), instance.__dict__.get("status"))
+        return instance
+
+    def _locked_state(self, using=None):
+        """``(session_id, status)`` as stored, row-locked until the transaction ends."""
+
+        if self._state.adding:
+            return None
+        return (
+            type(self)
+            ._base_manager.db_manager(using)
+            .select_for_update()
+            .filter(pk=self.pk)
+            .values_list("session_id", "status")
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        from sims.attendance.counters import record_changed
+
+        with transaction.atomic(using=kwargs.get("using")):
+            # Concurrent saves of one record queue on the lock, so each moves the
+            # counters from the status the other committed, never both from the
+            # status they happened to load.
+            old = self._locked_state(kwargs.get("using"))
+            super().save(*args, **kwargs)
+            record_changed(self.user_id, old, (self.session_id, self.status))
+        self._loaded = (self.session_id, self.status)
+
+
+class PendingCheckIn(models.Model):
+    """
+    Write buffer for QR/kiosk check-ins, drained into ``AttendanceRecord``.
+
+    Each check-in is a single ``INSERT ... ON CONFLICT DO NOTHING`` on the
+    (user, session) key, so repeat scans are free and the hot path never reads.
+    The table is UNLOGGED on PostgreSQL: rows only live until the next flush.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name="+")
+    checked_in_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Pending Check-in"
+        verbose_name_plural = "Pending Check-ins"
+        unique_together = ["user", "session"]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.session_id} ({self.checked_in_at:%H:%M:%S})"
+
 
 class EligibilitySummary(models.Model):
     """
@@ -1,22 +1,17 @@
 """Services for attendance processing and eligibility calculation."""
 
-import csv
-import io
-import os
-from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 
-from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 
-from .models import AttendanceRecord, EligibilitySummary, Session
-
-User = get_user_model()
-
+from sims.domain.uploads import iter_upload_rows
 
-def get_attendance_threshold() -> float:
-    """Get attendance threshold from environment or default to 75%."""
-    return float(os.environ.get("ATTENDANCE_THRESHOLD", "75.0"))
+from .counters import session_roster
+from .eligibility import AttendanceCounts, attendance_counts, get_attendance_threshold
+from .ingest import IngestAborted, ingest_attendance_rows
+from .models import AttendanceRecord, EligibilitySummary, Session
 
 
 def process_csv_upload(csv_file, uploaded_by) -> Dict:
@@ -28,89 +23,29 @@ def process_csv_upload(csv_file, uploaded_by) -> Dict:
 
     Returns dict with success count, error count, and error messages.
     """
-    errors = []
-    success_count = 0
-
+    required_headers = ("session_id", "user_id", "status")
     try:
-        # Read CSV content
-        content = csv_file.read().decode("utf-8")
-        csv_reader = csv.DictReader(io.StringIO(content))
-
-        # Validate headers
-        required_headers = {"session_id", "user_id", "status"}
-        if not required_headers.issubset(set(csv_reader.fieldnames)):
-            return {
-                "success": False,
-                "success_count": 0,
-                "error_count": 1,
-                "errors": [f"CSV must contain columns: {', '.join(required_headers)}"],
-            }
-
-        with transaction.atomic():
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is 1)
-                try:
-                    # Get session
-                    session = Session.objects.get(pk=int(row["session_id"]))
-
-                    # Get user
-                    user = User.objects.get(pk=int(row["user_id"]))
-
-                    # Validate status
-                    status = row["status"].strip().lower()
-                    valid_statuses = ["present", "absent", "late", "excused"]
-                    if status not in valid_statuses:
-                        errors.append(
-                            f"Row {row_num}: Invalid status '{status}'. Must be one of: {', '.join(valid_statuses)}"
-                        )
-                        continue
-
-                    # Parse check-in time if provided
-                    check_in_time = None
-                    if row.get("check_in_time"):
-                        try:
-                            check_in_time = datetime.fromisoformat(row["check_in_time"])
-                        except ValueError:
-                            errors.append(
-                                f"Row {row_num}: Invalid check_in_time format. Use ISO format (YYYY-MM-DD HH:MM:SS)"
-                            )
-                            continue
-
-                    # Create or update attendance record
-                    record, created = AttendanceRecord.objects.update_or_create(
-                        user=user,
-                        session=session,
-                        defaults={
-                            "status": status,
-                            "check_in_time": check_in_time,
-                            "remarks": row.get("remarks", ""),
-                            "recorded_by": uploaded_by,
-                        },
-                    )
-                    success_count += 1
-
-                except Session.DoesNotExist:
-                    errors.append(f"Row {row_num}: Session with ID {row['session_id']} not found")
-                except User.DoesNotExist:
-                    errors.append(f"Row {row_num}: User with ID {row['user_id']} not found")
-                except ValueError as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-                except Exception as e:
-                    errors.append(f"Row {row_num}: Unexpected error - {str(e)}")
-
-    except Exception as e:
+        rows = iter_upload_rows(csv_file, required_columns=required_headers, fmt="csv")
+    except ValidationError as exc:
+        # Only a missing header row or column gets the format hint; decoding and
+        # other parser errors keep their own message.
+        if exc.code in ("no_headers", "missing_columns"):
+            errors = [f"CSV must contain columns: {', '.join(required_headers)}"]
+        else:
+            errors = exc.messages
         return {
             "success": False,
             "success_count": 0,
-            "error_count": 1,
-            "errors": [f"Failed to parse CSV file: {str(e)}"],
+            "error_count": len(errors),
+            "errors": errors,
         }
 
-    return {
-        "success": len(errors) == 0,
-        "success_count": success_count,
-        "error_count": len(errors),
-        "errors": errors,
-    }
+    try:
+        result = ingest_attendance_rows(rows, uploaded_by)
+    except IngestAborted as exc:
+        # Earlier batches are committed; report them alongside the failure.
+        result = exc.result
+    return result.as_dict()
 
 
 def calculate_attendance_summary(user, start_date, end_date, period="custom") -> Dict:
@@ -119,30 +54,10 @@ def calculate_attendance_summary(user, start_date, end_date, period="custom") ->
 
     Returns dict with attendance statistics and eligibility status.
     """
-    # Get sessions in the date range
-    sessions = Session.objects.filter(
-        date__gte=start_date, date__lte=end_date, status__in=["completed", "ongoing"]
-    )
-
-    total_sessions = sessions.count()
-
-    # Get attendance records for the user
-    attendance_records = AttendanceRecord.objects.filter(user=user, session__in=sessions)
-
-    # Count attended (present or late)
-    attended = attendance_records.filter(status__in=["present", "late"]).count()
-
-    # Count by status
-    present_count = attendance_records.filter(status="present").count()
-    late_count = attendance_records.filter(status="late").count()
-    absent_count = attendance_records.filter(status="absent").count()
-    excused_count = attendance_records.filter(status="excused").count()
-
-    # Calculate percentage
-    if total_sessions > 0:
-        percentage_present = round((attended / total_sessions) * 100, 2)
-    else:
-        percentage_present = 0.0
+    total_sessions, counts = attendance_counts(start_date, end_date, user_ids=[user.id])
+    user_counts = counts.get(user.id, AttendanceCounts(total_sessions=total_sessions))
+    attended = user_counts.attended
+    percentage_present = user_counts.percentage_present
 
     # Check eligibility
     threshold = get_attendance_threshold()
@@ -172,11 +87,50 @@ def calculate_attendance_summary(user, start_date, end_date, period="custom") ->
         "end_date": end_date.isoformat(),
         "total_sessions": total_sessions,
         "attended_sessions": attended,
-        "present_count": present_count,
-        "late_count": late_count,
-        "absent_count": absent_count,
-        "excused_count": excused_count,
+        "present_count": user_counts.present,
+        "late_count": user_counts.late,
+        "absent_count": user_counts.absent,
+        "excused_count": user_counts.excused,
         "percentage_present": percentage_present,
         "threshold_percentage": threshold,
         "is_eligible": is_eligible,
     }
+
+
+def mark_attendance(
+    session: Session, user_id: int, status: str, recorded_by, remarks: Optional[str] = None
+) -> bool:
+    """
+    Record a single check-in tap for ``user_id`` in ``session``.
+
+    The cached roster short-circuits repeat taps; otherwise one record is
+    created or updated and its save adjusts the session counters with ``F()``.
+    Returns ``False`` when the user was already marked with ``status``.
+    """
+    if session_roster(session.pk).get(user_id) == status and remarks is None:
+        return False
+
+    now = timezone.now() if status in ("present", "late") else None
+    with transaction.atomic():
+        record, created = AttendanceRecord.objects.select_for_update().get_or_create(
+            session=session,
+            user_id=user_id,
+            defaults={
+                "status": status,
+                "check_in_time": now,
+                "remarks": remarks or "",
+                "recorded_by": recorded_by,
+            },
+        )
+        if created:
+            return True
+        record.status = status
+        record.recorded_by = recorded_by
+        if remarks is not None:
+            record.remarks = remarks
+        if now and not record.check_in_time:
+            record.check_in_time = now
+        record.save(
+            update_fields=["status", "recorded_by", "remarks", "check_in_time", "updated_at"]
+        )
+    return True
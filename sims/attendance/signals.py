@@ -0,0 +1,25 @@
+"""Signal handlers for the attendance app."""
+
+from __future__ import annotations
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from sims.attendance.counters import record_changed
+from sims.attendance.eligibility import get_attendance_threshold
+from sims.attendance.models import AttendanceRecord
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def release_session_counter(sender, instance, **kwargs) -> None:
+    """Decrement the session counter for deleted records, including cascades."""
+
+    old = getattr(instance, "_loaded", (instance.session_id, instance.status))
+    record_changed(instance.user_id, old, None)
+
+
+@receiver(setting_changed)
+def reset_attendance_threshold(sender, setting, **kwargs) -> None:
+    if setting == "ATTENDANCE_THRESHOLD":
+        get_attendance_threshold.cache_clear()
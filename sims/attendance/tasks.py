@@ -0,0 +1,30 @@
+"""Celery tasks for the attendance app."""
+
+from datetime import date
+from typing import Optional
+
+from celery import shared_task
+
+from sims.attendance.checkin import flush_checkins as drain_checkin_buffer
+from sims.attendance.eligibility import previous_month, recompute_eligibility
+
+
+@shared_task
+def calculate_monthly_summaries(today: Optional[str] = None) -> dict:
+    """Recompute last month's eligibility summaries for every active PG."""
+
+    start_date, end_date = previous_month(date.fromisoformat(today) if today else None)
+    result = recompute_eligibility(start_date, end_date, period="monthly")
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "users": result.users,
+        "eligible": result.eligible,
+    }
+
+
+@shared_task
+def flush_checkins() -> int:
+    """Move buffered QR/kiosk check-ins into attendance records."""
+
+    return drain_checkin_buffer()
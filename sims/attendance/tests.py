@@ -1,13 +1,34 @@
 """Tests for attendance and eligibility API endpoints."""
 
+import functools
 import io
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from unittest import mock
 
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import transaction
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
 
-from sims.attendance.models import AttendanceRecord, Session
+from sims.attendance.checkin import checkin_token, enqueue_checkin, flush_checkins
+from sims.attendance.counters import session_counts, session_roster
+from sims.attendance.eligibility import (
+    AttendanceCounts,
+    attendance_counts,
+    recompute_eligibility,
+)
+from sims.attendance.ingest import ingest_attendance_rows
+from sims.attendance.models import (
+    AttendanceRecord,
+    EligibilitySummary,
+    PendingCheckIn,
+    Session,
+)
+from sims.attendance.services import process_csv_upload
+from sims.attendance.tasks import calculate_monthly_summaries
 from sims.users.models import User
 
 
@@ -119,6 +140,108 @@ class AttendanceAPITests(TestCase):
 
         self.assertEqual(response.status_code, 400)
 
+    def test_bulk_upload_reports_parser_errors(self):
+        """Only a missing header gets the column hint; other parser errors pass through."""
+        missing = io.BytesIO(b"session_id,status\n1,present\n")
+        result = process_csv_upload(missing, self.supervisor)
+        self.assertEqual(
+            result["errors"], ["CSV must contain columns: session_id, user_id, status"]
+        )
+
+        undecodable = io.BytesIO("session_id,user_id,status\n".encode("utf-16"))
+        result = process_csv_upload(undecodable, self.supervisor)
+        self.assertEqual(result["errors"], ["File is not valid UTF-8 text"])
+        self.assertEqual(result["error_count"], 1)
+
+    def test_bulk_upload_upserts_and_reports_row_errors(self):
+        """Existing records are updated in place; bad rows are reported by row number."""
+        csv_content = (
+            "session_id,user_id,status,check_in_time,remarks\n"
+            f"{self.session1.id},{self.pg.id},late,2024-01-01 09:15:00,Traffic\n"
+            f"{self.session3.id},{self.pg.id},absent,,\n"
+            f"9999,{self.pg.id},present,,\n"
+            f"{self.session2.id},9999,present,,\n"
+            f"{self.session2.id},{self.pg.id},sleeping,,\n"
+            f"{self.session2.id},{self.pg.id},present,yesterday,\n"
+            f"abc,{self.pg.id},present,,\n"
+            f"{self.session3.id},{self.pg.id},excused,,Resubmitted\n"
+        )
+        csv_file = io.BytesIO(csv_content.encode("utf-8"))
+        csv_file.name = "attendance.csv"
+
+        result = process_csv_upload(csv_file, self.supervisor)
+
+        self.assertEqual(result["success_count"], 3)
+        self.assertEqual(
+            [error.split(":")[0] for error in result["errors"]],
+            ["Row 4", "Row 5", "Row 6", "Row 7", "Row 8"],
+        )
+        self.assertIn("Session with ID 9999 not found", result["errors"][0])
+        self.assertIn("User with ID 9999 not found", result["errors"][1])
+        self.assertEqual(AttendanceRecord.objects.filter(user=self.pg).count(), 3)
+
+        late = AttendanceRecord.objects.get(user=self.pg, session=self.session1)
+        self.assertEqual((late.status, late.remarks), ("late", "Traffic"))
+        self.assertEqual(late.recorded_by, self.supervisor)
+        self.assertIsNotNone(late.check_in_time)
+        # The later row for the same pair wins.
+        repeated = AttendanceRecord.objects.get(user=self.pg, session=self.session3)
+        self.assertEqual((repeated.status, repeated.remarks), ("excused", "Resubmitted"))
+
+    def test_bulk_upload_query_count_is_per_batch(self):
+        """Ids are resolved once per batch and each batch is a single upsert."""
+        pgs = User.objects.bulk_create(
+            User(username=f"bulk{idx}", role="pg", specialty="surgery", year="1")
+            for idx in range(30)
+        )
+        rows = [
+            {"session_id": str(session.id), "user_id": str(pg.id), "status": "present"}
+            for pg in pgs
+            for session in (self.session1, self.session2, self.session3)
+        ]
+
+        # Three batches of ten PGs: the sessions are looked up once, the users
+        # once per batch, and each batch is one upsert plus a grouped recount
+        # and one counter UPDATE inside a savepoint.
+        with self.assertNumQueries(19):
+            result = ingest_attendance_rows(rows, self.supervisor, batch_size=30)
+
+        self.assertEqual(result.success_count, 90)
+        self.assertEqual(
+            AttendanceRecord.objects.filter(user__in=pgs, status="present").count(), 90
+        )
+
+    def test_bulk_upload_failure_reports_committed_batches(self):
+        """A failing batch is reported with the rows already committed, not as zero saved."""
+        pgs = User.objects.bulk_create(
+            User(username=f"partial{idx}", role="pg", specialty="surgery", year="1")
+            for idx in range(4)
+        )
+        csv_content = "session_id,user_id,status\n" + "".join(
+            f"{self.session1.id},{pg.id},present\n" for pg in pgs
+        )
+        csv_file = io.BytesIO(csv_content.encode("utf-8"))
+        csv_file.name = "attendance.csv"
+        refresh = mock.Mock(side_effect=[None, RuntimeError("database went away")])
+
+        small_batches = functools.partial(ingest_attendance_rows, batch_size=2)
+        with (
+            mock.patch("sims.attendance.services.ingest_attendance_rows", small_batches),
+            mock.patch("sims.attendance.ingest.refresh_session_counts", refresh),
+        ):
+            result = process_csv_upload(csv_file, self.supervisor)
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["success_count"], 2)
+        self.assertEqual(
+            result["errors"],
+            ["Row 4: upload stopped (database went away); 2 rows before it were saved"],
+        )
+        self.assertEqual(
+            set(AttendanceRecord.objects.filter(user__in=pgs).values_list("user_id", flat=True)),
+            {pgs[0].id, pgs[1].id},
+        )
+
     def test_attendance_summary_own(self):
         """PG can view their own attendance summary."""
         self.client.force_authenticate(self.pg)
@@ -199,3 +322,367 @@ class AttendanceAPITests(TestCase):
         self.assertEqual(response.data["attended_sessions"], 3)
         self.assertEqual(response.data["percentage_present"], 100.0)
         self.assertTrue(response.data["is_eligible"])  # Above 75%
+
+
+class EligibilityRecomputeTests(TestCase):
+    """Tests for cohort-wide eligibility recomputation."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create_user(
+            username="supervisor",
+            password="testpass",
+            role="supervisor",
+            email="supervisor@example.com",
+            specialty="surgery",
+        )
+        self.pgs = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(4)
+        )
+        self.sessions = Session.objects.bulk_create(
+            Session(
+                title=f"Day {day}",
+                session_type="clinical",
+                date=date(2024, 3, day),
+                start_time="09:00",
+                end_time="17:00",
+                status="completed",
+            )
+            for day in (4, 5, 6, 7)
+        )
+        # Cancelled and out-of-range sessions are not counted.
+        Session.objects.create(
+            title="Cancelled",
+            session_type="clinical",
+            date=date(2024, 3, 8),
+            start_time="09:00",
+            end_time="17:00",
+            status="cancelled",
+        )
+        pg0, pg1, pg2, _ = self.pgs
+        statuses = {
+            pg0: ["present", "present", "late", "present"],
+            pg1: ["present", "absent", "excused", "late"],
+            pg2: ["absent"],
+        }
+        AttendanceRecord.objects.bulk_create(
+            AttendanceRecord(user=pg, session=session, status=status)
+            for pg, pg_statuses in statuses.items()
+            for session, status in zip(self.sessions, pg_statuses)
+        )
+
+    def test_counts_match_per_user_summary(self):
+        total, counts = attendance_counts(date(2024, 3, 1), date(2024, 3, 31))
+
+        self.assertEqual(total, 4)
+        pg0, pg1, pg2, pg3 = self.pgs
+        self.assertEqual(counts[pg1.pk], AttendanceCounts(4, 2, 1, 1, 1, 1))
+        self.assertEqual(counts[pg0.pk].percentage_present, 100.0)
+        self.assertEqual(counts[pg2.pk].attended, 0)
+        self.assertNotIn(pg3.pk, counts)
+
+    def test_recompute_upserts_whole_cohort(self):
+        pg0, pg1, pg2, pg3 = self.pgs
+        EligibilitySummary.objects.create(
+            user=pg1,
+            period="monthly",
+            start_date=date(2024, 3, 1),
+            end_date=date(2024, 3, 31),
+            attended_sessions=4,
+            percentage_present=100.0,
+            is_eligible=True,
+        )
+
+        # Cohort ids, session total, grouped counts, and the upsert.
+        with self.assertNumQueries(4):
+            result = recompute_eligibility(date(2024, 3, 1), date(2024, 3, 31), threshold=75.0)
+
+        self.assertEqual((result.users, result.eligible, result.total_sessions), (4, 1, 4))
+        summaries = {
+            summary.user_id: summary
+            for summary in EligibilitySummary.objects.filter(period="monthly")
+        }
+        self.assertEqual(len(summaries), 4)
+        self.assertTrue(summaries[pg0.pk].is_eligible)
+        self.assertEqual(summaries[pg1.pk].attended_sessions, 2)
+        self.assertEqual(summaries[pg1.pk].percentage_present, 50.0)
+        self.assertFalse(summaries[pg1.pk].is_eligible)
+        self.assertEqual(summaries[pg3.pk].attended_sessions, 0)
+
+    def test_monthly_task_covers_previous_month(self):
+        result = calculate_monthly_summaries("2024-04-15")
+
+        self.assertEqual(result["start_date"], "2024-03-01")
+        self.assertEqual(result["end_date"], "2024-03-31")
+        self.assertEqual(result["users"], 4)
+        self.assertEqual(
+            EligibilitySummary.objects.filter(
+                period="monthly", start_date=date(2024, 3, 1), end_date=date(2024, 3, 31)
+            ).count(),
+            4,
+        )
+
+    def test_command_accepts_explicit_range_and_users(self):
+        out = io.StringIO()
+        call_command(
+            "recompute_eligibility",
+            "--period=quarterly",
+            "--start-date=2024-01-01",
+            "--end-date=2024-03-31",
+            f"--user={self.pgs[0].pk}",
+            stdout=out,
+        )
+
+        self.assertIn("Recomputed 1 eligibility summaries", out.getvalue())
+        summary = EligibilitySummary.objects.get(user=self.pgs[0], period="quarterly")
+        self.assertEqual(summary.start_date, date(2024, 1, 1))
+        self.assertTrue(summary.is_eligible)
+
+    def test_command_rejects_half_open_range(self):
+        with self.assertRaises(CommandError):
+            call_command("recompute_eligibility", "--start-date=2024-01-01")
+
+
+class SessionCounterTests(TestCase):
+    """Tests for the denormalised session counters and the cached roster."""
+
+    def setUp(self):
+        cache.clear()
+        self.supervisor = User.objects.create_user(
+            username="supervisor",
+            password="testpass",
+            role="supervisor",
+            email="supervisor@example.com",
+            specialty="surgery",
+        )
+        self.pgs = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(3)
+        )
+        self.session = Session.objects.create(
+            title="Grand Round",
+            session_type="lecture",
+            date=date.today(),
+            start_time="09:00",
+            end_time="10:00",
+            status="ongoing",
+        )
+        self.client = APIClient()
+
+    def counts(self):
+        self.session.refresh_from_db()
+        return session_counts(self.session)
+
+    def test_record_save_and_delete_adjust_counters(self):
+        pg0, pg1, pg2 = self.pgs
+        record = AttendanceRecord.objects.create(user=pg0, session=self.session, status="present")
+        AttendanceRecord.objects.create(user=pg1, session=self.session, status="late")
+        self.assertEqual(self.counts(), {"present": 1, "absent": 0, "late": 1, "excused": 0})
+
+        record.status = "excused"
+        record.save()
+        # A stale Session save must not write its counters back.
+        Session.objects.get(pk=self.session.pk).save()
+        self.assertEqual(self.counts(), {"present": 0, "absent": 0, "late": 1, "excused": 1})
+
+        AttendanceRecord.objects.get(pk=record.pk).delete()
+        User.objects.filter(pk=pg1.pk).delete()
+        self.assertEqual(self.counts(), {"present": 0, "absent": 0, "late": 0, "excused": 0})
+
+    def test_stale_record_saves_move_counters_from_stored_status(self):
+        record = AttendanceRecord.objects.create(
+            user=self.pgs[0], session=self.session, status="present"
+        )
+        first = AttendanceRecord.objects.get(pk=record.pk)
+        second = AttendanceRecord.objects.get(pk=record.pk)
+
+        first.status = "late"
+        first.save()
+        # Loaded as "present" too, but must not decrement present a second time.
+        second.status = "excused"
+        second.save()
+
+        self.assertEqual(self.counts(), {"present": 0, "absent": 0, "late": 0, "excused": 1})
+
+    def test_bulk_ingest_recounts_touched_sessions(self):
+        rows = [
+            {"session_id": str(self.session.pk), "user_id": str(pg.pk), "status": status}
+            for pg, status in zip(self.pgs, ["present", "present", "absent"])
+        ]
+        ingest_attendance_rows(rows, self.supervisor)
+
+        self.assertEqual(self.counts(), {"present": 2, "absent": 1, "late": 0, "excused": 0})
+
+    def test_marking_uses_cached_roster_and_counters(self):
+        pg0, pg1, _ = self.pgs
+        self.client.force_authenticate(self.supervisor)
+        mark_url = reverse("attendance_api:session_mark", args=[self.session.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(mark_url, {"user_id": pg0.pk, "status": "present"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["changed"])
+        self.assertEqual(response.data["counts"]["present"], 1)
+
+        # The committed change dropped the roster; the next tap rebuilds it once
+        # and later repeat taps are answered from the cache and the session row.
+        response = self.client.post(mark_url, {"user_id": pg0.pk, "status": "present"})
+        self.assertFalse(response.data["changed"])
+        with self.assertNumQueries(1):
+            response = self.client.post(mark_url, {"user_id": pg0.pk, "status": "present"})
+        self.assertFalse(response.data["changed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(mark_url, {"user_id": pg0.pk, "status": "late"})
+            self.client.post(mark_url, {"user_id": pg1.pk, "status": "absent"})
+        response = self.client.get(reverse("attendance_api:session_roster", args=[self.session.pk]))
+        self.assertEqual(
+            response.data["counts"], {"present": 0, "absent": 1, "late": 1, "excused": 0}
+        )
+        self.assertEqual(
+            response.data["roster"],
+            [{"user_id": pg0.pk, "status": "late"}, {"user_id": pg1.pk, "status": "absent"}],
+        )
+        self.assertIsNotNone(
+            AttendanceRecord.objects.get(user=pg0, session=self.session).check_in_time
+        )
+
+    def test_rolled_back_change_leaves_cached_roster_alone(self):
+        pg0 = self.pgs[0]
+        AttendanceRecord.objects.create(user=pg0, session=self.session, status="absent")
+        self.assertEqual(session_roster(self.session.pk), {pg0.pk: "absent"})
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    record = AttendanceRecord.objects.get(user=pg0, session=self.session)
+                    record.status = "present"
+                    record.save()
+                    raise RuntimeError("abort")
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(session_roster(self.session.pk), {pg0.pk: "absent"})
+
+        record = AttendanceRecord.objects.get(user=pg0, session=self.session)
+        record.status = "present"
+        with self.captureOnCommitCallbacks(execute=True):
+            record.save()
+        self.assertEqual(session_roster(self.session.pk), {pg0.pk: "present"})
+
+    def test_marking_validates_input_and_permissions(self):
+        mark_url = reverse("attendance_api:session_mark", args=[self.session.pk])
+        self.client.force_authenticate(self.pgs[0])
+        response = self.client.post(mark_url, {"user_id": self.pgs[0].pk, "status": "present"})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.supervisor)
+        response = self.client.post(mark_url, {"user_id": 9999, "status": "present"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(mark_url, {"user_id": self.pgs[0].pk, "status": "asleep"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_backfill_command_recounts_sessions(self):
+        AttendanceRecord.objects.create(user=self.pgs[0], session=self.session, status="late")
+        Session.objects.filter(pk=self.session.pk).update(late_count=0, present_count=7)
+
+        out = io.StringIO()
+        call_command("backfill_session_counters", stdout=out)
+
+        self.assertIn("Backfilled counters for 1 sessions", out.getvalue())
+        self.assertEqual(self.counts(), {"present": 0, "absent": 0, "late": 1, "excused": 0})
+
+
+class CheckInTests(TestCase):
+    """Tests for QR/kiosk check-in buffering and flushing."""
+
+    def setUp(self):
+        cache.clear()
+        self.supervisor = User.objects.create_user(
+            username="supervisor",
+            password="testpass",
+            role="supervisor",
+            email="supervisor@example.com",
+            specialty="surgery",
+        )
+        self.pgs = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(4)
+        )
+        self.session = Session.objects.create(
+            title="Grand Round",
+            session_type="lecture",
+            date=date(2024, 3, 4),
+            start_time="09:00",
+            end_time="10:00",
+            status="ongoing",
+        )
+        self.client = APIClient()
+
+    def at(self, hour, minute):
+        return timezone.make_aware(datetime(2024, 3, 4, hour, minute))
+
+    def test_token_endpoint_and_check_in_are_idempotent(self):
+        self.client.force_authenticate(self.supervisor)
+        response = self.client.get(
+            reverse("attendance_api:session_checkin_token", args=[self.session.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        token = response.data["token"]
+
+        self.client.force_authenticate(self.pgs[0])
+        url = reverse("attendance_api:checkin")
+        # The hot path is a single conflict-ignoring INSERT.
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {"token": token})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["session_id"], self.session.pk)
+        self.client.post(url, {"token": token})
+
+        self.assertEqual(PendingCheckIn.objects.filter(user=self.pgs[0]).count(), 1)
+
+    def test_forged_or_expired_tokens_are_rejected(self):
+        self.client.force_authenticate(self.pgs[0])
+        url = reverse("attendance_api:checkin")
+
+        response = self.client.post(url, {"token": f"{self.session.pk}:forged:sig"})
+        self.assertEqual(response.status_code, 400)
+
+        token = checkin_token(self.session)
+        with self.settings(ATTENDANCE_CHECKIN_TOKEN_SECONDS=-1):
+            response = self.client.post(url, {"token": token})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PendingCheckIn.objects.exists())
+
+    def test_flush_upserts_records_and_counters(self):
+        pg0, pg1, pg2, pg3 = self.pgs
+        # pg2 was pre-marked absent by hand; pg3 already checked in earlier.
+        AttendanceRecord.objects.create(user=pg2, session=self.session, status="absent")
+        AttendanceRecord.objects.create(
+            user=pg3, session=self.session, status="present", check_in_time=self.at(8, 55)
+        )
+        enqueue_checkin(pg0.pk, self.session.pk, self.at(9, 5))
+        enqueue_checkin(pg1.pk, self.session.pk, self.at(9, 20))
+        enqueue_checkin(pg2.pk, self.session.pk, self.at(9, 1))
+        enqueue_checkin(pg3.pk, self.session.pk, self.at(9, 30))
+
+        self.assertEqual(flush_checkins(batch_size=3), 4)
+
+        statuses = dict(
+            AttendanceRecord.objects.filter(session=self.session).values_list("user_id", "status")
+        )
+        self.assertEqual(
+            statuses, {pg0.pk: "present", pg1.pk: "late", pg2.pk: "present", pg3.pk: "present"}
+        )
+        kept = AttendanceRecord.objects.get(user=pg3, session=self.session)
+        self.assertEqual(kept.check_in_time, self.at(8, 55))
+        self.session.refresh_from_db()
+        self.assertEqual(session_counts(self.session)["present"], 3)
+        self.assertEqual(session_counts(self.session)["absent"], 0)
+        self.assertFalse(PendingCheckIn.objects.exists())
+
+    def test_flush_command_reports_drained_rows(self):
+        enqueue_checkin(self.pgs[0].pk, self.session.pk, self.at(9, 0))
+
+        out = io.StringIO()
+        call_command("flush_checkins", stdout=out)
+
+        self.assertIn("Flushed 1 check-ins", out.getvalue())
+        self.assertTrue(AttendanceRecord.objects.filter(user=self.pgs[0]).exists())
@@ -2,11 +2,26 @@
 
 from django.urls import path
 
-from .api_views import AttendanceSummaryView, BulkAttendanceUploadView
+from .api_views import (
+    AttendanceSummaryView,
+    BulkAttendanceUploadView,
+    CheckInTokenView,
+    CheckInView,
+    MarkAttendanceView,
+    SessionRosterView,
+)
 
 app_name = "attendance_api"
 
 urlpatterns = [
     path("upload/", BulkAttendanceUploadView.as_view(), name="upload"),
     path("summary/", AttendanceSummaryView.as_view(), name="summary"),
+    path("sessions/<int:pk>/roster/", SessionRosterView.as_view(), name="session_roster"),
+    path("sessions/<int:pk>/mark/", MarkAttendanceView.as_view(), name="session_mark"),
+    path(
+        "sessions/<int:pk>/check-in-token/",
+        CheckInTokenView.as_view(),
+        name="session_checkin_token",
+    ),
+    path("check-in/", CheckInView.as_view(), name="checkin"),
 ]
@@ -1 +1,31 @@
 """Admin registrations for bulk operations."""
+
+from django.contrib import admin
+
+from sims.bulk.models import BulkOperation
+
+
+@admin.register(BulkOperation)
+class BulkOperationAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "operation",
+        "status",
+        "user",
+        "processed_items",
+        "success_count",
+        "failure_count",
+        "created_at",
+        "completed_at",
+    )
+    list_filter = ("operation", "status")
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
+    readonly_fields = ("details", "checkpoint", "params", "results_file", "upload")
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).select_related("user")
+        # The changelist never shows these JSON blobs; skip loading them per row.
+        if request.resolver_match and request.resolver_match.url_name.endswith("_changelist"):
+            queryset = queryset.defer("details", "checkpoint", "params")
+        return queryset
@@ -0,0 +1,41 @@
+"""Management command to resume bulk operations interrupted by a worker crash."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sims.bulk.services import BulkService, stalled_operations
+from sims.bulk.tasks import run_bulk_operation
+
+
+class Command(BaseCommand):
+    help = "Resume pending/running bulk operations from their last committed checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=settings.BULK_OPERATION_STALE_SECONDS,
+            help="Seconds without checkpoint progress before an operation counts as stalled",
+        )
+        parser.add_argument(
+            "--inline",
+            action="store_true",
+            help="Run the operations in this process instead of queueing them",
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=max(0, options["stale_after"]))
+        operations = list(stalled_operations(stale_after).select_related("user"))
+
+        for operation in operations:
+            if options["inline"]:
+                BulkService(operation.user).run(operation)
+            else:
+                run_bulk_operation.delay(operation.pk)
+
+        action = "Resumed" if options["inline"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(operations)} stalled bulk operations"))
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bulk', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict, help_text='Resume state and per-chunk results'),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='params',
+            field=models.JSONField(blank=True, default=dict, help_text='Arguments the operation was started with'),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='processed_items',
+            field=models.PositiveIntegerField(default=0, help_text='Items committed so far; work resumes after this index'),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='upload',
+            field=models.FileField(blank=True, upload_to='bulk/imports/'),
+        ),
+        migrations.AlterField(
+            model_name='bulkoperation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='bulkoperation',
+            index=models.Index(fields=['status', 'updated_at'], name='bulk_bulkop_status_f3ae1a_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bulk', '0002_operation_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkoperation',
+            name='results_file',
+            field=models.FileField(blank=True, help_text='Full per-item outcome log (gzip-compressed JSON Lines)', upload_to='bulk/results/'),
+        ),
+    ]
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from django.contrib.auth import get_user_model
 from django.db import models
@@ -24,10 +24,12 @@ class BulkOperation(models.Model):
     )
 
     STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
     STATUS_COMPLETED = "completed"
     STATUS_FAILED = "failed"
     STATUS_CHOICES = (
         (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
         (STATUS_COMPLETED, "Completed"),
         (STATUS_FAILED, "Failed"),
     )
@@ -39,7 +41,26 @@ class BulkOperation(models.Model):
     success_count = models.PositiveIntegerField(default=0)
     failure_count = models.PositiveIntegerField(default=0)
     details = models.JSONField(default=dict, blank=True)
+    params = models.JSONField(
+        default=dict, blank=True, help_text="Arguments the operation was started with"
+    )
+    upload = models.FileField(upload_to="bulk/imports/", blank=True)
+    results_file = models.FileField(
+        upload_to="bulk/results/",
+        blank=True,
+        help_text="Full per-item outcome log (gzip-compressed JSON Lines)",
+    )
+    processed_items = models.PositiveIntegerField(
+        default=0, help_text="Items committed so far; work resumes after this index"
+    )
+    checkpoint = models.JSONField(
+        default=dict, blank=True, help_text="Resume state and per-chunk results"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
@@ -47,8 +68,21 @@ class BulkOperation(models.Model):
         indexes = [
             models.Index(fields=["user", "created_at"]),
             models.Index(fields=["operation", "created_at"]),
+            models.Index(fields=["status", "updated_at"]),
         ]
 
+    @property
+    def is_finished(self) -> bool:
+        return self.status in {self.STATUS_COMPLETED, self.STATUS_FAILED}
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.status == self.STATUS_COMPLETED:
+            return 100.0
+        if not self.total_items:
+            return None
+        return round(min(self.processed_items / self.total_items, 1) * 100, 1)
+
     def mark_completed(
         self, success_count: int, failure_count: int, details: Dict[str, Any]
     ) -> None:
@@ -66,14 +100,33 @@ class BulkOperation(models.Model):
                 "details",
                 "status",
                 "completed_at",
+                "updated_at",
             ]
         )
+        self._discard_upload()
 
-    def mark_failed(self, details: Dict[str, Any]) -> None:
+    def mark_failed(self, details: Dict[str, Any], error: str = "") -> None:
         self.status = self.STATUS_FAILED
         self.details = details
+        self.error = error
         self.completed_at = timezone.now()
-        self.save(update_fields=["status", "details", "completed_at"])
+        self.save(
+            update_fields=[
+                "status",
+                "details",
+                "error",
+                "failure_count",
+                "completed_at",
+                "updated_at",
+            ]
+        )
+        self._discard_upload()
+
+    def _discard_upload(self) -> None:
+        # The stored copy only exists so a resumed import can re-read it.
+        if self.upload:
+            self.upload.delete(save=False)
+            BulkOperation.objects.filter(pk=self.pk).update(upload="")
 
 
 __all__ = ["BulkOperation"]
@@ -0,0 +1,135 @@
+"""Per-item outcome log for bulk operations.
+
+``BulkOperation.details`` only keeps counts and a bounded sample. The full log
+is written as gzip-compressed JSON Lines: one part per committed chunk while
+the operation runs, concatenated into ``results_file`` when it finishes
+(concatenated gzip members are themselves a valid gzip stream).
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import posixpath
+import tempfile
+import uuid
+from itertools import islice
+from typing import Iterator, List, Optional
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from sims.bulk.models import BulkOperation
+
+RESULT_SAMPLE_SIZE = 20
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"
+
+
+def _parts_dir(operation: BulkOperation) -> str:
+    return f"bulk/results/{operation.pk}/parts"
+
+
+def with_sample(details: dict, successes: List[dict], failures: List[dict]) -> dict:
+    """``details`` with up to ``RESULT_SAMPLE_SIZE`` successes and failures each."""
+
+    details = dict(details)
+    for key, records in (("successes", successes), ("failures", failures)):
+        kept = list(details.get(key, []))
+        room = RESULT_SAMPLE_SIZE - len(kept)
+        if room > 0:
+            kept.extend(records[:room])
+        details[key] = kept
+    return details
+
+
+def write_part(
+    operation: BulkOperation, start: int, successes: List[dict], failures: List[dict]
+) -> Optional[str]:
+    """Compress one chunk's outcomes into its own storage file; returns its name."""
+
+    if not successes and not failures:
+        return None
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as handle:
+        for outcome, records in ((OUTCOME_SUCCESS, successes), (OUTCOME_FAILURE, failures)):
+            for record in records:
+                line = json.dumps({"outcome": outcome, **record}, default=str)
+                handle.write(line.encode("utf-8") + b"\n")
+    # A unique suffix so a superseded or crashed attempt at the same chunk
+    # never overwrites the part that actually committed.
+    name = posixpath.join(_parts_dir(operation), f"{start:09d}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def discard_part(name: Optional[str]) -> None:
+    if name:
+        default_storage.delete(name)
+
+
+def _committed_parts(operation: BulkOperation) -> List[str]:
+    return [chunk["log"] for chunk in operation.checkpoint.get("chunks", []) if chunk.get("log")]
+
+
+def finalise_log(operation: BulkOperation) -> None:
+    """Concatenate the committed parts into ``results_file`` and remove every part."""
+
+    parts = _committed_parts(operation)
+    if parts:
+        with tempfile.TemporaryFile() as combined:
+            for name in parts:
+                with default_storage.open(name, "rb") as part:
+                    for block in iter(lambda: part.read(64 * 1024), b""):
+                        combined.write(block)
+            combined.seek(0)
+            operation.results_file.save(
+                f"operation-{operation.pk}-{uuid.uuid4().hex[:8]}.jsonl.gz",
+                File(combined),
+                save=False,
+            )
+        BulkOperation.objects.filter(pk=operation.pk).update(
+            results_file=operation.results_file.name
+        )
+
+    # Includes parts left behind by attempts that crashed before committing.
+    directory = _parts_dir(operation)
+    if default_storage.exists(directory):
+        for name in default_storage.listdir(directory)[1]:
+            default_storage.delete(posixpath.join(directory, name))
+
+
+def _read_lines(name: str) -> Iterator[dict]:
+    with default_storage.open(name, "rb") as raw, gzip.GzipFile(fileobj=raw) as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def iter_results(operation: BulkOperation, outcome: Optional[str] = None) -> Iterator[dict]:
+    """Stream the outcome log; readable while the operation is still running."""
+
+    names = [operation.results_file.name] if operation.results_file else _committed_parts(operation)
+    for name in names:
+        for record in _read_lines(name):
+            if outcome is None or record["outcome"] == outcome:
+                yield record
+
+
+def page_of_results(
+    operation: BulkOperation, offset: int, limit: int, outcome: Optional[str] = None
+) -> List[dict]:
+    return list(islice(iter_results(operation, outcome), offset, offset + limit))
+
+
+__all__ = [
+    "OUTCOME_FAILURE",
+    "OUTCOME_SUCCESS",
+    "RESULT_SAMPLE_SIZE",
+    "discard_part",
+    "finalise_log",
+    "iter_results",
+    "page_of_results",
+    "with_sample",
+    "write_part",
+]
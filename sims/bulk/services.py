@@ -2,19 +2,24 @@
 
 from __future__ import annotations
 
-import csv
-import io
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Iterable, Iterator, List, Sequence
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
-from openpyxl import load_workbook
 
 from sims.bulk.models import BulkOperation
-from sims.logbook.models import LogbookEntry
+from sims.bulk.results import discard_part, finalise_log, with_sample, write_part
+from sims.domain.uploads import iter_upload_rows
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import queue_new_items, sync_items
+from sims.logbook.models import LogbookEntry, LogbookStatistics
+from sims.notifications.services import NotificationService
 from sims.users.models import User
 
 
@@ -28,10 +33,15 @@ class BulkProcessingError(Exception):
     """Raised when a bulk operation fails in transactional mode."""
 
 
+class OperationSuperseded(Exception):
+    """Another worker has already committed past this operation's checkpoint."""
+
+
 class BulkService:
-    def __init__(self, actor: User, chunk_size: int = 50):
+    def __init__(self, actor: User, chunk_size: int = 50, import_batch_size: int = 1000):
         self.actor = actor
         self.chunk_size = chunk_size
+        self.import_batch_size = import_batch_size
         self._validate_permissions()
 
     def _validate_permissions(self) -> None:
@@ -41,61 +51,29 @@ class BulkService:
             raise PermissionDenied("Bulk operations are restricted to supervisors and admins.")
 
     # ------------------------------------------------------------------
-    # Review and assignment operations
+    # Entry points. With ``background=True`` the operation is only recorded and
+    # handed to the ``run_bulk_operation`` task once the request commits;
+    # otherwise it runs to completion in the calling process.
 
-    def review_entries(self, entry_ids: Sequence[int], status: str) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_REVIEW)
-        successes: List[dict] = []
-        failures: List[dict] = []
-        for chunk in _chunked(entry_ids, self.chunk_size):
-            try:
-                with transaction.atomic():
-                    entries = list(LogbookEntry.objects.select_for_update().filter(pk__in=chunk))
-                    missing = set(chunk) - {entry.pk for entry in entries}
-                    for missing_id in missing:
-                        failures.append({"id": missing_id, "error": "not-found"})
-                    for entry in entries:
-                        entry.status = status
-                        entry.supervisor_action_at = timezone.now()
-                        entry.save(update_fields=["status", "supervisor_action_at"])
-                        successes.append({"id": entry.pk, "status": status})
-            except ValidationError as exc:
-                failures.append({"ids": list(chunk), "error": str(exc)})
-        operation.mark_completed(
-            len(successes),
-            len(failures),
-            {"successes": successes, "failures": failures},
+    def review_entries(
+        self, entry_ids: Sequence[int], status: str, *, background: bool = False
+    ) -> BulkOperation:
+        operation = self._create_operation(
+            BulkOperation.OP_REVIEW,
+            {"entry_ids": list(entry_ids), "status": status},
+            total_items=len(entry_ids),
         )
-        return operation
+        return self._start(operation, background)
 
-    def assign_supervisor(self, entry_ids: Sequence[int], supervisor: User) -> BulkOperation:
-        operation = BulkOperation.objects.create(
-            user=self.actor, operation=BulkOperation.OP_ASSIGNMENT
-        )
-        successes: List[dict] = []
-        failures: List[dict] = []
-        for chunk in _chunked(entry_ids, self.chunk_size):
-            try:
-                with transaction.atomic():
-                    entries = list(LogbookEntry.objects.select_for_update().filter(pk__in=chunk))
-                    missing = set(chunk) - {entry.pk for entry in entries}
-                    for missing_id in missing:
-                        failures.append({"id": missing_id, "error": "not-found"})
-                    for entry in entries:
-                        entry.supervisor = supervisor
-                        entry.save(update_fields=["supervisor"])
-                        successes.append({"id": entry.pk, "supervisor": supervisor.pk})
-            except ValidationError as exc:
-                failures.append({"ids": list(chunk), "error": str(exc)})
-        operation.mark_completed(
-            len(successes),
-            len(failures),
-            {"successes": successes, "failures": failures},
+    def assign_supervisor(
+        self, entry_ids: Sequence[int], supervisor: User, *, background: bool = False
+    ) -> BulkOperation:
+        operation = self._create_operation(
+            BulkOperation.OP_ASSIGNMENT,
+            {"entry_ids": list(entry_ids), "supervisor_id": supervisor.pk},
+            total_items=len(entry_ids),
         )
-        return operation
-
-    # ------------------------------------------------------------------
-    # Bulk import
+        return self._start(operation, background)
 
     def import_logbook_entries(
         self,
@@ -103,79 +81,462 @@ class BulkService:
         *,
         dry_run: bool = True,
         allow_partial: bool = False,
+        background: bool = False,
     ) -> BulkOperation:
-        operation = BulkOperation.objects.create(user=self.actor, operation=BulkOperation.OP_IMPORT)
-        rows = list(_parse_rows(uploaded_file))
-        successes: List[dict] = []
-        failures: List[dict] = []
-        errors_triggered = False
-
-        def process_row(row: dict) -> None:
-            nonlocal errors_triggered
+        """
+        Staged import: rows are parsed lazily, PG usernames for each batch are
+        resolved with one ``IN`` query, entries are validated in memory and
+        written with ``bulk_create``. Per-row save hooks are skipped, so the
+        review inbox is updated per batch and statistics and supervisor
+        notifications once at the end.
+
+        Without ``allow_partial`` the whole file is validated before anything
+        is written, so a bad row still leaves the database untouched.
+        """
+        params = {"dry_run": dry_run, "allow_partial": allow_partial}
+        if not background:
+            operation = self._create_operation(BulkOperation.OP_IMPORT, params)
+            return self.run(operation, uploaded_file)
+
+        # Reject a wrong format or missing columns now rather than in the worker.
+        _parse_rows(uploaded_file)
+        operation = self._create_operation(BulkOperation.OP_IMPORT, params)
+        operation.upload.save(uploaded_file.name, uploaded_file, save=True)
+        return self._start(operation, background)
+
+    def _create_operation(self, kind: str, params: dict, total_items: int = 0) -> BulkOperation:
+        return BulkOperation.objects.create(
+            user=self.actor, operation=kind, params=params, total_items=total_items
+        )
+
+    def _start(self, operation: BulkOperation, background: bool) -> BulkOperation:
+        if not background:
+            return self.run(operation)
+        from sims.bulk.tasks import run_bulk_operation
+
+        transaction.on_commit(lambda: run_bulk_operation.delay(operation.pk))
+        return operation
+
+    # ------------------------------------------------------------------
+    # Execution
+
+    def run(self, operation: BulkOperation, uploaded_file=None) -> BulkOperation:
+        """
+        Execute ``operation``, resuming after its last committed chunk.
+
+        Each chunk commits together with the checkpoint that records it, so a
+        worker killed mid-way leaves the operation exactly at a chunk boundary.
+        """
+        if operation.is_finished:
+            return operation
+        operation.status = BulkOperation.STATUS_RUNNING
+        operation.attempts += 1
+        operation.started_at = operation.started_at or timezone.now()
+        operation.save(update_fields=["status", "attempts", "started_at", "updated_at"])
+
+        try:
+            if operation.operation == BulkOperation.OP_IMPORT:
+                self._run_import(operation, uploaded_file or operation.upload)
+            else:
+                self._run_entry_chunks(operation)
+        except OperationSuperseded:
+            operation.refresh_from_db()
+        except Exception as exc:
+            message = "; ".join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+            operation.mark_failed(operation.details, error=message)
+            finalise_log(operation)
+            raise
+        return operation
+
+    def _run_entry_chunks(self, operation: BulkOperation) -> None:
+        handler = {
+            BulkOperation.OP_REVIEW: self._review_chunk,
+            BulkOperation.OP_ASSIGNMENT: self._assign_chunk,
+        }[operation.operation]
+        entry_ids = operation.params["entry_ids"]
+        for start in range(operation.processed_items, len(entry_ids), self.chunk_size):
+            chunk = entry_ids[start : start + self.chunk_size]
             try:
-                pg = User.objects.get(username=row["pg_username"], role="pg")
-            except User.DoesNotExist:
-                failures.append({"row": row, "error": "invalid-pg"})
-                errors_triggered = True
+                with transaction.atomic():
+                    successes, failures, state = handler(chunk, operation)
+                    self._commit_chunk(operation, start, len(chunk), successes, failures, state)
+            except ValidationError as exc:
+                with transaction.atomic():
+                    failure = {"ids": list(chunk), "error": str(exc)}
+                    self._commit_chunk(operation, start, len(chunk), [], [failure])
+
+        self._send_followup_notifications(operation.checkpoint)
+        details = dict(operation.details)
+        details["stats"] = _throughput(operation.processed_items, operation.started_at)
+        finalise_log(operation)
+        operation.mark_completed(operation.success_count, operation.failure_count, details)
+
+    def _chunk_rows(self, chunk: List[int]) -> Dict[int, tuple]:
+        """``pk -> (status, supervisor_id, pg_id, version)`` for the chunk, in one query."""
+
+        rows = LogbookEntry.objects.filter(pk__in=chunk).values_list(
+            "pk", "status", "supervisor_id", "pg_id", "version"
+        )
+        return {pk: rest for pk, *rest in rows}
+
+    def _review_chunk(self, chunk: List[int], operation: BulkOperation):
+        """
+        One ``UPDATE`` per distinct (status, supervisor?, version) group in the chunk.
+
+        Grouping by the old status lets the model's transition rules be applied
+        once per group; grouping by version keeps the compare-and-set of a
+        per-row save, so an entry edited since the read is reported, not
+        overwritten.
+        """
+        status = operation.params["status"]
+        now = timezone.now()
+        rows = self._chunk_rows(chunk)
+        failures = [{"id": pk, "error": "not-found"} for pk in chunk if pk not in rows]
+
+        groups: Dict[tuple, List[int]] = defaultdict(list)
+        for pk, (old_status, supervisor_id, _, version) in rows.items():
+            groups[(old_status, bool(supervisor_id), version)].append(pk)
+
+        changed: Dict[int, str] = {}
+        for (old_status, has_supervisor, version), pks in groups.items():
+            final_status = _review_outcome(old_status, status, has_supervisor)
+            updated = LogbookEntry.objects.filter(pk__in=pks, version=version).update(
+                status=final_status,
+                supervisor_action_at=now,
+                updated_at=now,
+                version=F("version") + 1,
+            )
+            applied = set(pks)
+            if updated < len(pks):
+                applied = set(
+                    LogbookEntry.objects.filter(pk__in=pks, supervisor_action_at=now).values_list(
+                        "pk", flat=True
+                    )
+                )
+            for pk in pks:
+                if pk in applied:
+                    changed[pk] = final_status
+                else:
+                    failures.append({"id": pk, "error": "conflict"})
+
+        sync_items(ReviewInboxItem.TYPE_LOGBOOK, changed)
+        successes = [{"id": pk, "status": status} for pk in chunk if pk in changed]
+        return successes, failures, _review_followups(operation.checkpoint, rows, changed)
+
+    def _assign_chunk(self, chunk: List[int], operation: BulkOperation):
+        supervisor_id = operation.params["supervisor_id"]
+        present = set(
+            LogbookEntry.objects.select_for_update()
+            .filter(pk__in=chunk)
+            .values_list("pk", flat=True)
+        )
+        failures = [{"id": pk, "error": "not-found"} for pk in chunk if pk not in present]
+        # update() skips auto_now; report cache watermarks rely on updated_at.
+        LogbookEntry.objects.filter(pk__in=present).update(
+            supervisor_id=supervisor_id, updated_at=timezone.now(), version=F("version") + 1
+        )
+        sync_items(ReviewInboxItem.TYPE_LOGBOOK, present)
+        successes = [{"id": pk, "supervisor": supervisor_id} for pk in chunk if pk in present]
+        return successes, failures, {}
+
+    def _run_import(self, operation: BulkOperation, uploaded_file) -> None:
+        params = operation.params
+        write = not params.get("dry_run", True)
+        validated = operation.checkpoint.get("phase") == "write"
+        if write and not params.get("allow_partial") and not validated:
+            rows, failure_count, details, chunks = self._validate_import(operation, uploaded_file)
+            if failure_count:
+                operation.failure_count = failure_count
+                operation.checkpoint = {**operation.checkpoint, "chunks": chunks}
+                operation.save(update_fields=["checkpoint", "updated_at"])
+                finalise_log(operation)
+                details["stats"] = _throughput(rows, operation.started_at)
+                operation.mark_failed(details)
                 return
+            operation.total_items = rows
+            operation.checkpoint = {**operation.checkpoint, "phase": "write"}
+            operation.save(update_fields=["total_items", "checkpoint", "updated_at"])
+
+        pg_cache: Dict[str, Optional[User]] = {}
+        rows = islice(_parse_rows(uploaded_file), operation.processed_items, None)
+        for batch in _chunked(rows, self.import_batch_size):
+            start = operation.processed_items
+            with transaction.atomic():
+                successes: List[dict] = []
+                failures: List[dict] = []
+                entries = self._build_import_batch(batch, pg_cache, successes, failures)
+                state = {}
+                if write and entries:
+                    created = LogbookEntry.objects.bulk_create(
+                        entries, batch_size=self.import_batch_size
+                    )
+                    queue_new_items(ReviewInboxItem.TYPE_LOGBOOK, created)
+                    state = _import_followups(operation.checkpoint, created)
+                self._commit_chunk(operation, start, len(batch), successes, failures, state)
+
+        if write:
+            self._finish_import(operation.checkpoint)
+        details = dict(operation.details)
+        details["stats"] = _throughput(operation.processed_items, operation.started_at)
+        finalise_log(operation)
+        operation.mark_completed(operation.success_count, operation.failure_count, details)
+
+    def _validate_import(self, operation: BulkOperation, uploaded_file):
+        """
+        Dry pass over the whole file. Failures are spilled to the outcome log
+        per batch; returns ``(rows, failure_count, details_sample, chunks)``.
+        """
+        pg_cache: Dict[str, Optional[User]] = {}
+        rows_seen = failure_count = 0
+        details: dict = {}
+        chunks: List[dict] = []
+        for batch in _chunked(_parse_rows(uploaded_file), self.import_batch_size):
+            failures: List[dict] = []
+            self._build_import_batch(batch, pg_cache, [], failures)
+            if failures:
+                log_name = write_part(operation, rows_seen, [], failures)
+                chunks.append(
+                    {
+                        "start": rows_seen,
+                        "size": len(batch),
+                        "success": 0,
+                        "failure": len(failures),
+                        "log": log_name,
+                    }
+                )
+                details = with_sample(details, [], failures)
+                failure_count += len(failures)
+            rows_seen += len(batch)
+        return rows_seen, failure_count, details, chunks
+
+    def _commit_chunk(
+        self,
+        operation: BulkOperation,
+        start: int,
+        size: int,
+        successes: List[dict],
+        failures: List[dict],
+        state: Optional[dict] = None,
+    ) -> None:
+        """
+        Record a chunk's results and advance the checkpoint, inside the chunk's
+        transaction. Full outcomes go to a log part in storage and ``details``
+        only keeps a bounded sample. The update is conditional on the
+        checkpoint still being at ``start``; if another worker already moved
+        it, the chunk is rolled back.
+        """
+        log_name = write_part(operation, start, successes, failures)
+        chunks = operation.checkpoint.get("chunks", []) + [
+            {
+                "start": start,
+                "size": size,
+                "success": len(successes),
+                "failure": len(failures),
+                "log": log_name,
+            }
+        ]
+        checkpoint = {**operation.checkpoint, **(state or {}), "chunks": chunks}
+        values = {
+            "processed_items": start + size,
+            "success_count": operation.success_count + len(successes),
+            "failure_count": operation.failure_count + len(failures),
+            "details": with_sample(operation.details, successes, failures),
+            "checkpoint": checkpoint,
+            "updated_at": timezone.now(),
+        }
+        if not BulkOperation.objects.filter(pk=operation.pk, processed_items=start).update(
+            **values
+        ):
+            discard_part(log_name)
+            raise OperationSuperseded(operation.pk)
+        for name, value in values.items():
+            setattr(operation, name, value)
+
+    def _build_import_batch(
+        self,
+        rows: List[dict],
+        pg_cache: Dict[str, Optional[User]],
+        successes: List[dict],
+        failures: List[dict],
+    ) -> List[LogbookEntry]:
+        unseen = {row.get("pg_username", "") for row in rows} - pg_cache.keys()
+        if unseen:
+            found = {
+                user.username: user
+                for user in User.objects.filter(username__in=unseen, role="pg").select_related(
+                    "supervisor"
+                )
+            }
+            for username in unseen:
+                pg_cache[username] = found.get(username)
+
+        valid_statuses = {choice for choice, _ in LogbookEntry.STATUS_CHOICES}
+        entries: List[LogbookEntry] = []
+        for row in rows:
+            pg = pg_cache.get(row.get("pg_username", ""))
+            if pg is None:
+                failures.append({"row": row, "error": "invalid-pg"})
+                continue
             try:
                 entry_date = datetime.strptime(row["date"], "%Y-%m-%d").date()
             except (KeyError, ValueError):
                 failures.append({"row": row, "error": "invalid-date"})
-                errors_triggered = True
-                return
-            status = row.get("status", "draft")
-            payload = {
-                "pg": pg,
-                "case_title": row.get("case_title") or "Untitled",
-                "date": entry_date,
-                "status": status,
-                "location_of_activity": row.get("location") or "Not specified",
-                "patient_history_summary": row.get("patient_history") or "Pending summary",
-                "management_action": row.get("management_action") or "Pending action",
-                "topic_subtopic": row.get("topic_subtopic") or "General",
-            }
+                continue
+            status = row.get("status") or "draft"
+            if status not in valid_statuses:
+                failures.append({"row": row, "error": {"status": [f"Invalid status '{status}'"]}})
+                continue
+
+            entry = LogbookEntry(
+                pg=pg,
+                supervisor=pg.supervisor,
+                created_by=self.actor,
+                case_title=row.get("case_title") or "Untitled",
+                date=entry_date,
+                status=status,
+                location_of_activity=row.get("location") or "Not specified",
+                patient_history_summary=row.get("patient_history") or "Pending summary",
+                management_action=row.get("management_action") or "Pending action",
+                topic_subtopic=row.get("topic_subtopic") or "General",
+            )
             try:
-                if dry_run:
-                    entry = LogbookEntry(**payload)
-                    entry.full_clean()
-                else:
-                    entry = LogbookEntry.objects.create(**payload, created_by=self.actor)
-                successes.append(
-                    {
-                        "pg": pg.username,
-                        "case_title": payload["case_title"],
-                        "status": status,
-                    }
-                )
+                # Foreign keys were resolved above; validating them again costs a query each.
+                entry.full_clean(exclude=IMPORT_CLEAN_EXCLUDE, validate_unique=False)
             except ValidationError as exc:
                 failures.append({"row": row, "error": exc.message_dict})
-                errors_triggered = True
+                continue
+            # Same timestamps save() would set, without the per-row notification.
+            entry._handle_status_change(None, entry.status, notify=False)
+            entries.append(entry)
+            successes.append(
+                {"pg": pg.username, "case_title": entry.case_title, "status": entry.status}
+            )
+        return entries
 
-        if dry_run or allow_partial:
-            for row in rows:
-                process_row(row)
-        else:
-            try:
-                with transaction.atomic():
-                    for row in rows:
-                        process_row(row)
-                    if errors_triggered:
-                        raise BulkProcessingError("Import failed; rolling back")
-            except BulkProcessingError:
-                operation.mark_failed({"failures": failures})
-                return operation
-
-        operation.mark_completed(
-            len(successes),
-            len(failures),
-            {"successes": successes, "failures": failures},
-        )
-        return operation
+    def _finish_import(self, checkpoint: dict) -> None:
+        """Statistics and supervisor notifications, once for the whole import."""
 
+        pg_ids = checkpoint.get("pg_ids", [])
+        for stats in LogbookStatistics.objects.filter(pg_id__in=pg_ids).select_related("pg"):
+            stats.update_statistics()
+        self._send_followup_notifications(checkpoint, imported=True)
 
-def _chunked(items: Sequence[int], chunk_size: int) -> Iterator[List[int]]:
-    chunk: List[int] = []
+    def _send_followup_notifications(self, checkpoint: dict, imported: bool = False) -> None:
+        """One notification per recipient for the whole operation, not one per entry."""
+
+        pending = checkpoint.get("pending", {})
+        approved = checkpoint.get("approved", {})
+        if not pending and not approved:
+            return
+        user_ids = {int(pk) for pk in approved} | {int(pk) for pk in pending}
+        for summary in pending.values():
+            user_ids.update(summary["pg_ids"])
+        users = User.objects.in_bulk(user_ids)
+        notifier = NotificationService(actor=self.actor)
+
+        label = "imported logbook" if imported else "logbook"
+        for supervisor_id, summary in pending.items():
+            supervisor = users.get(int(supervisor_id))
+            if supervisor is None:
+                continue
+            pg_names = sorted(
+                {users[pk].get_full_name() or users[pk].username for pk in summary["pg_ids"]}
+            )
+            notifier.send(
+                recipient=supervisor,
+                verb="logbook-submitted",
+                title=f"{summary['count']} {label} entries awaiting review",
+                template="emails/logbook_bulk_pending",
+                context={
+                    "count": summary["count"],
+                    "pg_names": ", ".join(pg_names),
+                    "imported": imported,
+                },
+            )
+        for pg_id, count in approved.items():
+            pg = users.get(int(pg_id))
+            if pg is None:
+                continue
+            notifier.send(
+                recipient=pg,
+                verb="logbook-approved",
+                title=f"{count} logbook entries approved",
+                template="emails/logbook_bulk_approved",
+                context={"count": count, "reviewer": self.actor},
+            )
+
+
+def _review_outcome(old_status: str, new_status: str, has_supervisor: bool) -> str:
+    """The status ``save()`` would end up writing for this transition."""
+
+    probe = LogbookEntry(status=old_status)
+    if has_supervisor:
+        probe.supervisor = User()  # only its truthiness is consulted
+    probe._handle_status_change(old_status, new_status, notify=False)
+    return probe.status
+
+
+def _note_pending(pending: dict, supervisor_id: int, pg_id: int) -> None:
+    summary = pending.setdefault(str(supervisor_id), {"count": 0, "pg_ids": []})
+    summary["count"] += 1
+    if pg_id not in summary["pg_ids"]:
+        summary["pg_ids"].append(pg_id)
+
+
+def _copy_followups(checkpoint: dict) -> dict:
+    return {
+        "pending": {
+            pk: {"count": summary["count"], "pg_ids": list(summary["pg_ids"])}
+            for pk, summary in checkpoint.get("pending", {}).items()
+        },
+        "approved": dict(checkpoint.get("approved", {})),
+    }
+
+
+def _import_followups(checkpoint: dict, entries: List[LogbookEntry]) -> dict:
+    """Fold a committed batch into the checkpoint's record of deferred side effects."""
+
+    state = _copy_followups(checkpoint)
+    pg_ids = set(checkpoint.get("pg_ids", []))
+    for entry in entries:
+        pg_ids.add(entry.pg_id)
+        if entry.status == "pending" and entry.supervisor_id:
+            _note_pending(state["pending"], entry.supervisor_id, entry.pg_id)
+    state["pg_ids"] = sorted(pg_ids)
+    return state
+
+
+def _review_followups(checkpoint: dict, rows: Dict[int, tuple], changed: Dict[int, str]) -> dict:
+    """Same notifications the per-row ``post_save`` handler sent, folded per recipient."""
+
+    state = _copy_followups(checkpoint)
+    for pk, final_status in changed.items():
+        old_status, supervisor_id, pg_id, _ = rows[pk]
+        if final_status == old_status:
+            continue
+        if final_status == "pending" and supervisor_id:
+            _note_pending(state["pending"], supervisor_id, pg_id)
+        elif final_status == "approved":
+            key = str(pg_id)
+            state["approved"][key] = state["approved"].get(key, 0) + 1
+    return state
+
+
+def _throughput(rows: int, started_at) -> dict:
+    elapsed = max((timezone.now() - started_at).total_seconds(), 1e-6)
+    return {
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1),
+    }
+
+
+# Relation validators run one existence query each; the importer sets these itself.
+IMPORT_CLEAN_EXCLUDE = [field.name for field in LogbookEntry._meta.fields if field.is_relation]
+
+
+def _chunked(items: Iterable, chunk_size: int) -> Iterator[List]:
+    chunk: List = []
     for item in items:
         chunk.append(item)
         if len(chunk) == chunk_size:
@@ -189,38 +550,13 @@ REQUIRED_COLUMNS = {"pg_username", "case_title", "date", "status"}
 
 
 def _parse_rows(uploaded_file) -> Iterator[dict]:
-    name = getattr(uploaded_file, "name", "uploaded")
-    content = uploaded_file.read()
-    if isinstance(content, bytes):
-        stream = io.BytesIO(content)
-    else:
-        stream = io.StringIO(content)
-    stream.seek(0)
-    if name.endswith(".csv"):
-        text_stream = (
-            io.TextIOWrapper(stream, encoding="utf-8") if isinstance(stream, io.BytesIO) else stream
-        )
-        reader = csv.DictReader(text_stream)
-        _validate_headers(reader.fieldnames)
-        for row in reader:
-            yield {key: (value or "").strip() for key, value in row.items() if key}
-    elif name.endswith(".xlsx"):
-        workbook = load_workbook(stream)
-        sheet = workbook.active
-        headers = [cell.value for cell in next(sheet.iter_rows(max_row=1))]
-        _validate_headers(headers)
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            payload = {
-                headers[idx]: (value or "") for idx, value in enumerate(row) if idx < len(headers)
-            }
-            yield {key: str(value).strip() for key, value in payload.items()}
-    else:
-        raise ValidationError("Unsupported file format")
+    return iter_upload_rows(uploaded_file, required_columns=REQUIRED_COLUMNS)
+
 
+def stalled_operations(stale_after: timedelta):
+    """Unfinished operations whose checkpoint has not moved for ``stale_after``."""
 
-def _validate_headers(headers: Iterable[str]) -> None:
-    if not headers:
-        raise ValidationError("No headers found in file")
-    missing = REQUIRED_COLUMNS - set(header.strip() for header in headers if header)
-    if missing:
-        raise ValidationError(f"Missing columns: {', '.join(sorted(missing))}")
+    return BulkOperation.objects.filter(
+        status__in=[BulkOperation.STATUS_PENDING, BulkOperation.STATUS_RUNNING],
+        updated_at__lt=timezone.now() - stale_after,
+    )
@@ -0,0 +1,32 @@
+"""Celery tasks for the bulk app."""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+
+from sims.bulk.models import BulkOperation
+from sims.bulk.services import BulkService, stalled_operations
+
+
+# acks_late + reject_on_worker_lost: a worker killed mid-operation leaves the
+# message on the queue, and the redelivered task resumes from the checkpoint.
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def run_bulk_operation(operation_id: int) -> str:
+    """Run or resume a queued bulk operation; returns its final status."""
+
+    operation = BulkOperation.objects.select_related("user").get(pk=operation_id)
+    if operation.is_finished:
+        return operation.status
+    return BulkService(operation.user).run(operation).status
+
+
+@shared_task
+def resume_stalled_bulk_operations() -> int:
+    """Re-enqueue operations whose checkpoint has stopped moving."""
+
+    stale_after = timedelta(seconds=settings.BULK_OPERATION_STALE_SECONDS)
+    operation_ids = list(stalled_operations(stale_after).values_list("pk", flat=True))
+    for operation_id in operation_ids:
+        run_bulk_operation.delay(operation_id)
+    return len(operation_ids)
@@ -2,19 +2,34 @@ from __future__ import annotations
 
 import csv
 import io
+import shutil
+import tempfile
 from datetime import date
+from unittest import mock
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
 from sims.bulk.models import BulkOperation
 from sims.bulk.services import BulkService
+from sims.bulk.tasks import run_bulk_operation
 from sims.logbook.models import LogbookEntry
 from sims.users.models import User
 
 
 class BulkOperationTests(APITestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Outcome logs and stored uploads go to a throwaway media root.
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        cls.addClassCleanup(media_override.disable)
+
     def setUp(self) -> None:
         self.admin = User.objects.create_user(username="admin", password="testpass", role="admin")
         self.supervisor = User.objects.create_user(
@@ -52,19 +67,134 @@ class BulkOperationTests(APITestCase):
         self.assertEqual(operation.success_count, 3)
         self.assertEqual(LogbookEntry.objects.filter(status="approved").count(), 3)
 
+    def test_bulk_review_reports_concurrent_changes(self) -> None:
+        service = BulkService(self.admin, chunk_size=10)
+        stale = self.entries[0]
+        original_rows = service._chunk_rows
+
+        def read_then_edit(chunk):
+            rows = original_rows(chunk)
+            LogbookEntry.objects.get(pk=stale.pk).save()  # edited after the bulk read
+            return rows
+
+        with mock.patch.object(service, "_chunk_rows", side_effect=read_then_edit):
+            operation = service.review_entries([entry.pk for entry in self.entries], "approved")
+
+        self.assertEqual(operation.success_count, 2)
+        self.assertEqual(operation.details["failures"], [{"id": stale.pk, "error": "conflict"}])
+        self.assertEqual(LogbookEntry.objects.get(pk=stale.pk).status, "draft")
+
+    def test_bulk_review_applies_transitions_and_batches_followups(self) -> None:
+        from sims.inbox.models import ReviewInboxItem
+        from sims.notifications.models import Notification
+
+        for entry in self.entries:
+            entry.status = "pending"
+            entry.save()
+        self.assertEqual(ReviewInboxItem.objects.filter(supervisor=self.supervisor).count(), 3)
+        missing_id = max(entry.pk for entry in self.entries) + 100
+        ids = [entry.pk for entry in self.entries] + [missing_id]
+
+        operation = BulkService(self.admin, chunk_size=2).review_entries(ids, "approved")
+
+        self.assertEqual(operation.success_count, 3)
+        self.assertEqual(operation.details["failures"], [{"id": missing_id, "error": "not-found"}])
+        for entry in LogbookEntry.objects.filter(pk__in=ids):
+            self.assertEqual(entry.status, "approved")
+            self.assertIsNotNone(entry.supervisor_action_at)
+            self.assertEqual(entry.updated_at, entry.supervisor_action_at)
+            self.assertEqual(entry.version, 3)
+        self.assertFalse(ReviewInboxItem.objects.exists())
+        approvals = Notification.objects.filter(recipient=self.pg, verb="logbook-approved")
+        self.assertEqual(approvals.count(), 1)
+        self.assertIn("3 logbook entries approved", approvals.get().title)
+
+    def test_bulk_assignment_keeps_inbox_rows_with_pg_supervisor(self) -> None:
+        from sims.inbox.models import ReviewInboxItem
+
+        other = User.objects.create_user(
+            username="sup2", password="testpass", role="supervisor", specialty="surgery"
+        )
+        for entry in self.entries:
+            entry.status = "pending"
+            entry.save()
+
+        operation = BulkService(self.admin).assign_supervisor(
+            [entry.pk for entry in self.entries], other
+        )
+
+        self.assertEqual(operation.success_count, 3)
+        self.assertEqual(LogbookEntry.objects.filter(supervisor=other).count(), 3)
+        touched = LogbookEntry.objects.filter(updated_at__gt=self.entries[-1].updated_at)
+        self.assertEqual(touched.count(), 3)
+        # Only the PG's own supervisor may verify, so the inbox follows the PG.
+        self.assertEqual(ReviewInboxItem.objects.filter(supervisor=self.supervisor).count(), 3)
+
+    def test_bulk_review_of_10k_ids_uses_set_based_updates(self) -> None:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        template = self.entries[0]
+        LogbookEntry.objects.bulk_create(
+            [
+                LogbookEntry(
+                    pg=self.pg,
+                    supervisor=self.supervisor,
+                    case_title=f"Bench {i}",
+                    date=template.date,
+                    location_of_activity="Ward",
+                    patient_history_summary="History",
+                    management_action="Action",
+                    topic_subtopic="Topic",
+                )
+                for i in range(10_000)
+            ],
+            batch_size=1000,
+        )
+        ids = list(
+            LogbookEntry.objects.filter(case_title__startswith="Bench").values_list("pk", flat=True)
+        )
+        service = BulkService(self.admin, chunk_size=1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            operation = service.review_entries(ids, "approved")
+
+        self.assertEqual(operation.success_count, 10_000)
+        self.assertEqual(LogbookEntry.objects.filter(status="approved").count(), 10_000)
+        # A handful of statements per 1000-id chunk, not one UPDATE per entry.
+        self.assertLess(len(queries.captured_queries), 200)
+        self.assertGreater(operation.details["stats"]["rows_per_second"], 0)
+
+    def _run_queued(self, url: str, payload: dict, **kwargs):
+        """POST to a queueing endpoint and run the dispatched task in-process."""
+
+        with mock.patch(
+            "sims.bulk.tasks.run_bulk_operation.delay", side_effect=run_bulk_operation
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, payload, **kwargs)
+        self.assertEqual(delay.call_count, 1)
+        return response
+
     def test_bulk_assignment_api(self) -> None:
         url = reverse("bulk_api:assignment")
         payload = {
             "entry_ids": [entry.pk for entry in self.entries],
             "supervisor_id": self.supervisor.pk,
         }
-        response = self.client.post(url, payload, format="json")
-        self.assertEqual(response.status_code, 200)
+        response = self._run_queued(url, payload, format="json")
+        self.assertEqual(response.status_code, 202)
         self.assertEqual(
             LogbookEntry.objects.filter(supervisor=self.supervisor).count(),
             len(self.entries),
         )
 
+        progress = self.client.get(response.data["progress_url"])
+        self.assertEqual(progress.status_code, 200)
+        self.assertEqual(progress.data["status"], BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(progress.data["processed_items"], len(self.entries))
+        self.assertEqual(progress.data["percent"], 100.0)
+
     def test_bulk_import_dry_run(self) -> None:
         csv_buffer = io.StringIO()
         writer = csv.DictWriter(
@@ -101,11 +231,14 @@ class BulkOperationTests(APITestCase):
         uploaded = SimpleUploadedFile(
             "import.csv", csv_buffer.getvalue().encode("utf-8"), content_type="text/csv"
         )
-        response = self.client.post(
+        response = self._run_queued(
             url, {"file": uploaded, "dry_run": False, "allow_partial": True}
         )
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 202)
         self.assertEqual(LogbookEntry.objects.filter(case_title="Imported Case").count(), 1)
+        operation = BulkOperation.objects.get(pk=response.data["id"])
+        self.assertEqual(operation.failure_count, 1)
+        self.assertFalse(operation.upload)
 
     def test_bulk_review_permission_denied(self) -> None:
         """Test that PG cannot perform bulk review."""
@@ -142,3 +275,217 @@ class BulkOperationTests(APITestCase):
         self.assertEqual(BulkOperation.objects.count(), initial_count + 1)
         self.assertIsNotNone(operation.completed_at)
         self.assertEqual(operation.status, BulkOperation.STATUS_COMPLETED)
+
+    def _import_file(self, rows: int, status: str = "pending") -> SimpleUploadedFile:
+        csv_buffer = io.StringIO()
+        writer = csv.DictWriter(
+            csv_buffer, fieldnames=["pg_username", "case_title", "date", "status"]
+        )
+        writer.writeheader()
+        for index in range(rows):
+            writer.writerow(
+                {
+                    "pg_username": self.pg.username,
+                    "case_title": f"Imported {index}",
+                    "date": date(2024, 1, 1).isoformat(),
+                    "status": status,
+                }
+            )
+        return SimpleUploadedFile("import.csv", csv_buffer.getvalue().encode("utf-8"))
+
+    def test_bulk_import_query_count_is_independent_of_rows(self) -> None:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from sims.inbox.models import ReviewInboxItem
+
+        service = BulkService(self.admin, import_batch_size=100)
+        service.import_logbook_entries(self._import_file(10), dry_run=False)
+        with CaptureQueriesContext(connection) as queries:
+            operation = service.import_logbook_entries(self._import_file(250), dry_run=False)
+
+        # Only batched INSERTs grow with the file (SQLite caps rows per INSERT).
+        self.assertLess(len(queries.captured_queries), 40)
+        self.assertEqual(operation.success_count, 250)
+        self.assertEqual(operation.details["stats"]["rows"], 250)
+        self.assertGreater(operation.details["stats"]["rows_per_second"], 0)
+
+        entry = LogbookEntry.objects.filter(case_title="Imported 0").last()
+        self.assertEqual(entry.supervisor, self.supervisor)
+        self.assertIsNotNone(entry.submitted_to_supervisor_at)
+        self.assertEqual(ReviewInboxItem.objects.filter(supervisor=self.supervisor).count(), 260)
+
+    def test_bulk_import_notifies_each_supervisor_once(self) -> None:
+        from sims.notifications.models import Notification
+
+        service = BulkService(self.admin, import_batch_size=10)
+        service.import_logbook_entries(self._import_file(25), dry_run=False)
+
+        notifications = Notification.objects.filter(recipient=self.supervisor)
+        self.assertEqual(notifications.count(), 1)
+        self.assertIn("25 imported", notifications.get().title)
+
+    def test_bulk_import_rolls_back_on_error_without_partial(self) -> None:
+        upload = self._import_file(3, status="bogus")
+        operation = BulkService(self.admin).import_logbook_entries(upload, dry_run=False)
+
+        self.assertEqual(operation.status, BulkOperation.STATUS_FAILED)
+        self.assertEqual(len(operation.details["failures"]), 3)
+        self.assertFalse(LogbookEntry.objects.filter(case_title__startswith="Imported").exists())
+
+    def _crash_after(self, service: BulkService, method: str, calls: int):
+        """Patch ``method`` so the worker "dies" (SystemExit) after ``calls`` chunks."""
+
+        original = getattr(service, method)
+        seen = []
+
+        def wrapped(*args, **kwargs):
+            if len(seen) == calls:
+                raise SystemExit("worker killed")
+            seen.append(1)
+            return original(*args, **kwargs)
+
+        return mock.patch.object(service, method, side_effect=wrapped)
+
+    def test_review_resumes_from_checkpoint_after_crash(self) -> None:
+        ids = [entry.pk for entry in self.entries]
+        service = BulkService(self.admin, chunk_size=1)
+        with self._crash_after(service, "_review_chunk", 1), self.assertRaises(SystemExit):
+            service.review_entries(ids, status="approved")
+
+        operation = BulkOperation.objects.get()
+        self.assertEqual(operation.status, BulkOperation.STATUS_RUNNING)
+        self.assertEqual(operation.processed_items, 1)
+        self.assertEqual(len(operation.checkpoint["chunks"]), 1)
+        self.assertEqual(LogbookEntry.objects.filter(status="approved").count(), 1)
+
+        run_bulk_operation(operation.pk)
+
+        operation.refresh_from_db()
+        self.assertEqual(operation.status, BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(operation.attempts, 2)
+        self.assertEqual(operation.success_count, 3)
+        # The worker resumes at item 1 with its own (default) chunk size.
+        self.assertEqual([chunk["start"] for chunk in operation.checkpoint["chunks"]], [0, 1])
+        self.assertEqual(LogbookEntry.objects.filter(status="approved").count(), 3)
+
+    def test_chunk_is_rolled_back_when_another_worker_moved_the_checkpoint(self) -> None:
+        service = BulkService(self.admin)
+        operation = service._create_operation(
+            BulkOperation.OP_REVIEW,
+            {"entry_ids": [entry.pk for entry in self.entries], "status": "approved"},
+            total_items=3,
+        )
+        BulkOperation.objects.filter(pk=operation.pk).update(processed_items=3)
+
+        service.run(operation)
+
+        self.assertEqual(operation.processed_items, 3)
+        self.assertFalse(LogbookEntry.objects.filter(status="approved").exists())
+
+    def test_import_resume_defers_side_effects_to_the_end(self) -> None:
+        from sims.notifications.models import Notification
+
+        upload = self._import_file(25)
+        service = BulkService(self.admin, import_batch_size=10)
+        with self._crash_after(service, "_commit_chunk", 1), self.assertRaises(SystemExit):
+            service.import_logbook_entries(upload, dry_run=False, allow_partial=True)
+
+        operation = BulkOperation.objects.get()
+        self.assertEqual(operation.processed_items, 10)
+        self.assertFalse(Notification.objects.filter(recipient=self.supervisor).exists())
+
+        BulkService(self.admin, import_batch_size=10).run(operation, upload)
+
+        self.assertEqual(operation.status, BulkOperation.STATUS_COMPLETED)
+        self.assertEqual(operation.success_count, 25)
+        self.assertEqual(LogbookEntry.objects.filter(case_title__startswith="Imported").count(), 25)
+        notification = Notification.objects.get(recipient=self.supervisor)
+        self.assertIn("25 imported", notification.title)
+
+    def test_stalled_operations_are_requeued(self) -> None:
+        from datetime import timedelta
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        stale = BulkService(self.admin)._create_operation(BulkOperation.OP_REVIEW, {})
+        BulkService(self.admin)._create_operation(BulkOperation.OP_REVIEW, {})
+        BulkOperation.objects.filter(pk=stale.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        with mock.patch("sims.bulk.tasks.run_bulk_operation.delay") as delay:
+            call_command("resume_bulk_operations", stale_after=600, stdout=io.StringIO())
+
+        delay.assert_called_once_with(stale.pk)
+
+    def test_outcome_log_is_spilled_and_paged(self) -> None:
+        from sims.bulk.results import RESULT_SAMPLE_SIZE
+
+        for index in range(27):
+            self.entries.append(
+                LogbookEntry.objects.create(
+                    pg=self.pg,
+                    case_title=f"Extra {index}",
+                    date=date(2024, 1, 1),
+                    location_of_activity="Ward",
+                    patient_history_summary="History",
+                    management_action="Action",
+                    topic_subtopic="Topic",
+                )
+            )
+        ids = [entry.pk for entry in self.entries] + [999_999]
+        operation = BulkService(self.admin, chunk_size=7).review_entries(ids, "approved")
+
+        self.assertEqual(operation.success_count, 30)
+        self.assertEqual(len(operation.details["successes"]), RESULT_SAMPLE_SIZE)
+        self.assertTrue(operation.results_file.name.endswith(".jsonl.gz"))
+
+        url = reverse("bulk_api:operation_results", kwargs={"pk": operation.pk})
+        seen = []
+        page = self.client.get(url, {"outcome": "success", "limit": 12}).data
+        while True:
+            self.assertEqual(page["count"], 30)
+            seen.extend(record["id"] for record in page["results"])
+            if not page["next"]:
+                break
+            page = self.client.get(page["next"]).data
+        self.assertEqual(sorted(seen), sorted(ids[:-1]))
+
+        failures = self.client.get(url, {"outcome": "failure"}).data
+        self.assertEqual(
+            failures["results"], [{"outcome": "failure", "id": 999_999, "error": "not-found"}]
+        )
+        self.assertEqual(self.client.get(url, {"outcome": "bogus"}).status_code, 400)
+
+    def test_failed_import_log_holds_every_failure(self) -> None:
+        upload = self._import_file(30, status="bogus")
+        operation = BulkService(self.admin, import_batch_size=8).import_logbook_entries(
+            upload, dry_run=False
+        )
+
+        self.assertEqual(operation.status, BulkOperation.STATUS_FAILED)
+        self.assertEqual(operation.failure_count, 30)
+        url = reverse("bulk_api:operation_results", kwargs={"pk": operation.pk})
+        response = self.client.get(url, {"limit": 100})
+        self.assertEqual(len(response.data["results"]), 30)
+        self.assertEqual(response.data["results"][0]["row"]["status"], "bogus")
+
+    def test_admin_changelist_defers_details(self) -> None:
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        from django.urls import resolve
+
+        BulkService(self.admin).review_entries([self.entries[0].pk], "approved")
+        url = reverse("admin:bulk_bulkoperation_changelist")
+        request = RequestFactory().get(url)
+        request.resolver_match = resolve(url)
+        request.user = self.admin
+
+        queryset = site._registry[BulkOperation].get_queryset(request)
+
+        deferred, is_defer = queryset.query.deferred_loading
+        self.assertTrue(is_defer)
+        self.assertIn("details", deferred)
+        self.assertEqual(len(queryset), 1)
@@ -2,7 +2,13 @@
 
 from django.urls import path
 
-from sims.bulk.views import BulkAssignmentView, BulkImportView, BulkReviewView
+from sims.bulk.views import (
+    BulkAssignmentView,
+    BulkImportView,
+    BulkOperationDetailView,
+    BulkOperationResultsView,
+    BulkReviewView,
+)
 
 app_name = "bulk_api"
 
@@ -10,4 +16,10 @@ urlpatterns = [
     path("review/", BulkReviewView.as_view(), name="review"),
     path("assignment/", BulkAssignmentView.as_view(), name="assignment"),
     path("import/", BulkImportView.as_view(), name="import"),
+    path("operations/<int:pk>/", BulkOperationDetailView.as_view(), name="operation_detail"),
+    path(
+        "operations/<int:pk>/results/",
+        BulkOperationResultsView.as_view(),
+        name="operation_results",
+    ),
 ]
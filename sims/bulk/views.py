@@ -4,12 +4,15 @@ from __future__ import annotations
 
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import permissions, status
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
 from sims.bulk.models import BulkOperation
+from sims.bulk.results import OUTCOME_FAILURE, OUTCOME_SUCCESS, page_of_results
 from sims.bulk.serializers import (
     BulkAssignmentSerializer,
     BulkImportSerializer,
@@ -20,30 +23,53 @@ from sims.bulk.services import BulkService
 User = get_user_model()
 
 
-def _operation_payload(operation: BulkOperation) -> dict:
+def _absolute(request: Request | None, url: str) -> str:
+    return request.build_absolute_uri(url) if request else url
+
+
+def _operation_payload(operation: BulkOperation, request: Request | None = None) -> dict:
+    progress_url = reverse("bulk_api:operation_detail", kwargs={"pk": operation.pk})
+    results_url = reverse("bulk_api:operation_results", kwargs={"pk": operation.pk})
     return {
+        "id": operation.pk,
         "operation": operation.operation,
         "status": operation.status,
+        "total_items": operation.total_items,
+        "processed_items": operation.processed_items,
+        "percent": operation.percent,
         "success_count": operation.success_count,
         "failure_count": operation.failure_count,
-        "details": operation.details,
+        # A bounded sample once finished; the full log is paged via results_url.
+        "details": operation.details if operation.is_finished else None,
+        "error": operation.error or None,
         "created_at": operation.created_at,
+        "started_at": operation.started_at,
         "completed_at": operation.completed_at,
+        "progress_url": _absolute(request, progress_url),
+        "results_url": _absolute(request, results_url),
     }
 
 
+def _queued(operation: BulkOperation, request: Request) -> Response:
+    return Response(_operation_payload(operation, request), status=status.HTTP_202_ACCEPTED)
+
+
 class BulkReviewView(APIView):
+    """POST /api/bulk/review/ — queue a bulk status change; poll ``progress_url``."""
+
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request: Request) -> Response:
         serializer = BulkReviewSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         service = BulkService(request.user)
-        operation = service.review_entries(**serializer.validated_data)
-        return Response(_operation_payload(operation), status=status.HTTP_200_OK)
+        operation = service.review_entries(**serializer.validated_data, background=True)
+        return _queued(operation, request)
 
 
 class BulkAssignmentView(APIView):
+    """POST /api/bulk/assignment/ — queue a bulk supervisor assignment."""
+
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request: Request) -> Response:
@@ -55,12 +81,19 @@ class BulkAssignmentView(APIView):
         )
         service = BulkService(request.user)
         operation = service.assign_supervisor(
-            entry_ids=serializer.validated_data["entry_ids"], supervisor=supervisor
+            entry_ids=serializer.validated_data["entry_ids"],
+            supervisor=supervisor,
+            background=True,
         )
-        return Response(_operation_payload(operation), status=status.HTTP_200_OK)
+        return _queued(operation, request)
 
 
 class BulkImportView(APIView):
+    """
+    POST /api/bulk/import/ — dry runs are validated inline and answered
+    directly; real imports are queued and answered with 202.
+    """
+
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request: Request) -> Response:
@@ -69,23 +102,104 @@ class BulkImportView(APIView):
         serializer = BulkImportSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         uploaded_file = serializer.validated_data["file"]
+        dry_run = serializer.validated_data["dry_run"]
         service = BulkService(request.user)
 
         try:
             operation = service.import_logbook_entries(
                 uploaded_file,
-                dry_run=serializer.validated_data["dry_run"],
+                dry_run=dry_run,
                 allow_partial=serializer.validated_data["allow_partial"],
+                background=not dry_run,
             )
         except DjangoValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        if not dry_run:
+            return _queued(operation, request)
         status_code = (
             status.HTTP_200_OK
             if operation.status == BulkOperation.STATUS_COMPLETED
             else status.HTTP_400_BAD_REQUEST
         )
-        return Response(_operation_payload(operation), status=status_code)
+        return Response(_operation_payload(operation, request), status=status_code)
+
+
+def _visible_operations(user):
+    operations = BulkOperation.objects.all()
+    if not (user.is_superuser or getattr(user, "role", None) == "admin"):
+        operations = operations.filter(user=user)
+    return operations
+
+
+class BulkOperationDetailView(APIView):
+    """GET /api/bulk/operations/<pk>/ — live progress of one bulk operation."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        operation = get_object_or_404(_visible_operations(request.user), pk=pk)
+        return Response(_operation_payload(operation, request))
+
+
+class BulkOperationResultsView(APIView):
+    """
+    GET /api/bulk/operations/<pk>/results/?outcome=<success|failure>&offset=<n>&limit=<n>
+
+    Pages through the full per-item outcome log, decompressing only as far as
+    the requested page. Available while the operation is still running.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request: Request, pk: int) -> Response:
+        operation = get_object_or_404(
+            _visible_operations(request.user).only(
+                "pk", "user", "success_count", "failure_count", "results_file", "checkpoint"
+            ),
+            pk=pk,
+        )
+        outcome = request.query_params.get("outcome") or None
+        counts = {
+            OUTCOME_SUCCESS: operation.success_count,
+            OUTCOME_FAILURE: operation.failure_count,
+        }
+        if outcome and outcome not in counts:
+            return Response({"error": "Unknown outcome"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            return Response(
+                {"error": "offset and limit must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(max(limit, 1), self.max_limit)
+
+        count = counts[outcome] if outcome else sum(counts.values())
+        url = request.build_absolute_uri()
+        next_url = (
+            replace_query_param(url, "offset", offset + limit) if offset + limit < count else None
+        )
+        previous_url = (
+            replace_query_param(url, "offset", max(offset - limit, 0)) if offset > 0 else None
+        )
+        return Response(
+            {
+                "count": count,
+                "next": next_url,
+                "previous": previous_url,
+                "results": page_of_results(operation, offset, limit, outcome),
+            }
+        )
 
 
-__all__ = ["BulkReviewView", "BulkAssignmentView", "BulkImportView"]
+__all__ = [
+    "BulkReviewView",
+    "BulkAssignmentView",
+    "BulkImportView",
+    "BulkOperationDetailView",
+    "BulkOperationResultsView",
+]
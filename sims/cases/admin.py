@@ -4,6 +4,9 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.html import format_html
 
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import sync_items
+
 from .models import CaseCategory, CaseReview, CaseStatistics, ClinicalCase
 
 
@@ -383,9 +386,11 @@ def mark_cases_as_reviewed(modeladmin, request, queryset):
         messages.error(request, "Only supervisors can mark cases as reviewed.")
         return
 
-    updated = queryset.filter(status__in=["submitted", "under_review"]).update(
-        status="reviewed", reviewed_at=timezone.now()
-    )
+    reviewable = queryset.filter(status__in=["submitted", "under_review"])
+    pks = list(reviewable.values_list("pk", flat=True))
+    updated = reviewable.filter(pk__in=pks).update(status="reviewed", reviewed_at=timezone.now())
+    # update() sends no signals, so drop the inbox rows explicitly.
+    sync_items(ReviewInboxItem.TYPE_CASE, pks)
 
     messages.success(request, f"{updated} cases marked as reviewed.")
 
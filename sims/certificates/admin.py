@@ -6,6 +6,9 @@ from django.utils.html import format_html
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import sync_items
+
 from .models import Certificate, CertificateReview, CertificateType
 
 
@@ -370,7 +373,10 @@ class CertificateAdmin(ImportExportModelAdmin):
             messages.error(request, "You don't have permission to reject certificates.")
             return
 
-        count = queryset.filter(status="pending").update(status="rejected")
+        pks = list(queryset.filter(status="pending").values_list("pk", flat=True))
+        count = queryset.filter(pk__in=pks, status="pending").update(status="rejected")
+        # update() sends no signals, so drop the inbox rows explicitly.
+        sync_items(ReviewInboxItem.TYPE_CERTIFICATE, pks)
 
         # Send notifications
         for certificate in queryset.filter(status="rejected"):
@@ -400,9 +406,12 @@ class CertificateAdmin(ImportExportModelAdmin):
 
     def mark_expired(self, request, queryset):
         """Mark certificates as expired"""
-        count = queryset.filter(
+        expiring = queryset.filter(
             expiry_date__lt=timezone.now().date(), status__in=["approved", "pending"]
-        ).update(status="expired")
+        )
+        pks = list(expiring.values_list("pk", flat=True))
+        count = expiring.filter(pk__in=pks).update(status="expired")
+        sync_items(ReviewInboxItem.TYPE_CERTIFICATE, pks)
 
         messages.success(request, f"Successfully marked {count} certificates as expired.")
 
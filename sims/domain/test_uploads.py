@@ -0,0 +1,78 @@
+import io
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+
+from sims.domain import uploads
+from sims.domain.uploads import iter_upload_rows
+
+
+def _xlsx(rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile("rows.xlsx", buffer.getvalue())
+
+
+class IterUploadRowsTests(SimpleTestCase):
+    def test_csv_rows_are_stripped_dicts(self):
+        upload = SimpleUploadedFile("rows.csv", b"\xef\xbb\xbfname, score\n alice ,3\n\nbob,\n")
+
+        rows = list(iter_upload_rows(upload, required_columns={"name", "score"}))
+
+        self.assertEqual(rows, [{"name": "alice", "score": "3"}, {"name": "bob", "score": ""}])
+
+    def test_csv_is_decoded_across_chunk_boundaries(self):
+        # Multi-byte characters and a quoted newline straddle the tiny chunks.
+        content = 'name,note\n"Zoë","line one\nline two"\nÅsa,ok\n'.encode("utf-8")
+        upload = SimpleUploadedFile("rows.csv", content)
+
+        with mock.patch.object(uploads, "READ_CHUNK_SIZE", 3):
+            rows = list(iter_upload_rows(upload))
+
+        self.assertEqual(
+            rows,
+            [{"name": "Zoë", "note": "line one\nline two"}, {"name": "Åsa", "note": "ok"}],
+        )
+
+    def test_plain_file_objects_are_read_incrementally(self):
+        stream = io.BytesIO(b"name\nalice\n")
+        stream.name = "rows.csv"
+
+        self.assertEqual(list(iter_upload_rows(stream)), [{"name": "alice"}])
+
+    def test_missing_columns_raise_before_iteration(self):
+        upload = SimpleUploadedFile("rows.csv", b"name\nalice\n")
+
+        with self.assertRaisesMessage(ValidationError, "Missing columns: score"):
+            iter_upload_rows(upload, required_columns={"name", "score"})
+
+    def test_invalid_utf8_is_a_validation_error(self):
+        upload = SimpleUploadedFile("rows.csv", b"name\n\xff\xfe\n")
+
+        with self.assertRaises(ValidationError):
+            list(iter_upload_rows(upload))
+
+    def test_xlsx_rows_use_read_only_workbook(self):
+        upload = _xlsx([["name", "score"], ["alice", 3], [None, None], ["bob", None]])
+
+        rows = list(iter_upload_rows(upload, required_columns={"name"}))
+
+        self.assertEqual(rows, [{"name": "alice", "score": "3"}, {"name": "bob", "score": ""}])
+
+    def test_unsupported_format(self):
+        upload = SimpleUploadedFile("rows.txt", b"name\n")
+
+        with self.assertRaisesMessage(ValidationError, "Unsupported file format"):
+            iter_upload_rows(upload)
+
+    def test_explicit_format_overrides_file_name(self):
+        upload = SimpleUploadedFile("export", b"name\nalice\n")
+
+        self.assertEqual(list(iter_upload_rows(upload, fmt="csv")), [{"name": "alice"}])
@@ -0,0 +1,155 @@
+"""Streaming row readers for CSV/XLSX uploads.
+
+Rows are produced one at a time straight off the uploaded file, so memory use
+is bounded by one read chunk (or one worksheet row) rather than the file size.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+from typing import Iterable, Iterator, Optional
+
+from django.core.exceptions import ValidationError
+from openpyxl import load_workbook
+
+READ_CHUNK_SIZE = 64 * 1024
+SUPPORTED_FORMATS = ("csv", "xlsx")
+
+
+def upload_format(uploaded_file) -> Optional[str]:
+    """File format inferred from the upload's name, or ``None`` if unsupported."""
+
+    name = (getattr(uploaded_file, "name", "") or "").lower()
+    for fmt in SUPPORTED_FORMATS:
+        if name.endswith(f".{fmt}"):
+            return fmt
+    return None
+
+
+def iter_upload_rows(
+    uploaded_file,
+    required_columns: Iterable[str] = (),
+    fmt: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Return an iterator of data rows as ``{header: stripped string}`` dicts.
+
+    ``fmt`` defaults to the format implied by the file name. The format and the
+    header row are checked before this returns, so a bad upload raises
+    ``ValidationError`` up front; undecodable content later in the file raises
+    it when the offending row is reached.
+    """
+
+    fmt = fmt or upload_format(uploaded_file)
+    if fmt == "csv":
+        rows = _iter_csv(uploaded_file)
+    elif fmt == "xlsx":
+        rows = _iter_xlsx(uploaded_file)
+    else:
+        raise ValidationError("Unsupported file format")
+
+    try:
+        headers = next(rows, None)
+        validate_headers(headers, required_columns)
+    except ValidationError:
+        rows.close()
+        raise
+    return _as_dicts(headers, rows)
+
+
+def _as_dicts(headers: list, rows: Iterator[list]) -> Iterator[dict]:
+    for values in rows:
+        if not any(values):
+            continue
+        yield {
+            header: values[idx] if idx < len(values) else ""
+            for idx, header in enumerate(headers)
+            if header
+        }
+
+
+def validate_headers(headers: Optional[list], required_columns: Iterable[str]) -> None:
+    if not headers or not any(headers):
+        raise ValidationError("No headers found in file", code="no_headers")
+    missing = set(required_columns) - set(headers)
+    if missing:
+        raise ValidationError(
+            f"Missing columns: {', '.join(sorted(missing))}", code="missing_columns"
+        )
+
+
+def _read_chunks(uploaded_file) -> Iterator:
+    """Django ``UploadedFile.chunks()`` when available, plain ``read(n)`` otherwise."""
+
+    if hasattr(uploaded_file, "chunks"):
+        yield from uploaded_file.chunks(READ_CHUNK_SIZE)
+        return
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    while True:
+        chunk = uploaded_file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _decoded(chunks: Iterable) -> Iterator[str]:
+    # utf-8-sig drops the byte-order mark Excel prepends to "CSV UTF-8" exports.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for chunk in chunks:
+            yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise ValidationError("File is not valid UTF-8 text") from exc
+
+
+def _lines(text_chunks: Iterable[str]) -> Iterator[str]:
+    """Split on ``\\n`` only, keeping line endings so ``csv`` sees quoted newlines intact."""
+
+    pending = ""
+    for text in text_chunks:
+        pending += text
+        start = 0
+        end = pending.find("\n")
+        while end != -1:
+            yield pending[start : end + 1]
+            start = end + 1
+            end = pending.find("\n", start)
+        pending = pending[start:]
+    if pending:
+        yield pending
+
+
+def _iter_csv(uploaded_file) -> Iterator[list]:
+    for row in csv.reader(_lines(_decoded(_read_chunks(uploaded_file)))):
+        yield [value.strip() for value in row]
+
+
+def _cell_text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _iter_xlsx(uploaded_file) -> Iterator[list]:
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    try:
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ValidationError("File is not a readable .xlsx workbook") from exc
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        # Read-only workbooks keep the underlying zip open until closed.
+        workbook.close()
+
+
+__all__ = [
+    "READ_CHUNK_SIZE",
+    "SUPPORTED_FORMATS",
+    "iter_upload_rows",
+    "upload_format",
+    "validate_headers",
+]
@@ -0,0 +1,13 @@
+"""Admin registrations for the review inbox."""
+
+from django.contrib import admin
+
+from sims.inbox.models import ReviewInboxItem
+
+
+@admin.register(ReviewInboxItem)
+class ReviewInboxItemAdmin(admin.ModelAdmin):
+    list_display = ("item_type", "item_id", "title", "supervisor", "pg", "submitted_at", "priority")
+    list_filter = ("item_type", "priority")
+    search_fields = ("title", "supervisor__username", "pg__username")
+    raw_id_fields = ("supervisor", "pg")
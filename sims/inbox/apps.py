@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class InboxConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "sims.inbox"
+    verbose_name = "Review Inbox"
+
+    def ready(self):
+        # Connect status-transition handlers for every reviewable model.
+        from . import signals
+
+        signals.connect()
@@ -0,0 +1,31 @@
+"""Management command to reconcile the review inbox with its source tables."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from sims.inbox.services import rebuild_inbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild supervisor review inbox rows from pending logbook entries, "
+        "certificates, rotations and cases"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the drift without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        summary = rebuild_inbox(dry_run=options["dry_run"])
+        for item_type, changes in summary.items():
+            self.stdout.write(
+                f"{item_type}: {changes['created']} created, "
+                f"{changes['updated']} updated, {changes['deleted']} deleted"
+            )
+        verb = "Would reconcile" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} review inbox"))
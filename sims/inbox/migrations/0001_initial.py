@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewInboxItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('logbook', 'Logbook Entry'), ('certificate', 'Certificate'), ('rotation', 'Rotation'), ('case', 'Clinical Case')], max_length=16)),
+                ('item_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(blank=True, max_length=300)),
+                ('submitted_at', models.DateTimeField()),
+                ('priority', models.PositiveSmallIntegerField(choices=[(0, 'Normal'), (1, 'High')], default=0)),
+                ('pg', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('supervisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_inbox_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['submitted_at'],
+                'indexes': [models.Index(fields=['supervisor', 'submitted_at'], name='inbox_supervisor_idx'), models.Index(fields=['supervisor', 'item_type', 'submitted_at'], name='inbox_supervisor_type_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewinboxitem',
+            constraint=models.UniqueConstraint(fields=('item_type', 'item_id'), name='inbox_unique_item'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+"""Materialised queue of items awaiting a supervisor's review."""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class ReviewInboxItem(models.Model):
+    """
+    One row per logbook entry, certificate, rotation or case that is waiting
+    on a supervisor. Rows are written on status transitions by
+    ``sims.inbox.signals`` and reconciled by ``manage.py rebuild_review_inbox``.
+    """
+
+    TYPE_LOGBOOK = "logbook"
+    TYPE_CERTIFICATE = "certificate"
+    TYPE_ROTATION = "rotation"
+    TYPE_CASE = "case"
+    TYPE_CHOICES = (
+        (TYPE_LOGBOOK, "Logbook Entry"),
+        (TYPE_CERTIFICATE, "Certificate"),
+        (TYPE_ROTATION, "Rotation"),
+        (TYPE_CASE, "Clinical Case"),
+    )
+
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 1
+    PRIORITY_CHOICES = (
+        (PRIORITY_NORMAL, "Normal"),
+        (PRIORITY_HIGH, "High"),
+    )
+
+    supervisor = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="review_inbox_items"
+    )
+    pg = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    item_type = models.CharField(max_length=16, choices=TYPE_CHOICES)
+    item_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=300, blank=True)
+    submitted_at = models.DateTimeField()
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=PRIORITY_NORMAL)
+
+    class Meta:
+        ordering = ["submitted_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["item_type", "item_id"], name="inbox_unique_item"),
+        ]
+        indexes = [
+            models.Index(fields=["supervisor", "submitted_at"], name="inbox_supervisor_idx"),
+            models.Index(
+                fields=["supervisor", "item_type", "submitted_at"], name="inbox_supervisor_type_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_item_type_display()} #{self.item_id} for {self.supervisor_id}"
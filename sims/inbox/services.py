@@ -0,0 +1,281 @@
+"""Keep the review inbox in step with the models it mirrors."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from django.apps import apps
+from django.db.models import Count
+from django.utils import timezone
+
+from sims.inbox.models import ReviewInboxItem
+
+# User columns that decide where a PG's items are routed.
+PG_ROUTING_FIELDS = ("supervisor_id", "is_active", "is_archived")
+
+
+def _pg_supervisor(obj) -> Optional[int]:
+    # Items go to the supervisor of an active PG, the same PGs get_assigned_pgs
+    # returns and the only supervisor allowed to verify them.
+    pg = obj.pg if obj.pg_id else None
+    if pg is None or not pg.is_active or pg.is_archived:
+        return None
+    return pg.supervisor_id
+
+
+def _rotation_priority(obj) -> int:
+    # A rotation that starts within a week blocks the PG's schedule.
+    if obj.start_date and obj.start_date <= timezone.localdate() + timedelta(days=7):
+        return ReviewInboxItem.PRIORITY_HIGH
+    return ReviewInboxItem.PRIORITY_NORMAL
+
+
+@dataclass(frozen=True)
+class InboxSource:
+    """How one reviewable model maps onto inbox rows."""
+
+    item_type: str
+    model_label: str
+    pending_statuses: Tuple[str, ...]
+    title: Callable[[object], str]
+    supervisor_id: Callable[[object], Optional[int]] = _pg_supervisor
+    # Models without a submission timestamp return None; the row then keeps the
+    # time it was first queued.
+    submitted_at: Callable[[object], Optional[object]] = lambda obj: None
+    priority: Callable[[object], int] = lambda obj: ReviewInboxItem.PRIORITY_NORMAL
+    select_related: Tuple[str, ...] = field(default=("pg",))
+
+    def get_model(self):
+        app_label = self.model_label.split(".")[0]
+        if not apps.is_installed(f"sims.{app_label}"):
+            return None
+        return apps.get_model(self.model_label)
+
+    def is_pending(self, obj) -> bool:
+        return obj.status in self.pending_statuses
+
+    def row_values(self, obj) -> Dict[str, object]:
+        values = {
+            "supervisor_id": self.supervisor_id(obj),
+            "pg_id": obj.pg_id,
+            "title": (self.title(obj) or "")[:300],
+            "priority": self.priority(obj),
+        }
+        submitted_at = self.submitted_at(obj)
+        if submitted_at:
+            values["submitted_at"] = submitted_at
+        return values
+
+
+SOURCES: Dict[str, InboxSource] = {
+    source.item_type: source
+    for source in (
+        InboxSource(
+            item_type=ReviewInboxItem.TYPE_LOGBOOK,
+            model_label="logbook.LogbookEntry",
+            pending_statuses=("pending",),
+            title=lambda obj: obj.case_title,
+            submitted_at=lambda obj: obj.submitted_to_supervisor_at,
+        ),
+        InboxSource(
+            item_type=ReviewInboxItem.TYPE_CERTIFICATE,
+            model_label="certificates.Certificate",
+            pending_statuses=("pending",),
+            title=lambda obj: obj.title,
+        ),
+        InboxSource(
+            item_type=ReviewInboxItem.TYPE_ROTATION,
+            model_label="rotations.Rotation",
+            pending_statuses=("pending",),
+            title=lambda obj: f"Rotation: {obj.department.name}" if obj.department_id else "",
+            priority=_rotation_priority,
+            select_related=("pg", "department"),
+        ),
+        InboxSource(
+            item_type=ReviewInboxItem.TYPE_CASE,
+            model_label="cases.ClinicalCase",
+            pending_statuses=("submitted",),
+            title=lambda obj: obj.case_title,
+        ),
+    )
+}
+
+
+def sync_item(source: InboxSource, obj) -> None:
+    """Queue, refresh or drop the inbox row for ``obj`` after it was saved."""
+
+    rows = ReviewInboxItem.objects.filter(item_type=source.item_type, item_id=obj.pk)
+    values = source.row_values(obj) if source.is_pending(obj) else None
+    if not values or not values["supervisor_id"]:
+        rows.delete()
+        return
+
+    if rows.update(**values):
+        return
+    values.setdefault("submitted_at", timezone.now())
+    ReviewInboxItem.objects.get_or_create(
+        item_type=source.item_type, item_id=obj.pk, defaults=values
+    )
+
+
+def queue_new_items(item_type: str, objs) -> int:
+    """Queue freshly bulk-created objects, which never send ``post_save``."""
+
+    source = SOURCES[item_type]
+    rows = []
+    for obj in objs:
+        if not source.is_pending(obj):
+            continue
+        values = source.row_values(obj)
+        if values["supervisor_id"]:
+            values.setdefault("submitted_at", timezone.now())
+            rows.append(ReviewInboxItem(item_type=item_type, item_id=obj.pk, **values))
+    ReviewInboxItem.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+    return len(rows)
+
+
+def remove_item(source: InboxSource, pk: int) -> None:
+    ReviewInboxItem.objects.filter(item_type=source.item_type, item_id=pk).delete()
+
+
+def inbox_for(supervisor, item_type: Optional[str] = None):
+    items = ReviewInboxItem.objects.filter(supervisor=supervisor)
+    if item_type:
+        items = items.filter(item_type=item_type)
+    return items.order_by("submitted_at")
+
+
+def pending_counts(supervisor) -> Dict[str, int]:
+    """Pending items per type, plus ``total``, in one grouped query."""
+
+    counts = {item_type: 0 for item_type in SOURCES}
+    rows = (
+        ReviewInboxItem.objects.filter(supervisor=supervisor)
+        .values_list("item_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    counts.update(dict(rows))
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def pending_item_ids(supervisor, item_type: str):
+    """Subquery of source primary keys queued for ``supervisor``."""
+
+    return ReviewInboxItem.objects.filter(supervisor=supervisor, item_type=item_type).values(
+        "item_id"
+    )
+
+
+def _pending_rows(source: InboxSource, objs):
+    """Desired inbox values per pending object, plus a fallback queue time for new rows."""
+
+    desired, first_queued = {}, {}
+    for obj in objs:
+        if not source.is_pending(obj):
+            continue
+        values = source.row_values(obj)
+        if values["supervisor_id"]:
+            desired[obj.pk] = values
+            first_queued[obj.pk] = getattr(obj, "updated_at", None)
+    return desired, first_queued
+
+
+def _reconcile(
+    item_type: str,
+    desired: Dict[int, Dict[str, object]],
+    first_queued: Dict[int, object],
+    existing: Dict[int, ReviewInboxItem],
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    stale_ids = [item.pk for item_id, item in existing.items() if item_id not in desired]
+    to_create, to_update = [], []
+    for pk, values in desired.items():
+        item = existing.get(pk)
+        if item is None:
+            values.setdefault("submitted_at", first_queued.get(pk) or timezone.now())
+            to_create.append(ReviewInboxItem(item_type=item_type, item_id=pk, **values))
+        elif any(getattr(item, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(item, name, value)
+            to_update.append(item)
+
+    if not dry_run:
+        ReviewInboxItem.objects.filter(pk__in=stale_ids).delete()
+        ReviewInboxItem.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        ReviewInboxItem.objects.bulk_update(
+            to_update,
+            ["supervisor", "pg", "title", "priority", "submitted_at"],
+            batch_size=500,
+        )
+    return {"created": len(to_create), "updated": len(to_update), "deleted": len(stale_ids)}
+
+
+def sync_items(item_type: str, pks: Iterable[int]) -> Dict[str, int]:
+    """Set-based ``sync_item`` for rows changed with ``update()``, which sends no signals."""
+
+    source = SOURCES[item_type]
+    model = source.get_model()
+    pks = list(pks)
+    if model is None or not pks:
+        return {"created": 0, "updated": 0, "deleted": 0}
+    objs = model.objects.filter(pk__in=pks).select_related(*source.select_related)
+    desired, _ = _pending_rows(source, objs)
+    existing = {
+        item.item_id: item
+        for item in ReviewInboxItem.objects.filter(item_type=item_type, item_id__in=pks)
+    }
+    # Like sync_item, a newly queued row is stamped with the time it was queued.
+    return _reconcile(item_type, desired, {}, existing)
+
+
+def sync_pg_items(pg_id: int) -> None:
+    """Re-route a PG's pending items, e.g. after their supervisor changed."""
+
+    for item_type, source in SOURCES.items():
+        model = source.get_model()
+        if model is None:
+            continue
+        pks = model.objects.filter(pg_id=pg_id, status__in=source.pending_statuses).values_list(
+            "pk", flat=True
+        )
+        sync_items(item_type, pks)
+
+
+def rebuild_inbox(dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+    """Reconcile the inbox with the source tables; returns per-type change counts."""
+
+    summary: Dict[str, Dict[str, int]] = {}
+    for item_type, source in SOURCES.items():
+        model = source.get_model()
+        if model is None:
+            continue
+
+        pending = model.objects.filter(status__in=source.pending_statuses).select_related(
+            *source.select_related
+        )
+        desired, first_queued = _pending_rows(source, pending.iterator(chunk_size=1000))
+        existing = {
+            item.item_id: item for item in ReviewInboxItem.objects.filter(item_type=item_type)
+        }
+        summary[item_type] = _reconcile(item_type, desired, first_queued, existing, dry_run)
+    return summary
+
+
+__all__ = [
+    "PG_ROUTING_FIELDS",
+    "InboxSource",
+    "SOURCES",
+    "inbox_for",
+    "pending_counts",
+    "pending_item_ids",
+    "queue_new_items",
+    "rebuild_inbox",
+    "remove_item",
+    "sync_item",
+    "sync_items",
+    "sync_pg_items",
+]
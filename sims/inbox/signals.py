@@ -0,0 +1,75 @@
+"""Status-transition handlers that maintain the review inbox."""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from sims.inbox.services import PG_ROUTING_FIELDS, SOURCES, remove_item, sync_item, sync_pg_items
+
+
+def connect() -> None:
+    """Attach handlers to every installed source model (called from ``ready``)."""
+
+    for source in SOURCES.values():
+        model = source.get_model()
+        if model is None:
+            continue
+        post_save.connect(
+            _make_save_handler(source),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"inbox-save-{source.item_type}",
+        )
+        post_delete.connect(
+            _make_delete_handler(source),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"inbox-delete-{source.item_type}",
+        )
+
+    user_model = get_user_model()
+    pre_save.connect(_remember_routing, sender=user_model, dispatch_uid="inbox-user-routing")
+    post_save.connect(_reroute_pg_items, sender=user_model, dispatch_uid="inbox-user-reroute")
+
+
+def _make_save_handler(source):
+    def handler(sender, instance, raw=False, **kwargs):
+        if not raw:
+            sync_item(source, instance)
+
+    return handler
+
+
+def _make_delete_handler(source):
+    def handler(sender, instance, **kwargs):
+        remove_item(source, instance.pk)
+
+    return handler
+
+
+def _routing(user):
+    return tuple(getattr(user, attname) for attname in PG_ROUTING_FIELDS)
+
+
+def _remember_routing(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note a PG's stored routing before a save that may change it."""
+
+    instance._inbox_routing = None
+    if raw or instance._state.adding or instance.role != "pg":
+        return
+    if update_fields is not None:
+        names = {name.removesuffix("_id") for name in update_fields}
+        if not names & {attname.removesuffix("_id") for attname in PG_ROUTING_FIELDS}:
+            return
+    instance._inbox_routing = (
+        sender._base_manager.filter(pk=instance.pk).values_list(*PG_ROUTING_FIELDS).first()
+    )
+
+
+def _reroute_pg_items(sender, instance, raw=False, **kwargs):
+    """Move a PG's pending items when their supervisor or active state changed."""
+
+    previous = getattr(instance, "_inbox_routing", None)
+    if previous is not None and previous != _routing(instance):
+        sync_pg_items(instance.pk)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from sims.inbox.models import ReviewInboxItem
+from sims.logbook.models import LogbookEntry
+from sims.rotations.models import Department, Hospital, Rotation
+from sims.users.models import User
+
+
+class ReviewInboxTests(APITestCase):
+    def setUp(self) -> None:
+        self.supervisor = User.objects.create_user(
+            username="inbox_sup", password="testpass", role="supervisor", specialty="surgery"
+        )
+        self.pg = User.objects.create_user(
+            username="inbox_pg",
+            password="testpass",
+            role="pg",
+            specialty="surgery",
+            year="1",
+            supervisor=self.supervisor,
+        )
+        hospital = Hospital.objects.create(name="Inbox Hospital")
+        self.department = Department.objects.create(name="Surgery", hospital=hospital)
+        self.hospital = hospital
+
+    def _entry(self, **kwargs) -> LogbookEntry:
+        fields = {
+            "pg": self.pg,
+            "case_title": "Inbox case",
+            "date": date.today(),
+            "location_of_activity": "Ward",
+            "patient_history_summary": "History",
+            "management_action": "Action",
+            "topic_subtopic": "Topic",
+        }
+        fields.update(kwargs)
+        return LogbookEntry.objects.create(**fields)
+
+    def test_logbook_transitions_maintain_queue(self) -> None:
+        entry = self._entry()
+        self.assertFalse(ReviewInboxItem.objects.exists())
+
+        entry.status = "pending"
+        entry.save()
+        item = ReviewInboxItem.objects.get()
+        self.assertEqual(
+            (item.item_type, item.item_id, item.supervisor_id),
+            (ReviewInboxItem.TYPE_LOGBOOK, entry.pk, self.supervisor.pk),
+        )
+        self.assertEqual(item.submitted_at, entry.submitted_to_supervisor_at)
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 1)
+
+        entry.status = "approved"
+        entry.save()
+        self.assertFalse(ReviewInboxItem.objects.exists())
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 0)
+
+    def test_rotation_queue_and_priority(self) -> None:
+        rotation = Rotation.objects.create(
+            pg=self.pg,
+            department=self.department,
+            hospital=self.hospital,
+            start_date=date.today() + timedelta(days=3),
+            end_date=date.today() + timedelta(days=60),
+            status="pending",
+        )
+        item = ReviewInboxItem.objects.get(item_type=ReviewInboxItem.TYPE_ROTATION)
+        self.assertEqual(item.supervisor_id, self.supervisor.pk)
+        self.assertEqual(item.priority, ReviewInboxItem.PRIORITY_HIGH)
+
+        rotation.delete()
+        self.assertFalse(ReviewInboxItem.objects.exists())
+
+    def test_admin_bulk_reject_drops_inbox_rows(self) -> None:
+        Rotation.objects.create(
+            pg=self.pg,
+            department=self.department,
+            hospital=self.hospital,
+            start_date=date.today() + timedelta(days=30),
+            end_date=date.today() + timedelta(days=60),
+            status="pending",
+        )
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 1)
+
+        request = RequestFactory().post("/")
+        request.user = User.objects.create_user(username="inbox_admin", password="x", role="admin")
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        admin.site._registry[Rotation].reject_rotations(request, Rotation.objects.all())
+
+        self.assertEqual(Rotation.objects.get().status, "cancelled")
+        self.assertFalse(ReviewInboxItem.objects.exists())
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 0)
+
+    def test_items_follow_the_pgs_supervisor(self) -> None:
+        other = User.objects.create_user(
+            username="inbox_sup2", password="testpass", role="supervisor", specialty="surgery"
+        )
+        entry = self._entry(status="pending", supervisor=other)
+        self.assertEqual(ReviewInboxItem.objects.get().supervisor_id, self.supervisor.pk)
+
+        self.pg.supervisor = other
+        self.pg.save()
+        self.assertEqual(ReviewInboxItem.objects.get(item_id=entry.pk).supervisor_id, other.pk)
+        self.assertEqual(other.get_documents_pending_count(), 1)
+        self.assertEqual(self.supervisor.get_documents_pending_count(), 0)
+
+        self.pg.is_active = False
+        self.pg.save(update_fields=["is_active"])
+        self.assertFalse(ReviewInboxItem.objects.exists())
+
+    def test_inbox_api_lists_and_counts(self) -> None:
+        self._entry(status="pending", case_title="First")
+        self._entry(status="pending", case_title="Second")
+        self.client.force_authenticate(self.supervisor)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("inbox_api:list"), {"type": "logbook"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["title"] for r in response.data["results"]], ["First", "Second"])
+        self.assertEqual(response.data["counts"]["logbook"], 2)
+        self.assertEqual(response.data["counts"]["total"], 2)
+
+        self.client.force_authenticate(self.pg)
+        self.assertEqual(self.client.get(reverse("inbox_api:list")).status_code, 403)
+
+    def test_rebuild_reconciles_drift(self) -> None:
+        entry = self._entry(status="pending")
+        approved = self._entry(status="pending", case_title="Done")
+        # Queryset updates bypass signals, leaving the inbox out of step.
+        LogbookEntry.objects.filter(pk=approved.pk).update(status="approved")
+        ReviewInboxItem.objects.filter(item_id=entry.pk).delete()
+        ReviewInboxItem.objects.create(
+            supervisor=self.supervisor,
+            pg=self.pg,
+            item_type=ReviewInboxItem.TYPE_CASE,
+            item_id=999,
+            submitted_at=entry.submitted_to_supervisor_at,
+        )
+
+        out = StringIO()
+        call_command("rebuild_review_inbox", stdout=out)
+
+        self.assertEqual(
+            list(ReviewInboxItem.objects.values_list("item_type", "item_id")),
+            [(ReviewInboxItem.TYPE_LOGBOOK, entry.pk)],
+        )
+        self.assertIn("logbook: 1 created, 0 updated, 1 deleted", out.getvalue())
@@ -0,0 +1,11 @@
+"""Routing for the review inbox API."""
+
+from django.urls import path
+
+from sims.inbox.views import ReviewInboxView
+
+app_name = "inbox_api"
+
+urlpatterns = [
+    path("", ReviewInboxView.as_view(), name="list"),
+]
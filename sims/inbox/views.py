@@ -0,0 +1,53 @@
+"""API views for the supervisor review inbox."""
+
+from __future__ import annotations
+
+from rest_framework import permissions
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from sims.inbox.services import SOURCES, inbox_for, pending_counts
+
+
+class ReviewInboxView(APIView):
+    """
+    GET /api/inbox/?type=<logbook|certificate|rotation|case>&limit=<n>
+
+    Items awaiting the current supervisor's review, oldest submission first,
+    with per-type pending counts.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 200
+
+    def get(self, request: Request) -> Response:
+        if getattr(request.user, "role", None) not in ["supervisor", "admin"]:
+            raise PermissionDenied("Only supervisors and admins have a review inbox")
+
+        item_type = request.query_params.get("type") or None
+        if item_type and item_type not in SOURCES:
+            return Response({"error": "Unknown item type"}, status=400)
+        try:
+            limit = min(int(request.query_params.get("limit", 50)), self.max_limit)
+        except ValueError:
+            limit = 50
+
+        items = inbox_for(request.user, item_type).select_related("pg")[: max(limit, 1)]
+        return Response(
+            {
+                "counts": pending_counts(request.user),
+                "results": [
+                    {
+                        "type": item.item_type,
+                        "id": item.item_id,
+                        "title": item.title,
+                        "pg": {"id": item.pg_id, "full_name": item.pg.get_full_name()},
+                        "submitted_at": item.submitted_at.isoformat(),
+                        "priority": item.get_priority_display(),
+                    }
+                    for item in items
+                ],
+            }
+        )
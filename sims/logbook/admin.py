@@ -9,6 +9,7 @@ from import_export.admin import ImportExportModelAdmin
 from .models import (
     Diagnosis,
     LogbookEntry,
+    LogbookExportJob,
     LogbookReview,
     LogbookStatistics,
     LogbookTemplate,
@@ -440,15 +441,15 @@ class LogbookEntryAdmin(ImportExportModelAdmin):
 
     def procedure_count(self, obj):
         """Display count of procedures performed"""
-        count = obj.procedures.count()
+        count = obj.procedure_count
         if count > 0:
-            procedures = ", ".join([p.name for p in obj.procedures.all()[:3]])
-            if count > 3:
-                procedures += f" (+{count - 3} more)"
-            return format_html('<span title="{}">{} procedures</span>', procedures, count)
+            return format_html(
+                '<span title="{}">{} procedures</span>', obj.procedures_summary, count
+            )
         return "0 procedures"
 
     procedure_count.short_description = "Procedures"
+    procedure_count.admin_order_field = "procedure_count"
 
     def status_badge(self, obj):
         """Display status with colored badge"""
@@ -972,3 +973,20 @@ class LogbookReportAdmin:
 
 # Don't register the report admin as a separate model
 # It's just for adding custom views to the main admin
+
+
+@admin.register(LogbookExportJob)
+class LogbookExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "format", "status", "rows_written", "rows_total", "created_at")
+    list_filter = ("status", "format")
+    search_fields = ("user__username",)
+    readonly_fields = (
+        "fingerprint",
+        "params",
+        "rows_total",
+        "rows_written",
+        "started_at",
+        "completed_at",
+        "created_at",
+    )
+    raw_id_fields = ("user",)
@@ -2,11 +2,30 @@
 
 from django.urls import path
 
-from sims.logbook.api_views import PendingLogbookEntriesView, VerifyLogbookEntryView
+from sims.logbook.api_views import (
+    LogbookAutocompleteView,
+    LogbookExportDownloadView,
+    LogbookExportJobCreateView,
+    LogbookExportJobDetailView,
+    PendingLogbookEntriesView,
+    VerifyLogbookEntryView,
+)
 
 app_name = "logbook_api"
 
 urlpatterns = [
     path("pending/", PendingLogbookEntriesView.as_view(), name="pending"),
     path("<int:pk>/verify/", VerifyLogbookEntryView.as_view(), name="verify"),
+    path(
+        "autocomplete/<slug:kind>/",
+        LogbookAutocompleteView.as_view(),
+        name="autocomplete",
+    ),
+    path("exports/", LogbookExportJobCreateView.as_view(), name="export_create"),
+    path("exports/<int:pk>/", LogbookExportJobDetailView.as_view(), name="export_detail"),
+    path(
+        "exports/download/<str:token>/",
+        LogbookExportDownloadView.as_view(),
+        name="export_download",
+    ),
 ]
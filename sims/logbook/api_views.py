@@ -1,14 +1,21 @@
 """API views for logbook supervisor verification workflow."""
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied as DjangoPermissionDenied
+from django.http import FileResponse, Http404
 from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
-from sims.logbook.models import LogbookEntry
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import pending_item_ids
+from sims.logbook.autocomplete import DEFAULT_LIMIT, MAX_LIMIT, SOURCES, registry
+from sims.logbook.exports import job_for_token, job_payload, request_export
+from sims.logbook.models import ConcurrentUpdateError, LogbookEntry, LogbookExportJob
 
 User = get_user_model()
 
@@ -36,8 +43,9 @@ class PendingLogbookEntriesView(APIView):
         if user.is_superuser or getattr(user, "role", None) == "admin":
             queryset = LogbookEntry.objects.filter(status="pending")
         else:  # supervisor
-            supervised_users = User.objects.filter(supervisor=user)
-            queryset = LogbookEntry.objects.filter(status="pending", pg__in=supervised_users)
+            queryset = LogbookEntry.objects.filter(
+                pk__in=pending_item_ids(user, ReviewInboxItem.TYPE_LOGBOOK)
+            )
 
         # Select related to reduce queries
         queryset = queryset.select_related(
@@ -84,8 +92,13 @@ class VerifyLogbookEntryView(APIView):
 
     Request body (optional):
     {
-        "feedback": "Additional supervisor feedback"
+        "feedback": "Additional supervisor feedback",
+        "version": 3
     }
+
+    ``version`` is the entry version the client last saw. The update only
+    applies if the entry is still at that version (or at the version read by
+    this request when omitted); otherwise 409 is returned with the current one.
     """
 
     permission_classes = [permissions.IsAuthenticated]
@@ -126,7 +139,28 @@ class VerifyLogbookEntryView(APIView):
         if feedback:
             entry.supervisor_comments = feedback
 
-        entry.save()
+        expected_version = request.data.get("version")
+        if expected_version not in (None, ""):
+            try:
+                entry.version = int(expected_version)
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "version must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            entry.save()
+        except ConcurrentUpdateError:
+            current = LogbookEntry.objects.filter(pk=pk).values("version", "status").first()
+            return Response(
+                {
+                    "error": "Entry was modified by someone else; reload and try again",
+                    "current_version": current["version"] if current else None,
+                    "current_status": current["status"] if current else None,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
 
         # Create notification (if notifications app exists)
         try:
@@ -168,9 +202,124 @@ class VerifyLogbookEntryView(APIView):
                     "full_name": user.get_full_name(),
                 },
                 "verified_at": entry.verified_at.isoformat(),
+                "version": entry.version,
                 "message": "Entry verified successfully",
             }
         )
 
 
-__all__ = ["PendingLogbookEntriesView", "VerifyLogbookEntryView"]
+class LogbookAutocompleteView(APIView):
+    """
+    GET /api/logbook/autocomplete/<kind>/?q=<prefix>&limit=<n>&category=<a,b>
+
+    Typeahead lookup for diagnoses, procedures and skills used by the entry forms.
+    Matches on the start of any word and returns the most used items first.
+    ``category`` narrows procedures to the given categories.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "autocomplete"
+
+    def get(self, request: Request, kind: str) -> Response:
+        if kind not in SOURCES:
+            return Response({"error": "Unknown lookup"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        categories = {
+            value.strip()
+            for value in request.query_params.get("category", "").split(",")
+            if value.strip()
+        }
+        suggestions = registry.search(
+            kind, request.query_params.get("q", ""), limit, categories or None
+        )
+        return Response({"results": [suggestion.as_dict() for suggestion in suggestions]})
+
+
+class LogbookExportJobCreateView(APIView):
+    """
+    POST /api/logbook/exports/
+
+    Queues a background export of the entries visible to the caller.
+
+    Request body:
+    {
+        "format": "csv" | "xlsx",
+        "status": "approved",          (optional)
+        "start_date": "2025-01-01",    (optional)
+        "end_date": "2025-06-30"       (optional)
+    }
+
+    Returns 202 with the job, or 200 with the existing job when the same
+    export was requested recently.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        fmt = request.data.get("format", LogbookExportJob.FORMAT_CSV)
+        try:
+            job, created = request_export(request.user, fmt, request.data)
+        except DjangoPermissionDenied as exc:
+            raise PermissionDenied(str(exc))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            job_payload(job, request),
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+        )
+
+
+class LogbookExportJobDetailView(APIView):
+    """
+    GET /api/logbook/exports/<id>/
+
+    Progress of an export job; includes a signed ``download_url`` once complete.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        try:
+            job = LogbookExportJob.objects.get(pk=pk, user=request.user)
+        except LogbookExportJob.DoesNotExist:
+            return Response({"error": "Export not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job_payload(job, request))
+
+
+class LogbookExportDownloadView(APIView):
+    """
+    GET /api/logbook/exports/download/<token>/
+
+    Serves a finished export. The signed token is the credential, so links can
+    be handed to a browser download without an auth header until they expire.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request: Request, token: str):
+        job = job_for_token(token)
+        if job is None or not job.file:
+            raise Http404("Export link is invalid or has expired")
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=f"logbook_export.{job.format}",
+        )
+
+
+__all__ = [
+    "PendingLogbookEntriesView",
+    "VerifyLogbookEntryView",
+    "LogbookAutocompleteView",
+    "LogbookExportJobCreateView",
+    "LogbookExportJobDetailView",
+    "LogbookExportDownloadView",
+]
@@ -30,7 +30,7 @@ class LogbookConfig(AppConfig):
         """
         try:
             # Import signals for logbook management
-            pass
+            from . import signals  # noqa: F401
 
             # Register any custom model permissions
             from django.contrib.auth.models import Permission
@@ -0,0 +1,194 @@
+"""In-memory prefix index backing the diagnosis/procedure/skill typeahead endpoints."""
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Collection, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from sims.logbook.models import Diagnosis, Procedure, Skill
+
+INDEX_VERSION_CACHE_KEY = "logbook:autocomplete:version:{kind}"
+# Usage counts drift as entries are logged; rebuild at most this often to pick them up.
+INDEX_MAX_AGE_SECONDS = 300
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: int
+    text: str
+    usage: int
+    # Lets callers narrow a lookup, e.g. procedures by category.
+    category: str = ""
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "text": self.text, "usage": self.usage}
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _normalise(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+class PrefixIndex:
+    """Sorted (key, position) pairs searched with bisect.
+
+    Every word of a label is indexed as well as the full label, so ``"infarc"``
+    finds "Myocardial Infarction (I21)" and so does ``"i21"``.
+    """
+
+    def __init__(self, suggestions: List[Suggestion]):
+        self.suggestions = suggestions
+        keys: List[Tuple[str, int]] = []
+        for position, suggestion in enumerate(suggestions):
+            normalised = _normalise(suggestion.text)
+            tokens = {normalised, *_WORD_RE.findall(normalised)}
+            keys.extend((token, position) for token in tokens)
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._positions = [position for _, position in keys]
+
+    def search(
+        self,
+        prefix: str,
+        limit: int = DEFAULT_LIMIT,
+        categories: Optional[Collection[str]] = None,
+    ) -> List[Suggestion]:
+        prefix = _normalise(prefix)
+        if not prefix:
+            candidates = iter(self.suggestions)
+        else:
+            start = bisect_left(self._keys, prefix)
+            matches = set()
+            for index in range(start, len(self._keys)):
+                if not self._keys[index].startswith(prefix):
+                    break
+                matches.add(self._positions[index])
+            candidates = (self.suggestions[pos] for pos in matches)
+        if categories:
+            candidates = (item for item in candidates if item.category in categories)
+        return heapq.nsmallest(limit, candidates, key=_rank)
+
+
+def _rank(suggestion: Suggestion) -> Tuple[int, str]:
+    return (-suggestion.usage, suggestion.text.casefold())
+
+
+def _diagnosis_suggestions() -> List[Suggestion]:
+    rows = (
+        Diagnosis.objects.filter(is_active=True)
+        .annotate(
+            primary_usage=Count("primary_entries", distinct=True),
+            secondary_usage=Count("secondary_entries", distinct=True),
+        )
+        .values_list("id", "name", "icd_code", "primary_usage", "secondary_usage")
+    )
+    return [
+        Suggestion(
+            id=pk,
+            text=f"{name} ({icd_code})" if icd_code else name,
+            usage=primary + secondary,
+        )
+        for pk, name, icd_code, primary, secondary in rows
+    ]
+
+
+def _procedure_suggestions() -> List[Suggestion]:
+    rows = (
+        Procedure.objects.filter(is_active=True)
+        .annotate(usage=Count("logbook_entries"))
+        .values_list("id", "name", "usage", "category")
+    )
+    return [
+        Suggestion(id=pk, text=name, usage=usage, category=category)
+        for pk, name, usage, category in rows
+    ]
+
+
+def _skill_suggestions() -> List[Suggestion]:
+    rows = (
+        Skill.objects.filter(is_active=True)
+        .annotate(usage=Count("logbook_entries"))
+        .values_list("id", "name", "usage")
+    )
+    return [Suggestion(id=pk, text=name, usage=usage) for pk, name, usage in rows]
+
+
+SOURCES = {
+    "diagnoses": (Diagnosis, _diagnosis_suggestions),
+    "procedures": (Procedure, _procedure_suggestions),
+    "skills": (Skill, _skill_suggestions),
+}
+
+
+class AutocompleteRegistry:
+    """Process-local indexes, rebuilt when the shared cache version moves or they age out."""
+
+    def __init__(self, max_age: float = INDEX_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Tuple[PrefixIndex, int, float]] = {}
+
+    def search(
+        self,
+        kind: str,
+        prefix: str,
+        limit: int = DEFAULT_LIMIT,
+        categories: Optional[Collection[str]] = None,
+    ) -> List[Suggestion]:
+        return self.get_index(kind).search(prefix, limit, categories)
+
+    def get_index(self, kind: str) -> PrefixIndex:
+        if kind not in SOURCES:
+            raise KeyError(kind)
+        version = cache.get(INDEX_VERSION_CACHE_KEY.format(kind=kind), 0)
+        cached = self._indexes.get(kind)
+        if cached and cached[1] == version and time.monotonic() - cached[2] < self.max_age:
+            return cached[0]
+        with self._lock:
+            _, build = SOURCES[kind]
+            index = PrefixIndex(build())
+            self._indexes[kind] = (index, version, time.monotonic())
+        return index
+
+    def invalidate(self, kind: str) -> None:
+        key = INDEX_VERSION_CACHE_KEY.format(kind=kind)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+        self._indexes.pop(kind, None)
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+
+registry = AutocompleteRegistry()
+
+
+def kind_for_model(model) -> str | None:
+    for kind, (source_model, _) in SOURCES.items():
+        if model is source_model:
+            return kind
+    return None
+
+
+__all__ = [
+    "AutocompleteRegistry",
+    "PrefixIndex",
+    "Suggestion",
+    "SOURCES",
+    "registry",
+    "kind_for_model",
+]
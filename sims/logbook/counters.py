@@ -0,0 +1,87 @@
+"""Maintain the denormalised procedure/skill/CME columns on ``LogbookEntry``."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sims.logbook.models import LogbookEntry
+
+COUNTER_FIELDS = list(LogbookEntry.DENORMALISED_FIELDS)
+SUMMARY_LIMIT = 3
+
+
+def summarise(names: List[str]) -> str:
+    """Same wording as the old per-row display helpers: first three, then "(+n more)"."""
+
+    if len(names) <= SUMMARY_LIMIT:
+        return ", ".join(names)
+    return f"{', '.join(names[:SUMMARY_LIMIT])} (+{len(names) - SUMMARY_LIMIT} more)"
+
+
+def _rows_by_entry(field_name: str, entry_ids: List[int], values: Iterable[str]) -> Dict:
+    """Through-table rows for ``entry_ids`` grouped by entry, in the target's default order."""
+
+    field = LogbookEntry._meta.get_field(field_name)
+    target = field.remote_field.model
+    target_name = field.m2m_reverse_field_name()
+    ordering = [
+        f"-{target_name}__{name[1:]}" if name.startswith("-") else f"{target_name}__{name}"
+        for name in target._meta.ordering
+    ]
+    rows = (
+        field.remote_field.through.objects.filter(logbookentry_id__in=entry_ids)
+        .order_by("logbookentry_id", *ordering)
+        .values_list("logbookentry_id", *(f"{target_name}__{value}" for value in values))
+    )
+    grouped = defaultdict(list)
+    for entry_id, *rest in rows:
+        grouped[entry_id].append(rest)
+    return grouped
+
+
+def refresh_entry_counters(entry_ids: Iterable[int]) -> int:
+    """Recompute the counters for the given entries with three queries in total."""
+
+    entry_ids = sorted({pk for pk in entry_ids if pk})
+    if not entry_ids:
+        return 0
+
+    procedures = _rows_by_entry("procedures", entry_ids, ["name", "cme_points", "difficulty_level"])
+    skills = _rows_by_entry("skills", entry_ids, ["name"])
+    secondary = _rows_by_entry("secondary_diagnoses", entry_ids, ["pk"])
+
+    entries = []
+    for pk in entry_ids:
+        entry_procedures = procedures.get(pk, [])
+        entry_skills = skills.get(pk, [])
+        entries.append(
+            LogbookEntry(
+                pk=pk,
+                procedure_count=len(entry_procedures),
+                skill_count=len(entry_skills),
+                secondary_diagnosis_count=len(secondary.get(pk, [])),
+                cme_points=sum(points for _, points, _ in entry_procedures),
+                procedure_difficulty=sum(level for _, _, level in entry_procedures),
+                procedures_summary=summarise([name for name, _, _ in entry_procedures]),
+                skills_summary=summarise([name for (name,) in entry_skills]),
+            )
+        )
+    # bulk_update leaves updated_at alone, so a recount is not mistaken for an edit.
+    LogbookEntry.objects.bulk_update(entries, COUNTER_FIELDS, batch_size=500)
+    return len(entries)
+
+
+def entry_ids_for(field_name: str, target_pks: Iterable[int]) -> List[int]:
+    """Entries linked to any of ``target_pks`` through the given m2m field."""
+
+    field = LogbookEntry._meta.get_field(field_name)
+    target_name = field.m2m_reverse_field_name()
+    return list(
+        field.remote_field.through.objects.filter(**{f"{target_name}_id__in": list(target_pks)})
+        .values_list("logbookentry_id", flat=True)
+        .distinct()
+    )
+
+
+__all__ = ["COUNTER_FIELDS", "entry_ids_for", "refresh_entry_counters", "summarise"]
@@ -0,0 +1,313 @@
+"""Logbook export jobs: scoped querysets, row formatting and chunked file writers."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import tempfile
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from openpyxl import Workbook
+
+from sims.logbook.models import LogbookEntry, LogbookExportJob
+
+EXPORT_COLUMNS = [
+    "PG Name",
+    "PG Username",
+    "Date",
+    "Case Title",
+    "Primary Diagnosis",
+    "Patient Age",
+    "Patient Gender",
+    "Procedures",
+    "Skills",
+    "Status",
+    "Self Score",
+    "Supervisor Score",
+    "CME Points",
+    "Created Date",
+]
+
+DOWNLOAD_SALT = "sims.logbook.export-download"
+
+
+def entries_for_user(user):
+    """Entries the user may export, matching the role rules of the web export."""
+
+    if user.role == "admin":
+        return LogbookEntry.objects.all()
+    if user.role == "supervisor":
+        return LogbookEntry.objects.filter(pg__supervisor=user)
+    if user.role == "pg":
+        return LogbookEntry.objects.filter(pg=user)
+    raise PermissionDenied("You don't have permission to export entries")
+
+
+def normalise_params(params: dict | None) -> dict:
+    """Keep only supported filters, validated and in canonical string form."""
+
+    params = params or {}
+    cleaned = {}
+    status = (params.get("status") or "").strip()
+    if status:
+        valid = {choice for choice, _ in LogbookEntry.STATUS_CHOICES}
+        if status not in valid:
+            raise ValueError(f"Unknown status '{status}'")
+        cleaned["status"] = status
+    for key in ("start_date", "end_date"):
+        value = params.get(key)
+        if not value:
+            continue
+        parsed = parse_date(str(value))
+        if parsed is None:
+            raise ValueError(f"Invalid {key} '{value}'; expected YYYY-MM-DD")
+        cleaned[key] = parsed.isoformat()
+    return cleaned
+
+
+def filtered_entries(user, params: dict):
+    queryset = entries_for_user(user)
+    if params.get("status"):
+        queryset = queryset.filter(status=params["status"])
+    if params.get("start_date"):
+        queryset = queryset.filter(date__gte=params["start_date"])
+    if params.get("end_date"):
+        queryset = queryset.filter(date__lte=params["end_date"])
+    return queryset
+
+
+def export_queryset(queryset):
+    return (
+        queryset.select_related("pg", "primary_diagnosis")
+        .prefetch_related("procedures", "skills")
+        .order_by("date", "pk")
+    )
+
+
+def export_row(entry: LogbookEntry) -> list:
+    """One export row; relies on ``procedures``/``skills`` being prefetched."""
+
+    return [
+        entry.pg.get_full_name() if entry.pg else "",
+        entry.pg.username if entry.pg else "",
+        entry.date,
+        entry.case_title or "",
+        entry.primary_diagnosis.name if entry.primary_diagnosis else "",
+        entry.patient_age,
+        entry.get_patient_gender_display(),
+        ", ".join(p.name for p in entry.procedures.all()),
+        ", ".join(s.name for s in entry.skills.all()),
+        entry.get_status_display(),
+        entry.self_assessment_score or "",
+        entry.supervisor_assessment_score or "",
+        entry.cme_points,
+        entry.created_at.date(),
+    ]
+
+
+def export_fingerprint(user, fmt: str, params: dict) -> str:
+    payload = json.dumps(
+        {"user": user.pk, "role": user.role, "format": fmt, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def request_export(user, fmt: str, params: dict | None = None) -> tuple[LogbookExportJob, bool]:
+    """
+    Return ``(job, created)``. An identical request made within
+    ``LOGBOOK_EXPORT_DEDUP_SECONDS`` reuses the existing job instead of
+    queueing another full scan.
+    """
+
+    if fmt not in dict(LogbookExportJob.FORMAT_CHOICES):
+        raise ValueError(f"Unsupported format '{fmt}'")
+    entries_for_user(user)  # raises PermissionDenied for roles without access
+    params = normalise_params(params)
+    fingerprint = export_fingerprint(user, fmt, params)
+
+    window_start = timezone.now() - timedelta(seconds=settings.LOGBOOK_EXPORT_DEDUP_SECONDS)
+    existing = (
+        LogbookExportJob.objects.filter(fingerprint=fingerprint, created_at__gte=window_start)
+        .exclude(status=LogbookExportJob.STATUS_FAILED)
+        .order_by("-created_at")
+        .first()
+    )
+    if existing:
+        return existing, False
+
+    job = LogbookExportJob.objects.create(
+        user=user, format=fmt, params=params, fingerprint=fingerprint
+    )
+    from sims.logbook.tasks import run_logbook_export
+
+    transaction.on_commit(lambda: run_logbook_export.delay(job.pk))
+    return job, True
+
+
+def _chunks(rows: Iterable, size: int) -> Iterable[List]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _CsvSink:
+    def __init__(self, handle):
+        self.text = io.TextIOWrapper(handle, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.text)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.text.flush()
+        self.text.detach()
+
+
+class _XlsxSink:
+    """openpyxl write-only workbook so memory stays flat regardless of row count."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Logbook")
+
+    def write(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.handle)
+
+
+SINKS = {
+    LogbookExportJob.FORMAT_CSV: _CsvSink,
+    LogbookExportJob.FORMAT_XLSX: _XlsxSink,
+}
+
+
+def run_export_job(job: LogbookExportJob) -> LogbookExportJob:
+    """Write the export file chunk by chunk, recording progress as it goes."""
+
+    chunk_size = settings.LOGBOOK_EXPORT_CHUNK_SIZE
+    queryset = export_queryset(filtered_entries(job.user, job.params))
+
+    job.status = LogbookExportJob.STATUS_RUNNING
+    job.started_at = timezone.now()
+    job.rows_total = queryset.count()
+    job.rows_written = 0
+    job.error = ""
+    job.save(update_fields=["status", "started_at", "rows_total", "rows_written", "error"])
+
+    try:
+        with tempfile.TemporaryFile(mode="w+b") as handle:
+            sink = SINKS[job.format](handle)
+            sink.write([EXPORT_COLUMNS])
+
+            rows = (export_row(entry) for entry in queryset.iterator(chunk_size=chunk_size))
+            for chunk in _chunks(rows, chunk_size):
+                sink.write(chunk)
+                job.rows_written += len(chunk)
+                LogbookExportJob.objects.filter(pk=job.pk).update(rows_written=job.rows_written)
+
+            sink.close()
+            handle.seek(0)
+            filename = f"logbook_export_{job.pk}.{job.format}"
+            job.file.save(filename, File(handle), save=False)
+    except Exception as exc:
+        job.status = LogbookExportJob.STATUS_FAILED
+        job.error = str(exc)
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error", "completed_at"])
+        raise
+
+    job.status = LogbookExportJob.STATUS_COMPLETED
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "file", "rows_written", "completed_at"])
+    return job
+
+
+def purge_expired_exports(now=None) -> int:
+    """
+    Delete finished jobs, and their files, older than a download link's lifetime.
+
+    Returns how many jobs were removed. Pending and running jobs are kept.
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.LOGBOOK_EXPORT_URL_MAX_AGE)
+    expired = LogbookExportJob.objects.filter(
+        status__in=[LogbookExportJob.STATUS_COMPLETED, LogbookExportJob.STATUS_FAILED],
+        completed_at__lt=cutoff,
+    )
+    removed = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
+
+
+def download_token(job: LogbookExportJob) -> str:
+    return signing.TimestampSigner(salt=DOWNLOAD_SALT).sign(str(job.pk))
+
+
+def job_for_token(token: str) -> LogbookExportJob | None:
+    """Resolve a signed download token, or ``None`` if it is forged or expired."""
+
+    try:
+        pk = signing.TimestampSigner(salt=DOWNLOAD_SALT).unsign(
+            token, max_age=settings.LOGBOOK_EXPORT_URL_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return LogbookExportJob.objects.filter(pk=pk, status=LogbookExportJob.STATUS_COMPLETED).first()
+
+
+def job_payload(job: LogbookExportJob, request=None) -> dict:
+    payload = {
+        "id": job.pk,
+        "format": job.format,
+        "params": job.params,
+        "status": job.status,
+        "rows_total": job.rows_total,
+        "rows_written": job.rows_written,
+        "percent": job.percent,
+        "eta_seconds": job.eta_seconds,
+        "created_at": job.created_at.isoformat(),
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "error": job.error or None,
+        "download_url": None,
+    }
+    if job.status == LogbookExportJob.STATUS_COMPLETED and job.file:
+        url = reverse("logbook_api:export_download", kwargs={"token": download_token(job)})
+        payload["download_url"] = request.build_absolute_uri(url) if request else url
+    return payload
+
+
+__all__ = [
+    "EXPORT_COLUMNS",
+    "entries_for_user",
+    "export_queryset",
+    "export_row",
+    "job_for_token",
+    "job_payload",
+    "purge_expired_exports",
+    "request_export",
+    "run_export_job",
+]
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from .models import Diagnosis, LogbookEntry, LogbookReview, LogbookTemplate, Procedure, Skill
+from .widgets import AutocompleteSelect, AutocompleteSelectMultiple
 
 User = get_user_model()
 
@@ -108,12 +109,18 @@ class LogbookEntryCreateForm(forms.ModelForm):
             "rotation": forms.Select(attrs={"class": "form-control"}),
             "supervisor": forms.Select(attrs={"class": "form-control"}),
             "template": forms.Select(attrs={"class": "form-control"}),
-            "primary_diagnosis": forms.Select(attrs={"class": "form-control"}),
-            "secondary_diagnoses": forms.SelectMultiple(
-                attrs={"class": "form-control", "size": "5"}
+            "primary_diagnosis": AutocompleteSelect(
+                "diagnoses", attrs={"class": "form-control"}, placeholder="Search diagnoses..."
+            ),
+            "secondary_diagnoses": AutocompleteSelectMultiple(
+                "diagnoses", attrs={"class": "form-control"}, placeholder="Search diagnoses..."
+            ),
+            "procedures": AutocompleteSelectMultiple(
+                "procedures", attrs={"class": "form-control"}, placeholder="Search procedures..."
+            ),
+            "skills": AutocompleteSelectMultiple(
+                "skills", attrs={"class": "form-control"}, placeholder="Search skills..."
             ),
-            "procedures": forms.SelectMultiple(attrs={"class": "form-control", "size": "6"}),
-            "skills": forms.SelectMultiple(attrs={"class": "form-control", "size": "6"}),
         }
 
     def __init__(self, *args, **kwargs):
@@ -925,6 +932,10 @@ class BulkLogbookActionForm(forms.Form):
         return cleaned_data
 
 
+# Procedure categories offered on the quick entry form.
+QUICK_PROCEDURE_CATEGORIES = ["basic", "intermediate"]
+
+
 class QuickLogbookEntryForm(forms.ModelForm):
     """
     Simplified form for quick logbook entry creation.
@@ -960,8 +971,12 @@ class QuickLogbookEntryForm(forms.ModelForm):
                     "placeholder": "Main presenting complaint...",
                 }
             ),
-            "primary_diagnosis": forms.Select(attrs={"class": "form-control"}),
-            "procedures": forms.SelectMultiple(attrs={"class": "form-control", "size": "4"}),
+            "primary_diagnosis": AutocompleteSelect(
+                "diagnoses", attrs={"class": "form-control"}, placeholder="Search diagnoses..."
+            ),
+            "procedures": AutocompleteSelectMultiple(
+                "procedures", attrs={"class": "form-control"}, placeholder="Search procedures..."
+            ),
             "learning_points": forms.Textarea(
                 attrs={"rows": 3, "class": "form-control", "placeholder": "Key learning points..."}
             ),
@@ -993,8 +1008,10 @@ class QuickLogbookEntryForm(forms.ModelForm):
         ).order_by("name")
 
         self.fields["procedures"].queryset = Procedure.objects.filter(
-            is_active=True, category__in=["basic", "intermediate"]
+            is_active=True, category__in=QUICK_PROCEDURE_CATEGORIES
         ).order_by("name")
+        # Keep the typeahead to the same categories the queryset accepts.
+        self.fields["procedures"].widget.params = {"category": ",".join(QUICK_PROCEDURE_CATEGORIES)}
 
         # User-specific rotations
         if self.user.role == "pg":
@@ -1345,7 +1362,11 @@ class PGLogbookEntryForm(forms.ModelForm):
                     "placeholder": "Brief relevant history of the patient",
                 }
             ),
-            "primary_diagnosis": forms.Select(attrs={"class": "form-control"}),
+            "primary_diagnosis": AutocompleteSelect(
+                "diagnoses",
+                attrs={"class": "form-control"},
+                placeholder="Select primary diagnosis...",
+            ),
             "management_action": forms.Textarea(
                 attrs={
                     "rows": 5,
@@ -1552,6 +1573,7 @@ class SupervisorLogbookReviewForm(forms.Form):
         required=False,
         label="Feedback / Comments",
     )
+    version = forms.IntegerField(required=False, widget=forms.HiddenInput())
 
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,35 @@
+"""Management command to rebuild the denormalised counters on logbook entries."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from sims.logbook.counters import refresh_entry_counters
+from sims.logbook.models import LogbookEntry
+
+
+class Command(BaseCommand):
+    help = "Recompute procedure/skill counts, CME points and display summaries for logbook entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Entries recomputed per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        ids = LogbookEntry.objects.order_by("pk").values_list("pk", flat=True)
+
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            updated += refresh_entry_counters(batch)
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled counters for {updated} logbook entries"))
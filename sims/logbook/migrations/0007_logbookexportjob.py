@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('logbook', '0006_remove_date_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogbookExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel')], default='csv', max_length=8)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Normalised export filters')),
+                ('fingerprint', models.CharField(help_text='Hash of user scope, format and filters used for deduplication', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to='exports/logbook/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(help_text='User who requested the export', on_delete=django.db.models.deletion.CASCADE, related_name='logbook_export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Logbook Export Job',
+                'verbose_name_plural': 'Logbook Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'created_at'], name='logbook_log_fingerp_aa0ffd_idx'), models.Index(fields=['user', 'created_at'], name='logbook_log_user_id_49dd09_idx')],
+            },
+        ),
+    ]
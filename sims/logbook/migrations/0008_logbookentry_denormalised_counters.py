@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0007_logbookexportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logbookentry',
+            name='cme_points',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='procedure_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='procedure_difficulty',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of difficulty levels of linked procedures'),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='procedures_summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='secondary_diagnosis_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='skill_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='logbookentry',
+            name='skills_summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0008_logbookentry_denormalised_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logbookentry',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented on every save; stale writes raise ConcurrentUpdateError'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
@@ -400,6 +400,18 @@ class LogbookTemplate(models.Model):
 
 
 # --- REVISED LogbookEntry MODEL ---
+class ConcurrentUpdateError(Exception):
+    """Raised when a logbook entry was changed by someone else since it was read."""
+
+    def __init__(self, entry, expected_version):
+        self.entry_id = entry.pk
+        self.expected_version = expected_version
+        super().__init__(
+            f"Logbook entry {entry.pk} was modified concurrently "
+            f"(expected version {expected_version})."
+        )
+
+
 class LogbookEntry(models.Model):
     """
     Model representing individual logbook entries documenting clinical experiences.
@@ -587,6 +599,24 @@ class LogbookEntry(models.Model):
         help_text="Date and time when entry was approved by supervisor",
     )
 
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every save; stale writes raise ConcurrentUpdateError",
+    )
+
+    # Denormalised from the m2m relations by sims.logbook.counters; kept current by
+    # m2m_changed handlers and rebuilt with `manage.py backfill_logbook_counters`.
+    procedure_count = models.PositiveIntegerField(default=0, editable=False)
+    skill_count = models.PositiveIntegerField(default=0, editable=False)
+    secondary_diagnosis_count = models.PositiveIntegerField(default=0, editable=False)
+    cme_points = models.PositiveIntegerField(default=0, editable=False)
+    procedure_difficulty = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Sum of difficulty levels of linked procedures"
+    )
+    procedures_summary = models.TextField(blank=True, editable=False)
+    skills_summary = models.TextField(blank=True, editable=False)
+
     class Meta:
         verbose_name = "Logbook Entry"
         verbose_name_plural = "Logbook Entries"
@@ -668,9 +698,52 @@ class LogbookEntry(models.Model):
         intended_status = self.status
         self._handle_status_change(old_status, intended_status)
 
-        super().save(*args, **kwargs)
+        # A savepoint keeps a ConcurrentUpdateError from poisoning the caller's transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            if not is_new_entry and not kwargs.get("force_insert"):
+                kwargs["update_fields"] = self._claim_version(
+                    kwargs.get("using"), kwargs.get("update_fields")
+                )
+            super().save(*args, **kwargs)
+
+    DENORMALISED_FIELDS = (
+        "procedure_count",
+        "skill_count",
+        "secondary_diagnosis_count",
+        "cme_points",
+        "procedure_difficulty",
+        "procedures_summary",
+        "skills_summary",
+    )
+
+    def _claim_version(self, using, update_fields):
+        """
+        Compare-and-set: ``UPDATE ... SET version = n + 1 WHERE id = %s AND version = n``.
+
+        Returns the fields the save that follows should write, or ``None`` when
+        the row is gone and the save should insert it. The claiming UPDATE keeps
+        the row locked until the transaction ends, so that save cannot race.
+        The counter columns are owned by sims.logbook.counters, so an ordinary
+        save never writes back whatever stale copy this instance holds.
+        """
+        expected = self.version
+        manager = type(self)._base_manager.db_manager(using)
+        if not manager.filter(pk=self.pk, version=expected).update(version=expected + 1):
+            if manager.filter(pk=self.pk).exists():
+                raise ConcurrentUpdateError(self, expected)
+            return update_fields
+        self.version = expected + 1
+        if update_fields is not None:
+            return [name for name in update_fields if name != "version"]
+        skipped = {"version", *self.DENORMALISED_FIELDS}
+        deferred = self.get_deferred_fields()
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in skipped and field.attname not in deferred
+        ]
 
-    def _handle_status_change(self, old_status, new_status_intended):
+    def _handle_status_change(self, old_status, new_status_intended, notify=True):
         now = timezone.now()
         final_status_to_set = new_status_intended
 
@@ -679,7 +752,8 @@ class LogbookEntry(models.Model):
                 if old_status == "draft" or old_status is None or old_status == "returned":
                     self.submitted_to_supervisor_at = now
                     self.supervisor_action_at = None
-                    self._notify_supervisor_of_submission()
+                    if notify:
+                        self._notify_supervisor_of_submission()
                     final_status_to_set = "pending"
             else:
                 final_status_to_set = "draft"
@@ -765,29 +839,17 @@ class LogbookEntry(models.Model):
         return status_colors.get(self.status, "#6c757d")
 
     def get_procedures_display(self):
-        procedures = self.procedures.all()
-        if not procedures.exists():
-            return "No procedures recorded"
-        if procedures.count() <= 3:
-            return ", ".join([p.name for p in procedures])
-        return f"{', '.join([p.name for p in procedures[:3]])} (+{procedures.count() - 3} more)"
+        return self.procedures_summary or "No procedures recorded"
 
     def get_skills_display(self):
-        skills = self.skills.all()
-        if not skills.exists():
-            return "No skills recorded"
-        if skills.count() <= 3:
-            return ", ".join([s.name for s in skills])
-        return f"{', '.join([s.name for s in skills[:3]])} (+{skills.count() - 3} more)"
+        return self.skills_summary or "No skills recorded"
 
     def get_complexity_score(self):
-        procedure_complexity = sum(p.difficulty_level for p in self.procedures.all())
-        diagnosis_complexity = 1 if self.primary_diagnosis else 0
-        diagnosis_complexity += self.secondary_diagnoses.count()
-        return procedure_complexity + diagnosis_complexity
+        diagnosis_complexity = 1 if self.primary_diagnosis_id else 0
+        return self.procedure_difficulty + diagnosis_complexity + self.secondary_diagnosis_count
 
     def get_cme_points(self):
-        return sum(p.cme_points for p in self.procedures.all())
+        return self.cme_points
 
     def get_absolute_url(self):
         return reverse("logbook:detail", kwargs={"pk": self.pk})
@@ -1049,16 +1111,20 @@ class LogbookStatistics(models.Model):
         ).count()  # Map 'returned' to 'revision_entries'
         # Not tracking rejected_entries directly in stats model for now
 
-        procedure_entries = entries.filter(procedures__isnull=False).distinct()
-        self.total_procedures = sum(e.procedures.count() for e in procedure_entries)
-        self.unique_procedures = procedure_entries.values("procedures").distinct().count()
-
-        skill_entries = entries.filter(skills__isnull=False).distinct()
-        self.total_skills = sum(e.skills.count() for e in skill_entries)
-        self.unique_skills = skill_entries.values("skills").distinct().count()
-
-        approved_entries_qs = entries.filter(status="approved")
-        self.total_cme_points = sum(e.get_cme_points() for e in approved_entries_qs)
+        totals = entries.aggregate(
+            procedures=models.Sum("procedure_count"),
+            skills=models.Sum("skill_count"),
+            cme=models.Sum("cme_points", filter=models.Q(status="approved")),
+        )
+        self.total_procedures = totals["procedures"] or 0
+        self.unique_procedures = (
+            entries.filter(procedures__isnull=False).values("procedures").distinct().count()
+        )
+        self.total_skills = totals["skills"] or 0
+        self.unique_skills = (
+            entries.filter(skills__isnull=False).values("skills").distinct().count()
+        )
+        self.total_cme_points = totals["cme"] or 0
 
         non_archived_non_draft_entries_count = entries.exclude(
             status__in=["draft", "archived"]
@@ -1134,3 +1200,74 @@ class LogbookStatistics(models.Model):
         elif self.total_entries > 0:
             return "Poor"
         return "N/A"
+
+
+class LogbookExportJob(models.Model):
+    """Background CSV/Excel export of logbook entries with progress tracking."""
+
+    FORMAT_CSV = "csv"
+    FORMAT_XLSX = "xlsx"
+    FORMAT_CHOICES = [
+        (FORMAT_CSV, "CSV"),
+        (FORMAT_XLSX, "Excel"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="logbook_export_jobs",
+        help_text="User who requested the export",
+    )
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES, default=FORMAT_CSV)
+    params = models.JSONField(default=dict, blank=True, help_text="Normalised export filters")
+    fingerprint = models.CharField(
+        max_length=64, help_text="Hash of user scope, format and filters used for deduplication"
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/logbook/", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Logbook Export Job"
+        verbose_name_plural = "Logbook Export Jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["fingerprint", "created_at"]),
+            models.Index(fields=["user", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Logbook export #{self.pk} ({self.format}, {self.status})"
+
+    @property
+    def percent(self):
+        if self.status == self.STATUS_COMPLETED:
+            return 100.0
+        if not self.rows_total:
+            return 0.0
+        return round(self.rows_written / self.rows_total * 100, 1)
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds remaining, extrapolated from throughput so far."""
+        if self.status != self.STATUS_RUNNING or not self.started_at or not self.rows_written:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        remaining = max(self.rows_total - self.rows_written, 0)
+        return round(elapsed / self.rows_written * remaining, 1)
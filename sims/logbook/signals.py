@@ -0,0 +1,87 @@
+"""Signal handlers for the logbook app."""
+
+from __future__ import annotations
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from sims.logbook.autocomplete import kind_for_model, registry
+from sims.logbook.counters import COUNTER_FIELDS, entry_ids_for, refresh_entry_counters
+from sims.logbook.models import Diagnosis, LogbookEntry, Procedure, Skill
+
+# Reference model -> LogbookEntry m2m fields whose counters depend on it.
+COUNTED_RELATIONS = {
+    Procedure: ["procedures"],
+    Skill: ["skills"],
+    Diagnosis: ["secondary_diagnoses"],
+}
+
+
+@receiver(post_save, sender=Diagnosis)
+@receiver(post_save, sender=Procedure)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Diagnosis)
+@receiver(post_delete, sender=Procedure)
+@receiver(post_delete, sender=Skill)
+def invalidate_autocomplete_index(sender, **kwargs) -> None:
+    """Rebuild the typeahead index after any change to the reference tables."""
+
+    kind = kind_for_model(sender)
+    if kind:
+        registry.invalidate(kind)
+
+
+@receiver(m2m_changed, sender=LogbookEntry.procedures.through)
+@receiver(m2m_changed, sender=LogbookEntry.skills.through)
+@receiver(m2m_changed, sender=LogbookEntry.secondary_diagnoses.through)
+def refresh_counters_on_m2m_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep the denormalised counters in step with procedure/skill/diagnosis links."""
+
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_entry_counters([instance.pk])
+            instance.refresh_from_db(fields=COUNTER_FIELDS)
+        return
+
+    # Reverse side, e.g. ``procedure.logbook_entries.add(entry)``.
+    if action == "pre_clear":
+        field_name = COUNTED_RELATIONS[type(instance)][0]
+        instance._logbook_entries_to_refresh = entry_ids_for(field_name, [instance.pk])
+    elif action == "post_clear":
+        refresh_entry_counters(getattr(instance, "_logbook_entries_to_refresh", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_entry_counters(pk_set or [])
+
+
+@receiver(post_save, sender=Procedure)
+def refresh_counters_on_procedure_change(sender, instance, created, **kwargs):
+    """CME points and difficulty are copied into entries, so edits must propagate."""
+
+    if not created:
+        refresh_entry_counters(entry_ids_for("procedures", [instance.pk]))
+
+
+@receiver(post_save, sender=Skill)
+def refresh_counters_on_skill_change(sender, instance, created, **kwargs):
+    if not created:
+        refresh_entry_counters(entry_ids_for("skills", [instance.pk]))
+
+
+@receiver(pre_delete, sender=Diagnosis)
+@receiver(pre_delete, sender=Procedure)
+@receiver(pre_delete, sender=Skill)
+def remember_entries_before_delete(sender, instance, **kwargs):
+    """Cascade deletes of through rows do not send m2m_changed; note who to recount."""
+
+    instance._logbook_entries_to_refresh = [
+        pk
+        for field_name in COUNTED_RELATIONS[sender]
+        for pk in entry_ids_for(field_name, [instance.pk])
+    ]
+
+
+@receiver(post_delete, sender=Diagnosis)
+@receiver(post_delete, sender=Procedure)
+@receiver(post_delete, sender=Skill)
+def refresh_counters_after_delete(sender, instance, **kwargs):
+    refresh_entry_counters(getattr(instance, "_logbook_entries_to_refresh", []))
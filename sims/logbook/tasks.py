@@ -0,0 +1,23 @@
+"""Celery tasks for the logbook app."""
+
+from celery import shared_task
+
+from sims.logbook.exports import purge_expired_exports, run_export_job
+from sims.logbook.models import LogbookExportJob
+
+
+@shared_task
+def run_logbook_export(job_id: int) -> int:
+    """Build the file for a queued export job; returns the number of rows written."""
+
+    job = LogbookExportJob.objects.select_related("user").get(pk=job_id)
+    if job.status == LogbookExportJob.STATUS_COMPLETED:
+        return job.rows_written
+    return run_export_job(job).rows_written
+
+
+@shared_task
+def purge_logbook_exports() -> int:
+    """Remove export files whose download links have expired; returns jobs removed."""
+
+    return purge_expired_exports()
@@ -1,13 +1,31 @@
 """Tests for logbook supervisor verification API endpoints."""
 
+import csv
+import io
 from datetime import date, timedelta
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 
-from sims.logbook.models import LogbookEntry
+from sims.logbook.autocomplete import registry
+from sims.logbook.exports import (
+    EXPORT_COLUMNS,
+    download_token,
+    purge_expired_exports,
+    run_export_job,
+)
+from sims.logbook.forms import QuickLogbookEntryForm
+from sims.logbook.models import (
+    ConcurrentUpdateError,
+    Diagnosis,
+    LogbookEntry,
+    LogbookExportJob,
+    Procedure,
+)
 from sims.rotations.models import Department, Hospital, Rotation
 from sims.users.models import User
 
@@ -189,3 +207,271 @@ class LogbookVerificationAPITests(TestCase):
         response = self.client.patch(url)
 
         self.assertEqual(response.status_code, 404)
+
+    def test_verify_with_stale_version_conflicts(self):
+        """A client holding an old version gets 409 instead of overwriting."""
+        stale_version = self.pending_entry.version
+        LogbookEntry.objects.get(pk=self.pending_entry.pk).save()  # another tab edits first
+
+        self.client.force_authenticate(self.supervisor)
+        url = reverse("logbook_api:verify", kwargs={"pk": self.pending_entry.id})
+        response = self.client.patch(url, {"version": stale_version}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["current_version"], stale_version + 1)
+        self.pending_entry.refresh_from_db()
+        self.assertEqual(self.pending_entry.status, "pending")
+
+        response = self.client.patch(url, {"version": stale_version + 1}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["version"], stale_version + 2)
+
+    def test_stale_instance_save_raises(self):
+        first = LogbookEntry.objects.get(pk=self.pending_entry.pk)
+        second = LogbookEntry.objects.get(pk=self.pending_entry.pk)
+        first.case_title = "First"
+        first.save()
+
+        second.case_title = "Second"
+        with self.assertRaises(ConcurrentUpdateError):
+            second.save()
+        self.assertEqual(LogbookEntry.objects.get(pk=self.pending_entry.pk).case_title, "First")
+
+
+class LogbookAutocompleteAPITests(TestCase):
+    """Tests for the typeahead endpoints backing the entry form pickers."""
+
+    def setUp(self):
+        registry.clear()
+        self.supervisor = User.objects.create_user(
+            username="sup_auto",
+            password="testpass",
+            role="supervisor",
+            email="sup_auto@example.com",
+            specialty="medicine",
+        )
+        self.pg = User.objects.create_user(
+            username="pg_auto",
+            password="testpass",
+            role="pg",
+            email="pg_auto@example.com",
+            specialty="medicine",
+            year="1",
+            supervisor=self.supervisor,
+        )
+        self.mi = Diagnosis.objects.create(
+            name="Myocardial Infarction", category="cardiovascular", icd_code="I21"
+        )
+        self.migraine = Diagnosis.objects.create(name="Migraine", category="neurological")
+        Diagnosis.objects.create(name="Mild Anaemia", category="other", is_active=False)
+        self.central_line = Procedure.objects.create(name="Central Line Insertion")
+        self.cannula = Procedure.objects.create(name="Cannulation")
+
+        entry = LogbookEntry.objects.create(
+            pg=self.pg,
+            case_title="Chest pain",
+            date=date.today(),
+            location_of_activity="ER",
+            patient_history_summary="History",
+            management_action="Action",
+            topic_subtopic="Topic",
+            primary_diagnosis=self.migraine,
+        )
+        entry.procedures.add(self.cannula)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.pg)
+
+    def _search(self, kind, query, **params):
+        url = reverse("logbook_api:autocomplete", kwargs={"kind": kind})
+        return self.client.get(url, {"q": query, **params})
+
+    def test_prefix_matches_ordered_by_usage(self):
+        response = self._search("diagnoses", "m")
+
+        self.assertEqual(response.status_code, 200)
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertEqual(ids, [self.migraine.id, self.mi.id])
+        self.assertEqual(response.data["results"][1]["text"], "Myocardial Infarction (I21)")
+
+        response = self._search("diagnoses", "i21")
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.mi.id])
+
+    def test_matches_inner_words(self):
+        response = self._search("procedures", "LINE")
+
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.central_line.id])
+
+    def test_limit_and_unknown_kind(self):
+        response = self._search("procedures", "", limit=1)
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.cannula.id])
+
+        response = self._search("rotations", "a")
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_is_reused_and_rebuilt_on_change(self):
+        registry.search("procedures", "c")
+        with self.assertNumQueries(0):
+            registry.search("procedures", "ca")
+
+        Procedure.objects.create(name="Cardioversion")
+        names = [s.text for s in registry.search("procedures", "car")]
+        self.assertEqual(names, ["Cardioversion"])
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self._search("skills", "a")
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_quick_entry_form_does_not_render_procedure_catalogue(self):
+        html = str(QuickLogbookEntryForm(user=self.pg)["procedures"])
+
+        url = reverse("logbook_api:autocomplete", kwargs={"kind": "procedures"})
+        self.assertIn(f'data-autocomplete-url="{url}?category=basic%2Cintermediate"', html)
+        self.assertNotIn(self.cannula.name, html)
+
+    def test_category_filter_matches_quick_entry_queryset(self):
+        Procedure.objects.create(name="Cardiac Catheterisation", category="advanced")
+
+        response = self._search("procedures", "ca", category="basic,intermediate")
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.cannula.id])
+
+        response = self._search("procedures", "ca")
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+@override_settings(LOGBOOK_EXPORT_CHUNK_SIZE=2)
+class LogbookExportJobAPITests(TestCase):
+    """Tests for background logbook exports."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create_user(
+            username="sup_export",
+            password="testpass",
+            role="supervisor",
+            email="sup_export@example.com",
+            specialty="surgery",
+        )
+        self.pg = User.objects.create_user(
+            username="pg_export",
+            password="testpass",
+            role="pg",
+            email="pg_export@example.com",
+            specialty="surgery",
+            year="1",
+            supervisor=self.supervisor,
+        )
+        procedure = Procedure.objects.create(name="Suturing", cme_points=2)
+        for index in range(5):
+            entry = LogbookEntry.objects.create(
+                pg=self.pg,
+                case_title=f"Case {index}",
+                date=date.today() - timedelta(days=index),
+                location_of_activity="Ward",
+                patient_history_summary="History",
+                management_action="Action",
+                topic_subtopic="Topic",
+                status="approved" if index % 2 else "draft",
+            )
+            entry.procedures.add(procedure)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.pg)
+        self.url = reverse("logbook_api:export_create")
+
+    def _create(self, **payload):
+        with mock.patch("sims.logbook.tasks.run_logbook_export.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, payload, format="json")
+        return response, delay
+
+    def test_create_queues_job(self):
+        response, delay = self._create(format="csv", status="approved")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertEqual(response.data["params"], {"status": "approved"})
+        delay.assert_called_once_with(response.data["id"])
+
+    def test_identical_request_is_deduplicated(self):
+        first, _ = self._create(format="csv")
+        second, delay = self._create(format="csv")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["id"], first.data["id"])
+        delay.assert_not_called()
+
+        other_format, delay = self._create(format="xlsx")
+        self.assertEqual(other_format.status_code, 202)
+        delay.assert_called_once()
+
+    def test_invalid_params_rejected(self):
+        response, delay = self._create(format="pdf")
+        self.assertEqual(response.status_code, 400)
+        response, delay = self._create(format="csv", start_date="yesterday")
+        self.assertEqual(response.status_code, 400)
+        delay.assert_not_called()
+
+    def test_run_csv_export_and_download(self):
+        response, _ = self._create(format="csv", status="approved")
+        job = run_export_job(LogbookExportJob.objects.get(pk=response.data["id"]))
+
+        self.assertEqual(job.status, LogbookExportJob.STATUS_COMPLETED)
+        self.assertEqual((job.rows_total, job.rows_written), (2, 2))
+
+        detail = self.client.get(reverse("logbook_api:export_detail", kwargs={"pk": job.pk}))
+        self.assertEqual(detail.data["percent"], 100.0)
+        self.assertTrue(detail.data["download_url"])
+
+        anonymous = APIClient()
+        download = anonymous.get(detail.data["download_url"])
+        self.assertEqual(download.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b"".join(download.streaming_content).decode())))
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][12], "2")
+
+    def test_run_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        response, _ = self._create(format="xlsx")
+        job = run_export_job(LogbookExportJob.objects.get(pk=response.data["id"]))
+
+        with job.file.open("rb") as handle:
+            sheet = load_workbook(handle, read_only=True).active
+            rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual(len(rows), 6)
+
+    def test_download_rejects_tampered_or_expired_token(self):
+        response, _ = self._create(format="csv")
+        job = run_export_job(LogbookExportJob.objects.get(pk=response.data["id"]))
+        token = download_token(job)
+
+        url = reverse("logbook_api:export_download", kwargs={"token": token + "x"})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        url = reverse("logbook_api:export_download", kwargs={"token": token})
+        with override_settings(LOGBOOK_EXPORT_URL_MAX_AGE=-1):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_expired_exports_are_purged_with_their_files(self):
+        response, _ = self._create(format="csv")
+        job = run_export_job(LogbookExportJob.objects.get(pk=response.data["id"]))
+        storage, name = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(name))
+
+        self.assertEqual(purge_expired_exports(), 0)
+        later = job.completed_at + timedelta(seconds=settings.LOGBOOK_EXPORT_URL_MAX_AGE + 1)
+        self.assertEqual(purge_expired_exports(now=later), 1)
+
+        self.assertFalse(LogbookExportJob.objects.filter(pk=job.pk).exists())
+        self.assertFalse(storage.exists(name))
+
+    def test_jobs_are_private_to_requester(self):
+        response, _ = self._create(format="csv")
+        self.client.force_authenticate(self.supervisor)
+        detail = self.client.get(
+            reverse("logbook_api:export_detail", kwargs={"pk": response.data["id"]})
+        )
+        self.assertEqual(detail.status_code, 404)
@@ -0,0 +1,118 @@
+"""Tests for the denormalised procedure/skill/CME counters on logbook entries."""
+
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from sims.logbook.models import Diagnosis, LogbookEntry, LogbookStatistics, Procedure, Skill
+from sims.users.models import User
+
+
+class LogbookEntryCounterTests(TestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(
+            username="sup_counts",
+            password="testpass",
+            role="supervisor",
+            email="sup_counts@example.com",
+            specialty="surgery",
+        )
+        self.pg = User.objects.create_user(
+            username="pg_counts",
+            password="testpass",
+            role="pg",
+            email="pg_counts@example.com",
+            specialty="surgery",
+            year="1",
+            supervisor=self.supervisor,
+        )
+        self.procedures = [
+            Procedure.objects.create(
+                name=f"Procedure {letter}", category="basic", difficulty_level=2, cme_points=3
+            )
+            for letter in "ABCDE"
+        ]
+        self.skill = Skill.objects.create(name="Communication")
+        self.diagnosis = Diagnosis.objects.create(name="Appendicitis", category="other")
+        self.entry = LogbookEntry.objects.create(
+            pg=self.pg,
+            case_title="Counters",
+            date=date.today(),
+            location_of_activity="Ward",
+            patient_history_summary="History",
+            management_action="Action",
+            topic_subtopic="Topic",
+            status="approved",
+            primary_diagnosis=self.diagnosis,
+        )
+
+    def _reload(self):
+        return LogbookEntry.objects.get(pk=self.entry.pk)
+
+    def test_add_and_remove_update_counters(self):
+        self.entry.procedures.add(*self.procedures)
+        self.entry.skills.add(self.skill)
+        self.entry.secondary_diagnoses.add(self.diagnosis)
+
+        entry = self._reload()
+        self.assertEqual(entry.procedure_count, 5)
+        self.assertEqual(entry.skill_count, 1)
+        self.assertEqual(entry.get_cme_points(), 15)
+        self.assertEqual(entry.get_complexity_score(), 5 * 2 + 1 + 1)
+        self.assertEqual(
+            entry.get_procedures_display(), "Procedure A, Procedure B, Procedure C (+2 more)"
+        )
+        self.assertEqual(entry.get_skills_display(), "Communication")
+
+        self.entry.procedures.remove(self.procedures[0])
+        self.entry.skills.clear()
+        entry = self._reload()
+        self.assertEqual(entry.procedure_count, 4)
+        self.assertEqual(entry.get_skills_display(), "No skills recorded")
+
+    def test_reverse_side_and_reference_changes(self):
+        self.procedures[0].logbook_entries.add(self.entry)
+        self.assertEqual(self._reload().cme_points, 3)
+
+        self.procedures[0].cme_points = 7
+        self.procedures[0].save()
+        self.assertEqual(self._reload().cme_points, 7)
+
+        self.procedures[0].logbook_entries.clear()
+        self.assertEqual(self._reload().procedure_count, 0)
+
+        self.entry.procedures.add(self.procedures[1])
+        self.procedures[1].delete()
+        self.assertEqual(self._reload().procedure_count, 0)
+
+    def test_display_helpers_do_not_query(self):
+        self.entry.procedures.add(*self.procedures)
+        entry = self._reload()
+        with self.assertNumQueries(0):
+            entry.get_procedures_display()
+            entry.get_cme_points()
+            entry.get_complexity_score()
+
+    def test_statistics_use_columns(self):
+        self.entry.procedures.add(*self.procedures[:2])
+        self.entry.skills.add(self.skill)
+        stats = LogbookStatistics.objects.create(pg=self.pg)
+        stats.update_statistics()
+        self.assertEqual(stats.total_procedures, 2)
+        self.assertEqual(stats.unique_procedures, 2)
+        self.assertEqual(stats.total_skills, 1)
+        self.assertEqual(stats.total_cme_points, 6)
+
+    def test_backfill_command(self):
+        self.entry.procedures.add(*self.procedures)
+        LogbookEntry.objects.update(procedure_count=0, cme_points=0, procedures_summary="")
+
+        out = StringIO()
+        call_command("backfill_logbook_counters", batch_size=1, stdout=out)
+
+        entry = self._reload()
+        self.assertEqual(entry.procedure_count, 5)
+        self.assertEqual(entry.cme_points, 15)
+        self.assertIn("1 logbook entries", out.getvalue())
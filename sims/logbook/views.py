@@ -7,7 +7,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Q, Sum
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
@@ -23,6 +23,10 @@ from django.views.generic import (
 )
 from django.views.generic.edit import FormView
 
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import pending_item_ids
+
+from .exports import EXPORT_COLUMNS, entries_for_user, export_queryset, export_row
 from .forms import PGLogbookEntryEditForm  # Added EditForm
 from .forms import (
     BulkLogbookActionForm,
@@ -38,6 +42,7 @@ from .forms import (
     SupervisorLogbookReviewForm,
 )
 from .models import (
+    ConcurrentUpdateError,
     Diagnosis,
     LogbookEntry,
     LogbookReview,
@@ -784,7 +789,9 @@ class LogbookDashboardView(LoginRequiredMixin, LogbookAccessMixin, TemplateView)
                 )["avg"]
 
             # CME points
-            metrics["cme_points"] = sum(e.get_cme_points() for e in approved_entries)
+            metrics["cme_points"] = (
+                approved_entries.aggregate(total=Sum("cme_points"))["total"] or 0
+            )
 
             # Unique procedures and diagnoses
             metrics["unique_procedures"] = (
@@ -1038,68 +1045,16 @@ def logbook_stats_api(request):
 def export_logbook_csv(request):
     """Export logbook entries to CSV"""
     user = request.user
-
-    # Get entries based on user role
-    if user.role == "admin":
-        entries = LogbookEntry.objects.all()
-    elif user.role == "supervisor":
-        entries = LogbookEntry.objects.filter(pg__supervisor=user)
-    elif user.role == "pg":
-        entries = LogbookEntry.objects.filter(pg=user)
-    else:
-        raise PermissionDenied("You don't have permission to export entries")
+    entries = entries_for_user(user)
 
     # Create CSV response
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="logbook_export.csv"'
 
     writer = csv.writer(response)
-
-    # Write header
-    writer.writerow(
-        [
-            "PG Name",
-            "PG Username",
-            "Date",
-            "Case Title",
-            "Primary Diagnosis",
-            "Patient Age",
-            "Patient Gender",
-            "Procedures",
-            "Skills",
-            "Status",
-            "Self Score",
-            "Supervisor Score",
-            "CME Points",
-            "Created Date",
-        ]
-    )
-
-    # Write data
-    for entry in entries.select_related("pg", "primary_diagnosis").prefetch_related(
-        "procedures", "skills"
-    ):
-        procedures = ", ".join([p.name for p in entry.procedures.all()])
-        skills = ", ".join([s.name for s in entry.skills.all()])
-
-        writer.writerow(
-            [
-                entry.pg.get_full_name() if entry.pg else "",
-                entry.pg.username if entry.pg else "",
-                entry.date,
-                entry.case_title or "",
-                entry.primary_diagnosis.name if entry.primary_diagnosis else "",
-                entry.patient_age,
-                entry.get_patient_gender_display(),
-                procedures,
-                skills,
-                entry.get_status_display(),
-                entry.self_assessment_score or "",
-                entry.supervisor_assessment_score or "",
-                entry.get_cme_points(),
-                entry.created_at.date(),
-            ]
-        )
+    writer.writerow(EXPORT_COLUMNS)
+    for entry in export_queryset(entries).iterator(chunk_size=settings.LOGBOOK_EXPORT_CHUNK_SIZE):
+        writer.writerow(export_row(entry))
 
     return response
 
@@ -1152,8 +1107,8 @@ def entry_complexity_api(request, entry_id):
     complexity_data = {
         "complexity_score": entry.get_complexity_score(),
         "cme_points": entry.get_cme_points(),
-        "procedure_count": entry.procedures.count(),
-        "skill_count": entry.skills.count(),
+        "procedure_count": entry.procedure_count,
+        "skill_count": entry.skill_count,
         "procedures": [
             {"name": p.name, "difficulty": p.difficulty_level, "category": p.get_category_display()}
             for p in entry.procedures.all()
@@ -1252,7 +1207,7 @@ class LogbookAnalyticsView(LoginRequiredMixin, LogbookAccessMixin, TemplateView)
 
             avg_score = approved_entries.aggregate(avg=Avg("supervisor_assessment_score"))["avg"]
 
-            cme_points = sum(e.get_cme_points() for e in approved_entries)
+            cme_points = approved_entries.aggregate(total=Sum("cme_points"))["total"] or 0
 
             performance_data.append(
                 {
@@ -1523,7 +1478,9 @@ class SupervisorLogbookDashboardView(LoginRequiredMixin, SupervisorRequiredMixin
         # Supervisors see entries from their PGs that are 'pending'
         # Order by oldest submission first to encourage timely review
         return (
-            LogbookEntry.objects.filter(supervisor=self.request.user, status="pending")
+            LogbookEntry.objects.filter(
+                pk__in=pending_item_ids(self.request.user, ReviewInboxItem.TYPE_LOGBOOK)
+            )
             .select_related("pg")
             .order_by("submitted_to_supervisor_at")
         )
@@ -1676,22 +1633,38 @@ class SupervisorLogbookReviewActionView(LoginRequiredMixin, SupervisorRequiredMi
         action = form.cleaned_data["action"]
         supervisor_comment = form.cleaned_data["supervisor_comment"]
 
+        status_for_action = {
+            "approve": "approved",
+            "reject": "rejected",
+            "return_for_edits": "returned",
+        }
+        if action in status_for_action:
+            entry.status = status_for_action[action]
+
+        entry.supervisor_feedback = supervisor_comment
+        if form.cleaned_data.get("version"):
+            # Compare against the version the supervisor was looking at, not a fresh read.
+            entry.version = form.cleaned_data["version"]
+        # entry.supervisor_action_at = timezone.now() # Model's save method handles this
+        try:
+            entry.save()  # This will trigger LogbookEntry's save and _handle_status_change
+        except ConcurrentUpdateError:
+            messages.error(
+                self.request,
+                f"Logbook entry '{entry.case_title}' was changed by someone else while you "
+                "were reviewing it. Please check its current state and try again.",
+            )
+            return redirect(reverse_lazy("logbook:supervisor_logbook_dashboard"))
+
         if action == "approve":
-            entry.status = "approved"
             messages.success(self.request, f"Logbook entry '{entry.case_title}' approved.")
         elif action == "reject":
-            entry.status = "rejected"
             messages.warning(self.request, f"Logbook entry '{entry.case_title}' rejected.")
         elif action == "return_for_edits":
-            entry.status = "returned"
             messages.info(
                 self.request, f"Logbook entry '{entry.case_title}' returned to resident for edits."
             )
 
-        entry.supervisor_feedback = supervisor_comment
-        # entry.supervisor_action_at = timezone.now() # Model's save method handles this
-        entry.save()  # This will trigger LogbookEntry's save and _handle_status_change
-
         # Placeholder for notifying PG
         # self._notify_pg_of_supervisor_action(entry, action)
 
@@ -1725,7 +1698,9 @@ class SupervisorLogbookReviewActionView(LoginRequiredMixin, SupervisorRequiredMi
         """Optionally pre-fill comment if editing a previous review action, though this view is for new actions."""
         # entry = self.get_logbook_entry()
         # return {'supervisor_comment': entry.supervisor_feedback}
-        return super().get_initial()
+        initial = super().get_initial()
+        initial["version"] = self.get_logbook_entry().version
+        return initial
 
 
 class LogbookEntryCreateRedirectView(LoginRequiredMixin, RedirectView):
@@ -0,0 +1,65 @@
+"""Form widgets for the logbook app."""
+
+from urllib.parse import urlencode
+
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelectMixin:
+    """
+    Render only the selected options and let the browser fetch the rest.
+
+    The full catalogue is never sent with the page; base.html turns any
+    ``select[data-autocomplete-url]`` into a Select2 box backed by
+    ``/api/logbook/autocomplete/<kind>/``. ``params`` are added to that URL,
+    e.g. ``{"category": "basic,intermediate"}`` to match a narrowed queryset.
+    """
+
+    def __init__(self, kind, attrs=None, placeholder="", params=None):
+        self.kind = kind
+        self.placeholder = placeholder
+        self.params = params or {}
+        super().__init__(attrs=attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs=extra_attrs)
+        attrs.setdefault("class", "form-control")
+        url = reverse("logbook_api:autocomplete", kwargs={"kind": self.kind})
+        if self.params:
+            url = f"{url}?{urlencode(self.params)}"
+        attrs["data-autocomplete-url"] = url
+        if self.placeholder:
+            attrs["data-placeholder"] = self.placeholder
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(v) for v in value if v not in (None, "")}
+        groups = []
+        if not self.allow_multiple_selected:
+            groups.append((None, [self.create_option(name, "", "", not selected, 0)], 0))
+        if not selected:
+            return groups
+
+        queryset = getattr(self.choices, "queryset", None)
+        if queryset is not None:
+            choices = (
+                (self.choices.field.prepare_value(obj), self.choices.field.label_from_instance(obj))
+                for obj in queryset.filter(pk__in=selected)
+            )
+        else:
+            choices = ((k, v) for k, v in self.choices if str(k) in selected)
+
+        for index, (option_value, option_label) in enumerate(choices, start=len(groups)):
+            groups.append(
+                (None, [self.create_option(name, option_value, option_label, True, index)], index)
+            )
+        return groups
+
+
+class AutocompleteSelect(AutocompleteSelectMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteSelectMixin, forms.SelectMultiple):
+    pass
@@ -1 +1,10 @@
-# Admin module - no models to register yet
+from django.contrib import admin
+
+from .models import ReportTemplate
+
+
+@admin.register(ReportTemplate)
+class ReportTemplateAdmin(admin.ModelAdmin):
+    list_display = ["name", "slug", "template_name"]
+    search_fields = ["name", "slug"]
+    prepopulated_fields = {"slug": ("name",)}
@@ -0,0 +1,125 @@
+"""Five-field cron expressions for scheduled reports, evaluated in local time."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import FrozenSet, Optional
+
+from django.utils import timezone
+
+# (name, lowest, highest) for minute, hour, day of month, month, day of week.
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 6),
+)
+MONTH_NAMES = "jan feb mar apr may jun jul aug sep oct nov dec".split()
+DAY_NAMES = "sun mon tue wed thu fri sat".split()
+# Far enough to cover any valid expression, e.g. "0 0 29 2 *" across leap years.
+SEARCH_DAYS = 366 * 8
+
+
+class CronError(ValueError):
+    """Raised for malformed cron expressions."""
+
+
+def _value(token: str, index: int) -> int:
+    names = {3: MONTH_NAMES, 4: DAY_NAMES}.get(index)
+    lowered = token.lower()
+    if names and lowered in names:
+        return names.index(lowered) + (1 if index == 3 else 0)
+    if not token.isdigit():
+        raise CronError(f"Invalid {FIELDS[index][0]} value '{token}'")
+    value = int(token)
+    # Both 0 and 7 mean Sunday.
+    return 0 if index == 4 and value == 7 else value
+
+
+def _parse_field(text: str, index: int) -> FrozenSet[int]:
+    name, low, high = FIELDS[index]
+    values = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = 1
+        if step_text:
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid {name} step '{step_text}'")
+            step = int(step_text)
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            first, _, last = base.partition("-")
+            start, end = _value(first, index), _value(last, index)
+            if index == 4 and last == "7":
+                # "5-7" runs Friday through Sunday.
+                end = 6
+                values.add(0)
+        else:
+            start = _value(base, index)
+            end = high if step_text else start
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise CronError(f"{name.capitalize()} '{part}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    # Standard cron: when both day fields are restricted, either may match.
+    days_restricted: bool
+    weekdays_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        parts = (expression or "").split()
+        if len(parts) != 5:
+            raise CronError("Cron expression must have 5 fields: minute hour day month weekday")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(part, index) for index, part in enumerate(parts)
+        )
+        return cls(minutes, hours, days, months, weekdays, parts[2] != "*", parts[4] != "*")
+
+    def _day_matches(self, day) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        # date.weekday() counts from Monday; cron counts from Sunday.
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        """First matching minute strictly after ``moment``, as an aware datetime."""
+
+        local = timezone.localtime(moment).replace(second=0, microsecond=0)
+        tz = local.tzinfo
+        start = local + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(SEARCH_DAYS):
+            if self._day_matches(day):
+                floor = start.time() if day == start.date() else time.min
+                for hour in sorted(self.hours):
+                    if hour < floor.hour:
+                        continue
+                    for minute in sorted(self.minutes):
+                        if hour == floor.hour and minute < floor.minute:
+                            continue
+                        return timezone.make_aware(datetime.combine(day, time(hour, minute)), tz)
+            day += timedelta(days=1)
+        return None
+
+
+def next_run(expression: str, after: Optional[datetime] = None) -> Optional[datetime]:
+    return CronSchedule.parse(expression).next_after(after or timezone.now())
+
+
+__all__ = ["CronError", "CronSchedule", "next_run"]
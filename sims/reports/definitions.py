@@ -0,0 +1,270 @@
+"""
+Declarative report definitions compiled to a single projected query.
+
+A definition is plain JSON, stored on ``ReportTemplate.definition`` or listed
+in ``BUILTIN_DEFINITIONS``::
+
+    {
+        "title": "Logbook Summary",
+        "source": "logbook.LogbookEntry",
+        "columns": [
+            {"label": "Date", "field": "date"},
+            {"label": "Postgraduate", "fields": ["pg__first_name", "pg__last_name"]},
+            {"label": "Status", "field": "status"},
+            {"label": "Entries", "aggregate": "count", "field": "id"},
+        ],
+        "filters": {"start_date": {"field": "date", "lookup": "gte"}},
+        "where": [{"field": "status", "lookup": "in", "value": ["approved"]}],
+        "ordering": ["-date"],
+    }
+
+Only the listed field paths are selected. When any column aggregates, the
+plain columns become the GROUP BY keys. ``filters`` map request parameters
+to lookups; ``where`` lookups always apply. Rows are limited to the users the
+actor may see through the source's scope field, and choice fields are shown
+by their labels, mapped in Python from the field's choices.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Avg, Count, Max, Min, Sum
+
+from sims.analytics.services import get_accessible_users
+
+# Models a definition may read from, with the user field that scopes their rows.
+REPORT_SOURCES = {
+    "logbook.LogbookEntry": "pg",
+    "cases.ClinicalCase": "pg",
+    "rotations.Rotation": "pg",
+    "results.Score": "student",
+    "attendance.AttendanceRecord": "user",
+}
+AGGREGATES = {"count": Count, "sum": Sum, "avg": Avg, "min": Min, "max": Max}
+LOOKUPS = {"exact", "iexact", "icontains", "in", "gt", "gte", "lt", "lte", "isnull"}
+# Never selectable, even through a relation.
+PROTECTED_FIELDS = {"password"}
+# Rows are read from the database this many at a time.
+REPORT_CHUNK_SIZE = 2000
+
+LOGBOOK_SUMMARY = {
+    "title": "Logbook Summary",
+    "source": "logbook.LogbookEntry",
+    "columns": [
+        {"label": "Date", "field": "date"},
+        {"label": "Postgraduate", "fields": ["pg__first_name", "pg__last_name"]},
+        {"label": "Supervisor", "fields": ["supervisor__first_name", "supervisor__last_name"]},
+        {"label": "Case Title", "field": "case_title"},
+        {"label": "Status", "field": "status"},
+    ],
+    "filters": {
+        "start_date": {"field": "date", "lookup": "gte"},
+        "end_date": {"field": "date", "lookup": "lte"},
+        "pg_id": {"field": "pg"},
+    },
+    "ordering": ["-date"],
+}
+# Definitions for templates whose row does not carry one.
+BUILTIN_DEFINITIONS = {"logbook-summary": LOGBOOK_SUMMARY}
+
+
+class ReportDefinitionError(ValueError):
+    """Raised for definitions that reference unknown sources, fields or lookups."""
+
+
+def _display(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _converter(field) -> Callable[[Any], Any]:
+    if field.choices:
+        labels = {key: str(label) for key, label in field.flatchoices}
+        return lambda value: _display(labels.get(value, value))
+    return _display
+
+
+@dataclass(frozen=True)
+class _Filter:
+    path: str
+    lookup: str
+    field: Any
+    value: Any = None
+
+    def condition(self, value: Any) -> Dict[str, Any]:
+        if self.lookup == "isnull":
+            value = str(value).lower() in ("1", "true", "yes")
+        elif self.lookup == "in":
+            items = value.split(",") if isinstance(value, str) else list(value)
+            value = [self._clean(item) for item in items]
+        else:
+            value = self._clean(value)
+        return {f"{self.path}__{self.lookup}": value}
+
+    def _clean(self, value: Any) -> Any:
+        target = getattr(self.field, "target_field", self.field)
+        try:
+            return target.to_python(value.strip() if isinstance(value, str) else value)
+        except ValidationError as exc:
+            raise ReportDefinitionError(
+                f"Invalid value '{value}' for {self.path}: {' '.join(exc.messages)}"
+            ) from exc
+
+
+class ReportDefinition:
+    """A validated definition; :meth:`rows` runs it for an actor and parameters."""
+
+    def __init__(self, spec: dict):
+        if not isinstance(spec, dict):
+            raise ReportDefinitionError("Report definition must be an object")
+        source = spec.get("source")
+        if source not in REPORT_SOURCES:
+            raise ReportDefinitionError(f"Unknown report source '{source}'")
+        self.model = apps.get_model(source)
+        self.scope = REPORT_SOURCES[source]
+        self.title = spec.get("title", "")
+        # Models reached through any column, filter or ordering path.
+        self.related_models: Set[Any] = set()
+
+        self.paths: List[str] = []
+        self.aggregates: Dict[str, Any] = {}
+        self.labels: List[str] = []
+        # (label, [(value path or aggregate alias, converter)]) per column.
+        self._columns: List[Tuple[str, List[Tuple[str, Callable]]]] = []
+        ordering_aliases: Dict[str, str] = {}
+        for index, column in enumerate(spec.get("columns") or []):
+            self._add_column(index, column, ordering_aliases)
+        if not self.labels:
+            raise ReportDefinitionError("Report definition needs at least one column")
+
+        filters = spec.get("filters") or {}
+        self.filters = {param: self._filter(options) for param, options in filters.items()}
+        self.where = [self._filter(options) for options in spec.get("where") or []]
+        self.ordering = [
+            self._ordering(item, ordering_aliases) for item in spec.get("ordering") or []
+        ]
+
+    def _resolve(self, path: str):
+        """The model field at the end of a ``__`` path, following forward relations only."""
+
+        model, field = self.model, None
+        for part in str(path).split("__"):
+            if model is None:
+                raise ReportDefinitionError(f"'{path}' continues past a plain field")
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist as exc:
+                raise ReportDefinitionError(f"Unknown field '{path}'") from exc
+            if part in PROTECTED_FIELDS:
+                raise ReportDefinitionError(f"Field '{path}' cannot be reported")
+            if not field.concrete or field.many_to_many:
+                raise ReportDefinitionError(f"'{path}' is not a column of {model.__name__}")
+            model = field.related_model if field.is_relation else None
+            if model is not None:
+                self.related_models.add(model)
+        return field
+
+    def _add_column(self, index: int, column: dict, ordering_aliases: Dict[str, str]) -> None:
+        label = column.get("label")
+        if not label:
+            raise ReportDefinitionError(f"Column {index + 1} needs a label")
+        if "aggregate" in column:
+            function = AGGREGATES.get(column["aggregate"])
+            if function is None:
+                raise ReportDefinitionError(f"Unknown aggregate '{column['aggregate']}'")
+            path = column.get("field", "pk")
+            if path != "pk":
+                self._resolve(path)
+            alias = f"column_{index}"
+            self.aggregates[alias] = function(path, distinct=bool(column.get("distinct")))
+            ordering_aliases[label] = alias
+            self._columns.append((label, [(alias, _display)]))
+        else:
+            paths = column.get("fields") or [column.get("field")]
+            parts = [(path, _converter(self._resolve(path))) for path in paths]
+            for path in paths:
+                if path not in self.paths:
+                    self.paths.append(path)
+            ordering_aliases[label] = paths[0]
+            self._columns.append((label, parts))
+        self.labels.append(label)
+
+    def _filter(self, options: dict) -> _Filter:
+        lookup = options.get("lookup", "exact")
+        if lookup not in LOOKUPS:
+            raise ReportDefinitionError(f"Unsupported lookup '{lookup}'")
+        path = options.get("field")
+        return _Filter(path, lookup, self._resolve(path), options.get("value"))
+
+    def _ordering(self, item: str, aliases: Dict[str, str]) -> str:
+        descending = item.startswith("-")
+        name = item.lstrip("-")
+        if name in aliases:
+            name = aliases[name]
+        else:
+            self._resolve(name)
+            if self.aggregates and name not in self.paths:
+                raise ReportDefinitionError(f"Cannot order grouped rows by '{name}'")
+        return f"-{name}" if descending else name
+
+    def queryset(self, actor=None, params: Optional[dict] = None):
+        """The single projected query: selected paths (plus aggregates) as tuples."""
+
+        queryset = self.model._default_manager.all()
+        if actor is not None:
+            queryset = queryset.filter(**{f"{self.scope}__in": get_accessible_users(actor)})
+        for where in self.where:
+            queryset = queryset.filter(**where.condition(where.value))
+        for param, value in (params or {}).items():
+            if param in self.filters and value not in (None, ""):
+                queryset = queryset.filter(**self.filters[param].condition(value))
+        if self.aggregates:
+            queryset = queryset.values(*self.paths).annotate(**self.aggregates)
+            queryset = queryset.values_list(*self.paths, *self.aggregates)
+            # Grouped rows never inherit Meta.ordering, so order explicitly.
+            return queryset.order_by(*(self.ordering or self.paths))
+        queryset = queryset.values_list(*self.paths)
+        return queryset.order_by(*self.ordering) if self.ordering else queryset
+
+    def rows(self, actor=None, params: Optional[dict] = None) -> Iterator[dict]:
+        """Stream display rows keyed by column label, a database chunk at a time."""
+
+        positions = {name: index for index, name in enumerate([*self.paths, *self.aggregates])}
+        columns = [
+            (label, [(positions[name], convert) for name, convert in parts])
+            for label, parts in self._columns
+        ]
+        for row in self.queryset(actor, params).iterator(chunk_size=REPORT_CHUNK_SIZE):
+            record = {}
+            for label, parts in columns:
+                if len(parts) == 1:
+                    index, convert = parts[0]
+                    record[label] = convert(row[index])
+                else:
+                    # Multi-field columns such as first and last name are joined.
+                    record[label] = " ".join(str(convert(row[i])) for i, convert in parts).strip()
+            yield record
+
+
+def template_definition(template) -> Optional[ReportDefinition]:
+    """The template's compiled definition, falling back to the built-in one for its slug."""
+
+    spec = template.definition or BUILTIN_DEFINITIONS.get(template.slug)
+    return ReportDefinition(spec) if spec else None
+
+
+__all__ = [
+    "BUILTIN_DEFINITIONS",
+    "REPORT_SOURCES",
+    "ReportDefinition",
+    "ReportDefinitionError",
+    "template_definition",
+]
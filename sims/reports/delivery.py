@@ -0,0 +1,142 @@
+"""Email delivery for scheduled reports: one connection per batch, results per recipient."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.urls import reverse
+
+from sims.reports.jobs import EMAIL_DOWNLOAD_SALT, download_token, open_artifact
+from sims.reports.models import ReportJob, ScheduledReport
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
+
+
+@dataclass
+class _Artifact:
+    filename: str
+    size: int
+    content: Optional[bytes]  # None when the artifact is linked rather than attached
+    url: Optional[str]
+
+
+def recipients(schedule: ScheduledReport) -> List[str]:
+    return [email.strip() for email in schedule.email_to.split(",") if email.strip()]
+
+
+def email_link(job: ReportJob) -> str:
+    path = reverse(
+        "reports_api:job_download", kwargs={"token": download_token(job, EMAIL_DOWNLOAD_SALT)}
+    )
+    return f"{settings.REPORT_LINK_BASE_URL.rstrip('/')}{path}"
+
+
+def _load(job: ReportJob) -> _Artifact:
+    handle = open_artifact(job)
+    if handle is None:
+        raise FileNotFoundError(f"Report artifact '{job.file_path}' is missing")
+    with handle:
+        size = handle.size
+        if size > settings.REPORT_ATTACHMENT_MAX_BYTES:
+            content, url = None, email_link(job)
+        else:
+            content, url = handle.read(), None
+    return _Artifact(f"{job.template.slug}.{job.format}", size, content, url)
+
+
+def _message(schedule: ScheduledReport, artifact: _Artifact, recipient: str, connection):
+    if artifact.url:
+        body = (
+            f"The report is too large to attach ({artifact.size // 1024} KiB). "
+            f"Download it here:\n\n{artifact.url}\n\n"
+            f"The link expires in {settings.REPORT_EMAIL_LINK_MAX_AGE // 3600} hours."
+        )
+    else:
+        body = "Please find the attached report."
+    message = EmailMessage(
+        subject=f"Scheduled report: {schedule.template.name}",
+        body=body,
+        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
+        to=[recipient],
+        connection=connection,
+    )
+    if artifact.content is not None:
+        message.attach(artifact.filename, artifact.content)
+    return message
+
+
+def _open(connection) -> None:
+    try:
+        connection.open()
+    except Exception:
+        # send_messages retries the open and records the failure per message.
+        logger.exception("Could not open mail connection")
+
+
+def deliver_reports(
+    rendered: Iterable[Tuple[ScheduledReport, ReportJob]],
+) -> Dict[int, List[dict]]:
+    """
+    Email each rendered schedule to its recipients; returns results keyed by schedule id.
+
+    Every recipient gets their own message, sent over a connection that is
+    reused for ``REPORT_EMAIL_BATCH_SIZE`` messages, and a refused recipient
+    or dropped connection only fails that message. Artifacts shared between
+    schedules are read once. Above ``REPORT_ATTACHMENT_MAX_BYTES`` the
+    message carries a signed download link instead of the file.
+    """
+    results: Dict[int, List[dict]] = {}
+    artifacts: Dict[str, _Artifact] = {}
+    outbox = []
+    for schedule, job in rendered:
+        results[schedule.pk] = []
+        try:
+            if job.file_path not in artifacts:
+                artifacts[job.file_path] = _load(job)
+            artifact = artifacts[job.file_path]
+        except Exception as exc:
+            logger.exception("Could not load report for schedule %s", schedule.pk)
+            for recipient in recipients(schedule):
+                results[schedule.pk].append(
+                    {"recipient": recipient, "status": DELIVERY_FAILED, "error": str(exc)}
+                )
+            continue
+        for recipient in recipients(schedule):
+            outbox.append((schedule, artifact, recipient))
+
+    batch_size = max(settings.REPORT_EMAIL_BATCH_SIZE, 1)
+    for start in range(0, len(outbox), batch_size):
+        connection = get_connection()
+        _open(connection)
+        try:
+            for schedule, artifact, recipient in outbox[start : start + batch_size]:
+                result = {
+                    "recipient": recipient,
+                    "method": "link" if artifact.url else "attachment",
+                }
+                try:
+                    sent = connection.send_messages(
+                        [_message(schedule, artifact, recipient, connection)]
+                    )
+                except Exception as exc:
+                    logger.warning("Report email to %s failed: %s", recipient, exc)
+                    result.update(status=DELIVERY_FAILED, error=str(exc))
+                    # The failure may have left the session unusable; start a fresh one.
+                    connection.close()
+                    _open(connection)
+                else:
+                    result["status"] = DELIVERY_SENT if sent else DELIVERY_FAILED
+                results[schedule.pk].append(result)
+        finally:
+            connection.close()
+    return results
+
+
+__all__ = ["DELIVERY_FAILED", "DELIVERY_SENT", "deliver_reports", "email_link", "recipients"]
@@ -0,0 +1,263 @@
+"""Report jobs: content-addressed artifacts rendered in the background."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from sims.analytics.services import get_accessible_users
+from sims.reports.definitions import template_definition
+from sims.reports.models import ReportJob, ReportTemplate
+from sims.reports.services import REPORT_STORAGE, ReportService
+
+DOWNLOAD_SALT = "sims.reports.job-download"
+EMAIL_DOWNLOAD_SALT = "sims.reports.email-download"
+# Each salt signs links with its own lifetime setting.
+TOKEN_LIFETIMES = (
+    (DOWNLOAD_SALT, "REPORT_DOWNLOAD_URL_MAX_AGE"),
+    (EMAIL_DOWNLOAD_SALT, "REPORT_EMAIL_LINK_MAX_AGE"),
+)
+ARTIFACT_NAME = "cache/{cache_key}.{format}"
+
+
+def table_watermark(model) -> dict:
+    """Newest change time and row count of one table."""
+
+    aggregates = {"total": Count("pk")}
+    if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        aggregates["latest"] = Max("updated_at")
+    summary = model._default_manager.aggregate(**aggregates)
+    latest = summary.get("latest")
+    history = getattr(model, "history", None)
+    if latest is None and history is not None:
+        # Tables without updated_at, such as users, date their edits through
+        # their django-simple-history records.
+        latest = history.aggregate(latest=Max("history_date"))["latest"]
+    # The count catches deletions that leave the newest change time unchanged.
+    return {
+        "source": model._meta.label,
+        "latest": latest.isoformat() if latest else None,
+        "total": summary["total"],
+    }
+
+
+def definition_watermark(definition) -> list:
+    """Watermarks of the source table and of every table its paths join."""
+
+    models = {definition.model, *definition.related_models}
+    return [table_watermark(model) for model in sorted(models, key=lambda m: m._meta.label)]
+
+
+def normalise_params(params: dict | None) -> dict:
+    """Drop blank values and strip whitespace so equivalent requests hash alike."""
+
+    cleaned = {}
+    for key, value in (params or {}).items():
+        value = str(value).strip()
+        if value:
+            cleaned[str(key)] = value
+    return cleaned
+
+
+def actor_scope(user) -> str:
+    """What the user can see: everything, or the exact set of visible users."""
+
+    if user.is_superuser or user.role == "admin":
+        return "all"
+    visible = sorted(get_accessible_users(user).values_list("pk", flat=True))
+    return f"{user.role}:{','.join(map(str, visible))}"
+
+
+def report_cache_key(user, template: ReportTemplate, fmt: str, params: dict) -> str:
+    """
+    Hash of everything that decides a report's content.
+
+    Definition-backed templates read live data, so the key carries a watermark
+    of the source table and of every table its column, filter and ordering
+    paths join. Changes made with queryset ``update()`` that leave
+    ``updated_at`` (or, for users, the history table) and the row count alone
+    are not seen. Templates without a definition render from their parameters.
+    """
+    definition = template_definition(template)
+    payload = json.dumps(
+        {
+            "template": template.slug,
+            "defaults": template.default_params,
+            "definition": template.definition,
+            "format": fmt,
+            "params": params,
+            "scope": actor_scope(user),
+            "watermark": definition_watermark(definition) if definition else None,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def artifact_name(job: ReportJob) -> str:
+    return ARTIFACT_NAME.format(cache_key=job.cache_key, format=job.format)
+
+
+def _new_job(user, template: ReportTemplate, fmt: str, params: dict | None) -> ReportJob:
+    if fmt not in dict(ReportJob.FORMAT_CHOICES):
+        raise ValueError(f"Unsupported format '{fmt}'")
+    params = normalise_params(params)
+    cache_key = report_cache_key(user, template, fmt, params)
+    return ReportJob(user=user, template=template, format=fmt, params=params, cache_key=cache_key)
+
+
+def request_report(user, template: ReportTemplate, fmt: str, params: dict | None = None):
+    """
+    Return ``(job, queued)``.
+
+    When an artifact for the same cache key already exists, the job is created
+    completed and points at it. When a matching job of the user's is still in
+    flight, that job is returned. Otherwise a new job is queued.
+    """
+
+    job = _new_job(user, template, fmt, params)
+    name = artifact_name(job)
+    if REPORT_STORAGE.exists(name):
+        job.status = ReportJob.STATUS_COMPLETED
+        job.file_path = name
+        job.cache_hit = True
+        job.completed_at = timezone.now()
+        job.save()
+        return job, False
+
+    in_flight = (
+        ReportJob.objects.filter(
+            user=user,
+            cache_key=job.cache_key,
+            status__in=[ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING],
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if in_flight:
+        return in_flight, False
+
+    job.save()
+    from sims.reports.tasks import generate_report
+
+    transaction.on_commit(lambda: generate_report.delay(job.pk))
+    return job, True
+
+
+def render_report(user, template: ReportTemplate, fmt: str, params: dict | None = None):
+    """Render (or reuse) the artifact in the calling process, e.g. inside a worker task."""
+
+    job = _new_job(user, template, fmt, params)
+    job.save()
+    return run_report_job(job)
+
+
+def run_report_job(job: ReportJob) -> ReportJob:
+    """Render the job's report into ``REPORT_STORAGE`` unless another job already did."""
+
+    job.status = ReportJob.STATUS_RUNNING
+    job.started_at = timezone.now()
+    job.error = ""
+    job.save(update_fields=["status", "started_at", "error"])
+
+    name = artifact_name(job)
+    try:
+        if REPORT_STORAGE.exists(name):
+            job.cache_hit = True
+        else:
+            report = ReportService(job.user).generate(job.template, job.params, job.format)
+            try:
+                with report.open() as handle:
+                    saved = REPORT_STORAGE.save(name, File(handle))
+            finally:
+                report.discard()
+            if saved != name:
+                # A concurrent job rendered the same key first; keep its copy.
+                REPORT_STORAGE.delete(saved)
+                job.cache_hit = True
+    except Exception as exc:
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(exc)
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error", "completed_at"])
+        raise
+
+    job.status = ReportJob.STATUS_COMPLETED
+    job.file_path = name
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "file_path", "cache_hit", "completed_at"])
+    return job
+
+
+def download_token(job: ReportJob, salt: str = DOWNLOAD_SALT) -> str:
+    return signing.TimestampSigner(salt=salt).sign(str(job.pk))
+
+
+def job_for_token(token: str) -> ReportJob | None:
+    """Resolve a signed download token, or ``None`` if it is forged or expired."""
+
+    for salt, lifetime in TOKEN_LIFETIMES:
+        try:
+            pk = signing.TimestampSigner(salt=salt).unsign(
+                token, max_age=getattr(settings, lifetime)
+            )
+            break
+        except signing.BadSignature:
+            continue
+    else:
+        return None
+    return (
+        ReportJob.objects.select_related("template")
+        .filter(pk=pk, status=ReportJob.STATUS_COMPLETED)
+        .first()
+    )
+
+
+def open_artifact(job: ReportJob):
+    """Open the job's rendered file, or return ``None`` if it has been removed."""
+
+    if not job.file_path or not REPORT_STORAGE.exists(job.file_path):
+        return None
+    return REPORT_STORAGE.open(job.file_path, "rb")
+
+
+def job_payload(job: ReportJob, request=None) -> dict:
+    payload = {
+        "id": job.pk,
+        "template_slug": job.template.slug,
+        "format": job.format,
+        "params": job.params,
+        "status": job.status,
+        "cache_hit": job.cache_hit,
+        "created_at": job.created_at.isoformat(),
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "error": job.error or None,
+        "download_url": None,
+    }
+    if job.status == ReportJob.STATUS_COMPLETED and job.file_path:
+        url = reverse("reports_api:job_download", kwargs={"token": download_token(job)})
+        payload["download_url"] = request.build_absolute_uri(url) if request else url
+    return payload
+
+
+__all__ = [
+    "actor_scope",
+    "download_token",
+    "job_for_token",
+    "job_payload",
+    "normalise_params",
+    "open_artifact",
+    "render_report",
+    "report_cache_key",
+    "request_report",
+    "run_report_job",
+]
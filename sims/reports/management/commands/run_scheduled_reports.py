@@ -4,13 +4,23 @@ from __future__ import annotations
 
 from django.core.management.base import BaseCommand
 
-from sims.reports.services import ScheduledReportRunner
+from sims.reports.scheduling import dispatch_due_schedules, run_due_schedules
 
 
 class Command(BaseCommand):
     help = "Run due scheduled reports"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue one Celery task per due schedule instead of running them here",
+        )
+
     def handle(self, *args, **options):
-        runner = ScheduledReportRunner()
-        count = runner.run_due_reports()
+        if options["enqueue"]:
+            count = dispatch_due_schedules()
+            self.stdout.write(self.style.SUCCESS(f"Queued {count} scheduled reports"))
+            return
+        count = run_due_schedules()
         self.stdout.write(self.style.SUCCESS(f"Processed {count} scheduled reports"))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_report_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporttemplate',
+            name='definition',
+            field=models.JSONField(blank=True, default=dict, help_text='Declarative source, columns, filters and ordering; see sims.reports.definitions'),
+        ),
+    ]
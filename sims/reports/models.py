@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
 from typing import Any, Dict
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 
+from sims.reports.cron import next_run
+
 User = get_user_model()
 
 
@@ -20,6 +22,11 @@ class ReportTemplate(models.Model):
     description = models.TextField(blank=True)
     template_name = models.CharField(max_length=255)
     default_params = models.JSONField(default=dict, blank=True)
+    definition = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Declarative source, columns, filters and ordering; see sims.reports.definitions",
+    )
 
     class Meta:
         ordering = ["name"]
@@ -27,6 +34,15 @@ class ReportTemplate(models.Model):
     def __str__(self) -> str:  # pragma: no cover - repr helper
         return self.name
 
+    def clean(self) -> None:
+        from sims.reports.definitions import ReportDefinition, ReportDefinitionError
+
+        if self.definition:
+            try:
+                ReportDefinition(self.definition)
+            except ReportDefinitionError as exc:
+                raise ValidationError({"definition": str(exc)}) from exc
+
 
 class ScheduledReport(models.Model):
     """Represents a scheduled report to be generated periodically."""
@@ -49,16 +65,70 @@ class ScheduledReport(models.Model):
             models.Index(fields=["is_active", "next_run_at"]),
         ]
 
+    def following_run(self, after: timezone.datetime | None = None):
+        """Next time ``cron`` fires strictly after ``after`` (default: now)."""
+        return next_run(self.cron, after)
+
     def schedule_next_run(self, when: timezone.datetime | None = None) -> None:
         self.next_run_at = when or timezone.now()
         self.save(update_fields=["next_run_at"])
 
     def record_run(self, success: bool, details: Dict[str, Any]) -> None:
+        # next_run_at was advanced when the run was claimed, so a failure simply
+        # waits for the next slot instead of retrying every dispatch.
         self.last_run_at = timezone.now()
         self.last_result = {"success": success, **details}
-        if success:
-            self.next_run_at = timezone.now() + timedelta(days=1)
-        self.save(update_fields=["last_run_at", "last_result", "next_run_at"])
+        self.save(update_fields=["last_run_at", "last_result"])
+
+
+class ReportJob(models.Model):
+    """Background render of a report template into ``REPORT_STORAGE``."""
+
+    FORMAT_PDF = "pdf"
+    FORMAT_XLSX = "xlsx"
+    FORMAT_CHOICES = [
+        (FORMAT_PDF, "PDF"),
+        (FORMAT_XLSX, "Excel"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="report_jobs")
+    template = models.ForeignKey(ReportTemplate, on_delete=models.CASCADE, related_name="jobs")
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES, default=FORMAT_PDF)
+    params = models.JSONField(default=dict, blank=True, help_text="Normalised report parameters")
+    cache_key = models.CharField(
+        max_length=64,
+        help_text="Hash of template, format, parameters, actor scope and data watermark",
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    file_path = models.CharField(
+        max_length=255, blank=True, help_text="Artifact name within the report storage"
+    )
+    cache_hit = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["cache_key", "status"]),
+            models.Index(fields=["user", "created_at"]),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - repr helper
+        return f"{self.template} ({self.format}) - {self.status}"
 
 
-__all__ = ["ReportTemplate", "ScheduledReport"]
+__all__ = ["ReportJob", "ReportTemplate", "ScheduledReport"]
@@ -0,0 +1,126 @@
+"""Scheduled reports: claim due schedules by cron, then run each one in isolation."""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from sims.reports.cron import CronError
+from sims.reports.delivery import DELIVERY_SENT, deliver_reports
+from sims.reports.jobs import render_report
+from sims.reports.models import ReportJob, ScheduledReport
+
+logger = logging.getLogger(__name__)
+
+# Schedules claimed per dispatch; the rest wait for the next beat tick.
+SCHEDULE_CLAIM_LIMIT = 200
+
+
+def claim_due_schedules(now=None, limit: int = SCHEDULE_CLAIM_LIMIT) -> List[int]:
+    """
+    Lock due schedules, move ``next_run_at`` to their next cron slot and return their ids.
+
+    Rows are locked with ``SKIP LOCKED`` so concurrent dispatchers split the
+    due set instead of waiting on each other, and advancing ``next_run_at``
+    before the lock is released means no run is claimed twice. Schedules that
+    missed several slots run once, not once per missed slot.
+    """
+    now = now or timezone.now()
+    claimed: List[int] = []
+    with transaction.atomic():
+        due = list(
+            ScheduledReport.objects.select_for_update(skip_locked=True)
+            .filter(is_active=True, next_run_at__lte=now)
+            .order_by("next_run_at")[:limit]
+        )
+        for schedule in due:
+            try:
+                schedule.next_run_at = schedule.following_run(now)
+            except CronError as exc:
+                # Park it until someone fixes the expression.
+                schedule.next_run_at = None
+                schedule.last_result = {"success": False, "error": f"Invalid cron: {exc}"}
+                continue
+            claimed.append(schedule.pk)
+        ScheduledReport.objects.bulk_update(due, ["next_run_at", "last_result"])
+    return claimed
+
+
+def _render(schedule: ScheduledReport) -> ReportJob:
+    params = dict(schedule.params)
+    fmt = params.pop("format", ReportJob.FORMAT_PDF)
+    return render_report(schedule.created_by, schedule.template, fmt, params)
+
+
+def run_schedules(schedule_ids: Iterable[int]) -> int:
+    """
+    Render and email the given schedules, recording each outcome; returns how many succeeded.
+
+    Reports are rendered as each schedule's owner through the report-job
+    artifact cache, so schedules with the same template, format, parameters
+    and visibility share one file. All emails then go out in one delivery
+    batch. A failure is recorded on its own schedule and never raised, and a
+    run only succeeds when every recipient's message was accepted.
+    """
+    rendered = []
+    schedules = ScheduledReport.objects.select_related("template", "created_by").filter(
+        pk__in=list(schedule_ids)
+    )
+    for schedule in schedules:
+        try:
+            rendered.append((schedule, _render(schedule)))
+        except Exception as exc:
+            logger.exception("Scheduled report %s failed", schedule.pk)
+            schedule.record_run(False, {"error": str(exc)})
+
+    deliveries = deliver_reports(rendered)
+    succeeded = 0
+    for schedule, job in rendered:
+        results = deliveries[schedule.pk]
+        failed = [result["recipient"] for result in results if result["status"] != DELIVERY_SENT]
+        details = {
+            "path": job.file_path,
+            "job": job.pk,
+            "cache_hit": job.cache_hit,
+            "deliveries": results,
+        }
+        if failed:
+            details["error"] = f"Delivery failed for {', '.join(failed)}"
+        schedule.record_run(not failed, details)
+        succeeded += not failed
+    return succeeded
+
+
+def run_schedule(schedule_id: int) -> bool:
+    """Run one schedule; see :func:`run_schedules`."""
+
+    return run_schedules([schedule_id]) == 1
+
+
+def run_due_schedules(now=None) -> int:
+    """Claim and run due schedules in this process; returns how many succeeded."""
+
+    return run_schedules(claim_due_schedules(now))
+
+
+def dispatch_due_schedules(now=None) -> int:
+    """Claim due schedules and queue one ``run_scheduled_report`` task each."""
+
+    from sims.reports.tasks import run_scheduled_report
+
+    claimed = claim_due_schedules(now)
+    for pk in claimed:
+        run_scheduled_report.delay(pk)
+    return len(claimed)
+
+
+__all__ = [
+    "claim_due_schedules",
+    "dispatch_due_schedules",
+    "run_due_schedules",
+    "run_schedule",
+    "run_schedules",
+]
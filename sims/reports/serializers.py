@@ -4,21 +4,27 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
+from sims.reports.cron import CronError, CronSchedule, next_run
 from sims.reports.models import ReportTemplate, ScheduledReport
 
 
 class ReportTemplateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReportTemplate
-        fields = ["slug", "name", "description", "template_name", "default_params"]
+        fields = ["slug", "name", "description", "template_name", "default_params", "definition"]
 
 
-class ReportRequestSerializer(serializers.Serializer):
+class ReportJobRequestSerializer(serializers.Serializer):
     template_slug = serializers.SlugField()
     format = serializers.ChoiceField(choices=["pdf", "xlsx"])
     params = serializers.DictField(child=serializers.CharField(), required=False)
 
 
+class ReportRequestSerializer(ReportJobRequestSerializer):
+    # "inline" returns base64 in JSON; "download" streams the file itself.
+    delivery = serializers.ChoiceField(choices=["inline", "download"], default="inline")
+
+
 class ScheduledReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScheduledReport
@@ -34,8 +40,22 @@ class ScheduledReportSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["last_run_at", "next_run_at"]
 
+    def validate_cron(self, value: str) -> str:
+        try:
+            CronSchedule.parse(value)
+        except CronError as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+        return " ".join(value.split())
+
+    def validate(self, attrs):
+        cron = attrs.get("cron")
+        if cron and (self.instance is None or cron != self.instance.cron):
+            attrs["next_run_at"] = next_run(cron)
+        return attrs
+
 
 __all__ = [
+    "ReportJobRequestSerializer",
     "ReportTemplateSerializer",
     "ReportRequestSerializer",
     "ScheduledReportSerializer",
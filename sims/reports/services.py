@@ -3,27 +3,29 @@
 from __future__ import annotations
 
 import base64
-import io
+import os
+import tempfile
 from dataclasses import dataclass
-from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
 
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
-from django.core.mail import EmailMessage
 from django.utils import timezone
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle
 from openpyxl.utils import get_column_letter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
-from sims.analytics.services import get_accessible_users
-from sims.logbook.models import LogbookEntry
-from sims.reports.models import ReportTemplate, ScheduledReport
+from sims.reports.definitions import template_definition
+from sims.reports.models import ReportTemplate
 from sims.users.models import User
 
 REPORT_ROOT = Path(settings.MEDIA_ROOT) / "reports"
@@ -31,88 +33,201 @@ REPORT_ROOT.mkdir(parents=True, exist_ok=True)
 REPORT_STORAGE = FileSystemStorage(location=str(REPORT_ROOT))
 
 
+# Rows arrive from the database in REPORT_CHUNK_SIZE chunks (see
+# sims.reports.definitions) and are laid out in PDF tables of PDF_ROWS_PER_TABLE
+# rows, so neither the queryset nor reportlab's table layout holds a whole report.
+PDF_ROWS_PER_TABLE = 200
+PDF_FONT_SIZE = 9
+# Left plus right padding reportlab puts inside every table cell.
+PDF_CELL_PADDING = 12
+PDF_CELL_STYLE = ParagraphStyle(
+    name="ReportCell", fontName="Helvetica", fontSize=PDF_FONT_SIZE, leading=PDF_FONT_SIZE + 2
+)
+PDF_HEADER_STYLE = ParagraphStyle(
+    name="ReportHeader", parent=PDF_CELL_STYLE, fontName="Helvetica-Bold"
+)
+PDF_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), PDF_FONT_SIZE),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+    ]
+)
+
+
 @dataclass
 class RenderedReport:
+    """A rendered report spooled to a temporary file; call ``discard()`` when done."""
+
     filename: str
-    content: bytes
+    path: Path
     content_type: str
 
+    @property
+    def content(self) -> bytes:
+        return self.path.read_bytes()
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size
+
+    def open(self):
+        return self.path.open("rb")
+
     def as_base64(self) -> str:
         return base64.b64encode(self.content).decode("ascii")
 
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _spool_path(suffix: str) -> Path:
+    handle, name = tempfile.mkstemp(prefix="sims-report-", suffix=suffix)
+    os.close(handle)
+    return Path(name)
+
+
+class _FlowableStream(list):
+    """
+    A flowable list that tops itself up from an iterator.
+
+    reportlab's build loop only looks at the head of its list, so keeping a
+    couple of flowables buffered lets a report of any length build without
+    materialising every table first.
+    """
+
+    BUFFER = 2
+
+    def __init__(self, flowables: Iterator[Flowable]):
+        super().__init__()
+        self._pending = flowables
+        self._fill()
+
+    def _fill(self) -> None:
+        while list.__len__(self) < self.BUFFER:
+            flowable = next(self._pending, None)
+            if flowable is None:
+                return
+            self.append(flowable)
+
+    def __len__(self) -> int:
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _cell(value, width: float, style: ParagraphStyle):
+    text = "" if value is None else str(value)
+    # Text that fits on one line stays a plain string; only longer text pays
+    # for a Paragraph, which wraps inside the fixed column width.
+    if stringWidth(text, style.fontName, style.fontSize) <= width - PDF_CELL_PADDING:
+        return text
+    return Paragraph(escape(text), style)
+
 
 class ReportRenderer:
     def render_pdf(self, context: dict, filename: str) -> RenderedReport:
-        output = io.BytesIO()
-        document = SimpleDocTemplate(output, pagesize=A4)
+        path = _spool_path(".pdf")
+        document = SimpleDocTemplate(str(path), pagesize=A4)
+        document.build(_FlowableStream(self._pdf_flowables(context, document.width)))
+        return RenderedReport(
+            filename=f"{filename}.pdf",
+            path=path,
+            content_type="application/pdf",
+        )
+
+    def _pdf_flowables(self, context: dict, width: float) -> Iterator[Flowable]:
         styles = getSampleStyleSheet()
         title_style = styles["Title"]
         subtitle_style = ParagraphStyle(name="Subtitle", parent=styles["Normal"], alignment=1)
 
-        elements = [
-            Paragraph(context.get("title", "SIMS Report"), title_style),
-            Paragraph(
-                f"Generated at {context.get('generated_at', timezone.now()).strftime('%d %b %Y %H:%M')}",
-                subtitle_style,
-            ),
-            Spacer(1, 12),
-        ]
+        yield Paragraph(context.get("title", "SIMS Report"), title_style)
+        yield Paragraph(
+            f"Generated at {context.get('generated_at', timezone.now()).strftime('%d %b %Y %H:%M')}",
+            subtitle_style,
+        )
+        yield Spacer(1, 12)
 
         columns = context.get("columns", [])
-        rows = context.get("rows", [])
-        if columns and rows:
-            data = [columns]
-            for row in rows:
-                data.append([row.get(column, "") for column in columns])
-            table = Table(data, repeatRows=1)
-            table.setStyle(
-                TableStyle(
+        if not columns:
+            return
+        # Fixed widths keep every table fragment aligned and skip reportlab's
+        # per-table column measuring.
+        col_widths = [width / len(columns)] * len(columns)
+        header = [
+            _cell(column, col_width, PDF_HEADER_STYLE)
+            for column, col_width in zip(columns, col_widths)
+        ]
+        rows = iter(context.get("rows", []))
+        while True:
+            chunk = list(islice(rows, PDF_ROWS_PER_TABLE))
+            if not chunk:
+                return
+            data = [header]
+            for row in chunk:
+                data.append(
                     [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 9),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+                        _cell(row.get(column, ""), col_width, PDF_CELL_STYLE)
+                        for column, col_width in zip(columns, col_widths)
                     ]
                 )
-            )
-            elements.append(table)
-
-        document.build(elements)
-        return RenderedReport(
-            filename=f"{filename}.pdf",
-            content=output.getvalue(),
-            content_type="application/pdf",
-        )
+            table = Table(data, colWidths=col_widths, repeatRows=1)
+            table.setStyle(PDF_TABLE_STYLE)
+            yield table
 
     def render_excel(
-        self, rows: List[dict], columns: Iterable[str], filename: str
+        self, rows: Iterable[dict], columns: Iterable[str], filename: str
     ) -> RenderedReport:
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = "Report"
-        header_font = Font(bold=True)
+        """
+        Stream ``rows`` into a write-only workbook spooled to disk.
+
+        Rows are written as they are read, and cells share two named styles, so
+        memory stays flat however many rows the iterator yields.
+        """
+        columns = list(columns)
+        workbook = Workbook(write_only=True)
+        header_style, cell_style = _excel_styles()
+        workbook.add_named_style(header_style)
+        workbook.add_named_style(cell_style)
+        sheet = workbook.create_sheet("Report")
         for col_index, column in enumerate(columns, start=1):
-            cell = sheet.cell(row=1, column=col_index, value=column)
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
             sheet.column_dimensions[get_column_letter(col_index)].width = max(15, len(column) + 2)
-        for row_index, row in enumerate(rows, start=2):
-            for col_index, column in enumerate(columns, start=1):
-                cell = sheet.cell(row=row_index, column=col_index, value=row.get(column))
-                cell.alignment = Alignment(vertical="top")
         sheet.freeze_panes = "A2"
-        output = io.BytesIO()
-        workbook.save(output)
+        sheet.append([_excel_cell(sheet, column, header_style.name) for column in columns])
+        for row in rows:
+            sheet.append(
+                [_excel_cell(sheet, row.get(column), cell_style.name) for column in columns]
+            )
+        path = _spool_path(".xlsx")
+        workbook.save(path)
         return RenderedReport(
             filename=f"{filename}.xlsx",
-            content=output.getvalue(),
+            path=path,
             content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
 
+def _excel_styles() -> tuple:
+    header = NamedStyle(
+        name="Report Header", font=Font(bold=True), alignment=Alignment(horizontal="center")
+    )
+    cell = NamedStyle(name="Report Cell", alignment=Alignment(vertical="top"))
+    return header, cell
+
+
+def _excel_cell(sheet, value, style: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.style = style
+    return cell
+
+
 class ReportService:
     def __init__(self, actor: User):
         self.actor = actor
@@ -128,79 +243,17 @@ class ReportService:
         raise ValueError("Unsupported format")
 
     def _build_context(self, template: ReportTemplate, params: dict) -> dict:
-        if template.slug == "logbook-summary":
-            return self._logbook_summary_context(params)
         context = template.default_params.copy()
         context.update(params)
-        return context
-
-    def _logbook_summary_context(self, params: dict) -> dict:
-        start = params.get("start_date")
-        end = params.get("end_date")
-        pg_id = params.get("pg_id")
-        queryset = LogbookEntry.objects.select_related("pg", "supervisor").order_by("-date")
-        accessible = get_accessible_users(self.actor)
-        queryset = queryset.filter(pg__in=accessible)
-        if start:
-            queryset = queryset.filter(date__gte=datetime.strptime(start, "%Y-%m-%d").date())
-        if end:
-            queryset = queryset.filter(date__lte=datetime.strptime(end, "%Y-%m-%d").date())
-        if pg_id:
-            queryset = queryset.filter(pg_id=pg_id)
-        rows: List[dict] = []
-        for entry in queryset:
-            rows.append(
-                {
-                    "Date": entry.date.isoformat(),
-                    "Postgraduate": entry.pg.get_full_name() if entry.pg else "",
-                    "Supervisor": (entry.supervisor.get_full_name() if entry.supervisor else ""),
-                    "Case Title": entry.case_title,
-                    "Status": entry.get_status_display(),
-                }
-            )
-        context = {
-            "title": "Logbook Summary",
+        definition = template_definition(template)
+        if definition is None:
+            return context
+        return {
+            "title": definition.title or template.name,
             "generated_at": timezone.now(),
-            "entries": queryset,
-            "rows": rows,
-            "columns": ["Date", "Postgraduate", "Supervisor", "Case Title", "Status"],
+            "columns": definition.labels,
+            "rows": definition.rows(self.actor, context),
         }
-        return context
-
-
-class ScheduledReportRunner:
-    def __init__(self, actor: User | None = None):
-        self.actor = actor or User.objects.filter(role="admin").first()
-
-    def run_due_reports(self) -> int:
-        now = timezone.now()
-        schedules = ScheduledReport.objects.filter(is_active=True, next_run_at__lte=now)
-        count = 0
-        for schedule in schedules:
-            service = ReportService(self.actor or schedule.created_by)
-            fmt = schedule.params.get("format", "pdf")
-            try:
-                report = service.generate(schedule.template, schedule.params, fmt)
-                path = REPORT_STORAGE.save(report.filename, io.BytesIO(report.content))
-                self._email_report(schedule, report)
-                schedule.record_run(True, {"path": path})
-                count += 1
-            except Exception as exc:
-                schedule.record_run(False, {"error": str(exc)})
-        return count
-
-    def _email_report(self, schedule: ScheduledReport, report: RenderedReport) -> None:
-        recipients = [email.strip() for email in schedule.email_to.split(",") if email.strip()]
-        if not recipients:
-            return
-        message = EmailMessage(
-            subject=f"Scheduled report: {schedule.template.name}",
-            body="Please find the attached report.",
-            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
-            to=recipients,
-        )
-        message.attach(report.filename, report.content, report.content_type)
-        message.send(fail_silently=True)
 
 
-__all__ = ["ReportService", "ReportRenderer", "RenderedReport", "ScheduledReportRunner"]
+__all__ = ["ReportService", "ReportRenderer", "RenderedReport"]
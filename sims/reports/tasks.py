@@ -0,0 +1,31 @@
+"""Celery tasks for the reports app."""
+
+from celery import shared_task
+
+from sims.reports.jobs import run_report_job
+from sims.reports.models import ReportJob
+from sims.reports.scheduling import dispatch_due_schedules, run_schedule
+
+
+@shared_task
+def generate_report(job_id: int) -> str:
+    """Render a queued report job; returns the artifact name."""
+
+    job = ReportJob.objects.select_related("user", "template").get(pk=job_id)
+    if job.status == ReportJob.STATUS_COMPLETED:
+        return job.file_path
+    return run_report_job(job).file_path
+
+
+@shared_task
+def run_scheduled_report(schedule_id: int) -> bool:
+    """Run one claimed schedule; failures are recorded on the schedule."""
+
+    return run_schedule(schedule_id)
+
+
+@shared_task
+def dispatch_scheduled_reports() -> int:
+    """Beat entry point: fan due schedules out to ``run_scheduled_report``."""
+
+    return dispatch_due_schedules()
@@ -2,22 +2,47 @@ from __future__ import annotations
 
 import base64
 import io
-from datetime import date
+import shutil
+import smtplib
+import tempfile
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
 
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.core.mail.backends import locmem
 from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from openpyxl import load_workbook
-from rest_framework.test import APITestCase
+from reportlab.platypus import Paragraph
+from rest_framework.test import APIClient, APITestCase
 
 from sims.logbook.models import LogbookEntry
-from sims.reports.models import ReportTemplate, ScheduledReport
-from sims.reports.services import ReportService
+from sims.reports.cron import CronError, CronSchedule, next_run
+from sims.reports.definitions import (
+    BUILTIN_DEFINITIONS,
+    ReportDefinition,
+    ReportDefinitionError,
+    template_definition,
+)
+from sims.reports.jobs import open_artifact, run_report_job
+from sims.reports.models import ReportJob, ReportTemplate, ScheduledReport
+from sims.reports.scheduling import claim_due_schedules, run_due_schedules
+from sims.reports.services import ReportRenderer, ReportService
+from sims.results.models import Exam, Score
 from sims.users.models import User
 
 
 class ReportingTests(APITestCase):
     def setUp(self) -> None:
+        storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_root, ignore_errors=True)
+        storage = mock.patch("sims.reports.jobs.REPORT_STORAGE", FileSystemStorage(storage_root))
+        storage.start()
+        self.addCleanup(storage.stop)
         self.admin = User.objects.create_user(username="admin", password="testpass", role="admin")
         self.supervisor = User.objects.create_user(
             username="sup",
@@ -204,3 +229,611 @@ class ReportingTests(APITestCase):
         # Should record the failure
         self.assertIsNotNone(schedule.last_run_at)
         self.assertIn("error", schedule.last_result)
+
+
+class StreamingPdfTests(APITestCase):
+    def test_rows_are_pulled_lazily_into_table_fragments(self) -> None:
+        pulled = []
+
+        def rows():
+            for index in range(25):
+                pulled.append(index)
+                yield {"Name": f"Row {index}", "Value": "x" * 500}
+
+        built = []
+        original = ReportRenderer._pdf_flowables
+
+        def tracking(renderer, context, width):
+            for flowable in original(renderer, context, width):
+                # Each fragment is created only after its rows are read.
+                built.append(len(pulled))
+                yield flowable
+
+        context = {"title": "Big", "columns": ["Name", "Value"], "rows": rows()}
+        with (
+            mock.patch("sims.reports.services.PDF_ROWS_PER_TABLE", 10),
+            mock.patch.object(ReportRenderer, "_pdf_flowables", tracking),
+        ):
+            report = ReportRenderer().render_pdf(context, "big")
+
+        try:
+            self.assertTrue(report.content.startswith(b"%PDF"))
+            self.assertEqual(built, [0, 0, 0, 10, 20, 25])
+            self.assertTrue(report.path.exists())
+        finally:
+            report.discard()
+        self.assertFalse(report.path.exists())
+
+    def test_long_cells_wrap_instead_of_truncating(self) -> None:
+        long_title = "Laparoscopic cholecystectomy with intraoperative cholangiogram & drain"
+        context = {
+            "columns": ["Name", "Case Title"],
+            "rows": [{"Name": "A", "Case Title": long_title}],
+        }
+
+        table = list(ReportRenderer()._pdf_flowables(context, 400))[-1]
+
+        name, title = table._cellvalues[1]
+        self.assertEqual(name, "A")
+        self.assertIsInstance(title, Paragraph)
+        self.assertEqual(title.getPlainText(), long_title)
+        self.assertEqual(table._colWidths, [200, 200])
+
+    def test_generate_api_removes_spooled_file(self) -> None:
+        admin = User.objects.create_user(username="admin", password="testpass", role="admin")
+        template, _ = ReportTemplate.objects.get_or_create(
+            slug="logbook-summary",
+            defaults={"name": "Logbook Summary", "template_name": "reports/logbook_summary.html"},
+        )
+        self.client.force_authenticate(admin)
+        discarded = []
+        original = ReportRenderer.render_pdf
+
+        def render(renderer, context, filename):
+            report = original(renderer, context, filename)
+            discarded.append(report.path)
+            return report
+
+        with mock.patch.object(ReportRenderer, "render_pdf", render):
+            response = self.client.post(
+                reverse("reports_api:generate"),
+                {"template_slug": template.slug, "format": "pdf", "params": {}},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(discarded[0].exists())
+
+
+class StreamingExcelTests(APITestCase):
+    def test_rows_stream_into_write_only_workbook(self) -> None:
+        rows = ({"Name": f"Row {index}", "Value": index} for index in range(500))
+
+        report = ReportRenderer().render_excel(rows, ["Name", "Value"], "big")
+
+        try:
+            workbook = load_workbook(report.path, read_only=True)
+            sheet = workbook["Report"]
+            values = list(sheet.iter_rows(values_only=True))
+        finally:
+            report.discard()
+        self.assertEqual(values[0], ("Name", "Value"))
+        self.assertEqual(values[-1], ("Row 499", 499))
+        self.assertEqual(len(values), 501)
+        self.assertLessEqual({"Report Header", "Report Cell"}, set(workbook.named_styles))
+
+    def test_download_delivery_streams_the_file(self) -> None:
+        admin = User.objects.create_user(username="admin", password="testpass", role="admin")
+        template, _ = ReportTemplate.objects.get_or_create(
+            slug="logbook-summary",
+            defaults={"name": "Logbook Summary", "template_name": "reports/logbook_summary.html"},
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.post(
+            reverse("reports_api:generate"),
+            {"template_slug": template.slug, "format": "xlsx", "delivery": "download"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        content = b"".join(response.streaming_content)
+        sheet = load_workbook(io.BytesIO(content)).active
+        self.assertEqual(sheet.cell(row=1, column=1).value, "Date")
+
+
+class ReportJobTests(APITestCase):
+    def setUp(self) -> None:
+        storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_root, ignore_errors=True)
+        storage = mock.patch("sims.reports.jobs.REPORT_STORAGE", FileSystemStorage(storage_root))
+        storage.start()
+        self.addCleanup(storage.stop)
+
+        self.admin = User.objects.create_user(username="admin", password="testpass", role="admin")
+        self.supervisor = User.objects.create_user(
+            username="sup", password="testpass", role="supervisor", specialty="surgery"
+        )
+        self.pg = User.objects.create_user(
+            username="pg",
+            password="testpass",
+            role="pg",
+            specialty="surgery",
+            year="1",
+            supervisor=self.supervisor,
+        )
+        self.entry = LogbookEntry.objects.create(
+            pg=self.pg,
+            case_title="Report Case",
+            date=date(2024, 1, 1),
+            location_of_activity="Ward",
+            patient_history_summary="History",
+            management_action="Action",
+            topic_subtopic="Topic",
+            status="approved",
+            supervisor=self.supervisor,
+        )
+        self.template, _ = ReportTemplate.objects.get_or_create(
+            slug="logbook-summary",
+            defaults={"name": "Logbook Summary", "template_name": "reports/logbook_summary.html"},
+        )
+        self.url = reverse("reports_api:job_create")
+
+    def _request(self, user, template=None, **params):
+        self.client.force_authenticate(user)
+        template = template or self.template
+        payload = {"template_slug": template.slug, "format": "xlsx", "params": params}
+        with mock.patch("sims.reports.tasks.generate_report.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, payload, format="json")
+        return response, delay
+
+    def _run(self, response) -> ReportJob:
+        return run_report_job(ReportJob.objects.get(pk=response.data["id"]))
+
+    def test_job_is_queued_rendered_and_downloadable(self) -> None:
+        response, delay = self._request(self.admin, start_date="2024-01-01")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertIsNone(response.data["download_url"])
+        delay.assert_called_once_with(response.data["id"])
+
+        job = self._run(response)
+        self.assertEqual(job.status, ReportJob.STATUS_COMPLETED)
+        detail = self.client.get(reverse("reports_api:job_detail", kwargs={"pk": job.pk}))
+        download = APIClient().get(detail.data["download_url"])
+        self.assertEqual(download.status_code, 200)
+        sheet = load_workbook(io.BytesIO(b"".join(download.streaming_content))).active
+        self.assertEqual(sheet.cell(row=2, column=4).value, "Report Case")
+
+    def test_identical_request_reuses_artifact(self) -> None:
+        first, _ = self._request(self.admin, start_date="2024-01-01")
+        self._run(first)
+
+        second, delay = self._request(self.admin, start_date=" 2024-01-01 ")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["status"], "completed")
+        self.assertTrue(second.data["cache_hit"])
+        self.assertTrue(second.data["download_url"])
+        delay.assert_not_called()
+
+    def test_in_flight_job_is_returned(self) -> None:
+        first, _ = self._request(self.admin)
+        second, delay = self._request(self.admin)
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["id"], first.data["id"])
+        delay.assert_not_called()
+
+    def test_data_changes_and_scope_miss_the_cache(self) -> None:
+        self._run(self._request(self.admin)[0])
+
+        self.entry.case_title = "Edited"
+        self.entry.save()
+        edited, _ = self._request(self.admin)
+        self.assertEqual(edited.status_code, 202)
+
+        supervisor, _ = self._request(self.supervisor)
+        pg, _ = self._request(self.pg)
+        self.assertEqual((supervisor.status_code, pg.status_code), (202, 202))
+        keys = set(ReportJob.objects.values_list("cache_key", flat=True))
+        self.assertEqual(len(keys), 4)
+
+    def test_joined_table_changes_miss_the_cache(self) -> None:
+        self._run(self._request(self.admin)[0])
+        self.assertTrue(self._request(self.admin)[0].data["cache_hit"])
+
+        # The logbook rows are untouched; only the joined PG name changes.
+        self.pg.first_name = "Renamed"
+        self.pg.save()
+        renamed, _ = self._request(self.admin)
+        self.assertEqual(renamed.status_code, 202)
+
+        job = self._run(renamed)
+        with open_artifact(job) as handle:
+            sheet = load_workbook(io.BytesIO(handle.read())).active
+        self.assertEqual(sheet.cell(row=2, column=2).value, "Renamed")
+
+    def test_source_changes_miss_the_cache_for_any_definition(self) -> None:
+        template = ReportTemplate.objects.create(
+            name="Scores",
+            slug="score-list",
+            template_name="reports/logbook_summary.html",
+            definition={
+                "source": "results.Score",
+                "columns": [
+                    {"label": "Exam", "field": "exam__title"},
+                    {"label": "Marks", "field": "marks_obtained"},
+                ],
+            },
+        )
+        exam = Exam.objects.create(title="Midterm", exam_type="theory", date=date(2024, 2, 1))
+        score = Score.objects.create(exam=exam, student=self.pg, marks_obtained=60)
+        self._run(self._request(self.admin, template)[0])
+
+        cached, _ = self._request(self.admin, template)
+        self.assertTrue(cached.data["cache_hit"])
+
+        score.marks_obtained = 75
+        score.save()
+        edited, _ = self._request(self.admin, template)
+        self.assertEqual(edited.status_code, 202)
+        self.assertNotEqual(edited.data["id"], cached.data["id"])
+
+        # Logbook edits leave the score report's artifact alone.
+        self._run(edited)
+        self.entry.case_title = "Edited"
+        self.entry.save()
+        self.assertTrue(self._request(self.admin, template)[0].data["cache_hit"])
+
+    def test_download_token_is_required(self) -> None:
+        response = APIClient().get(reverse("reports_api:job_download", kwargs={"token": "forged"}))
+        self.assertEqual(response.status_code, 404)
+
+
+class RefusingEmailBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        for message in messages:
+            if "refused@example.com" in message.to:
+                raise smtplib.SMTPRecipientsRefused({"refused@example.com": (550, b"No")})
+        return super().send_messages(messages)
+
+
+class ScheduledReportTests(APITestCase):
+    def setUp(self) -> None:
+        storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_root, ignore_errors=True)
+        storage = mock.patch("sims.reports.jobs.REPORT_STORAGE", FileSystemStorage(storage_root))
+        storage.start()
+        self.addCleanup(storage.stop)
+
+        self.admin = User.objects.create_user(username="admin", password="testpass", role="admin")
+        self.template, _ = ReportTemplate.objects.get_or_create(
+            slug="logbook-summary",
+            defaults={"name": "Logbook Summary", "template_name": "reports/logbook_summary.html"},
+        )
+        # Friday 16 Oct 2026, 06:00 UTC.
+        self.now = datetime(2026, 10, 16, 6, 0, tzinfo=dt_timezone.utc)
+
+    def _schedule(self, **kwargs) -> ScheduledReport:
+        values = {
+            "template": self.template,
+            "created_by": self.admin,
+            "email_to": "admin@example.com",
+            "params": {"format": "pdf"},
+            "cron": "0 6 * * *",
+            "next_run_at": self.now,
+        }
+        values.update(kwargs)
+        return ScheduledReport.objects.create(**values)
+
+    def test_cron_next_run(self) -> None:
+        cases = {
+            "30 6 * * 1-5": datetime(2026, 10, 16, 6, 30),
+            "0 6 * * *": datetime(2026, 10, 17, 6, 0),
+            "*/15 * * * *": datetime(2026, 10, 16, 6, 15),
+            "0 9 * * mon": datetime(2026, 10, 19, 9, 0),
+            # Day-of-month and weekday restricted together match either.
+            "0 9 1 * mon": datetime(2026, 10, 19, 9, 0),
+            "0 0 29 2 *": datetime(2028, 2, 29, 0, 0),
+            "0 0 * * 5-7": datetime(2026, 10, 17, 0, 0),
+        }
+        for expression, expected in cases.items():
+            with self.subTest(expression=expression):
+                self.assertEqual(
+                    next_run(expression, self.now), expected.replace(tzinfo=dt_timezone.utc)
+                )
+        for invalid in ("", "0 6 * *", "61 * * * *", "0 6 * * fri-mon", "*/0 * * * *"):
+            with self.subTest(invalid=invalid), self.assertRaises(CronError):
+                CronSchedule.parse(invalid)
+
+    def test_claim_advances_next_run_once(self) -> None:
+        due = self._schedule(cron="30 6 * * 1-5")
+        self._schedule(next_run_at=self.now + timedelta(minutes=1))
+        self._schedule(is_active=False)
+        broken = self._schedule(cron="not a cron")
+
+        self.assertEqual(claim_due_schedules(self.now), [due.pk])
+        self.assertEqual(claim_due_schedules(self.now), [])
+
+        due.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual(due.next_run_at, datetime(2026, 10, 16, 6, 30, tzinfo=dt_timezone.utc))
+        self.assertIsNone(broken.next_run_at)
+        self.assertIn("Invalid cron", broken.last_result["error"])
+
+    def test_dispatch_queues_one_task_per_schedule(self) -> None:
+        schedules = [self._schedule(), self._schedule(email_to="other@example.com")]
+
+        with mock.patch("sims.reports.tasks.run_scheduled_report.delay") as delay:
+            call_command("run_scheduled_reports", "--enqueue", stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(call.args[0] for call in delay.call_args_list),
+            sorted(schedule.pk for schedule in schedules),
+        )
+        self.assertFalse(ScheduledReport.objects.filter(next_run_at__lte=timezone.now()).exists())
+
+    def test_identical_schedules_share_an_artifact(self) -> None:
+        from django.core import mail
+
+        first = self._schedule(params={"format": "xlsx", "status": "approved"})
+        second = self._schedule(params={"status": " approved ", "format": "xlsx"})
+
+        self.assertEqual(run_due_schedules(), 2)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.last_result["path"], second.last_result["path"])
+        self.assertEqual(
+            sorted([first.last_result["cache_hit"], second.last_result["cache_hit"]]),
+            [False, True],
+        )
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].attachments[0][0], "logbook-summary.xlsx")
+
+    def test_failing_schedule_does_not_block_others(self) -> None:
+        broken = self._schedule(params={"format": "docx"})
+        healthy = self._schedule()
+
+        with self.assertLogs("sims.reports.scheduling", level="ERROR"):
+            self.assertEqual(run_due_schedules(), 1)
+
+        broken.refresh_from_db()
+        healthy.refresh_from_db()
+        self.assertFalse(broken.last_result["success"])
+        self.assertIn("docx", broken.last_result["error"])
+        self.assertTrue(healthy.last_result["success"])
+        # The failed run waits for its next slot rather than retrying at once.
+        self.assertGreater(broken.next_run_at, timezone.now())
+
+    def test_api_validates_cron_and_sets_next_run(self) -> None:
+        self.client.force_authenticate(self.admin)
+        url = reverse("reports_api:scheduled_list")
+        payload = {"template": self.template.pk, "email_to": "a@example.com", "params": {}}
+
+        invalid = self.client.post(url, {**payload, "cron": "0 25 * * *"}, format="json")
+        self.assertEqual(invalid.status_code, 400)
+        self.assertIn("cron", invalid.data)
+
+        created = self.client.post(url, {**payload, "cron": "0  6 * * 1-5"}, format="json")
+        self.assertEqual(created.status_code, 201)
+        schedule = ScheduledReport.objects.get(pk=created.data["id"])
+        self.assertEqual(schedule.cron, "0 6 * * 1-5")
+        self.assertEqual(schedule.next_run_at, next_run("0 6 * * 1-5", schedule.created_at))
+
+    def test_emails_share_one_connection_with_per_recipient_results(self) -> None:
+        from django.core import mail
+
+        first = self._schedule(email_to="a@example.com, b@example.com")
+        second = self._schedule(email_to="c@example.com")
+        connections = []
+        real_get_connection = mail.get_connection
+
+        def tracking_get_connection(*args, **kwargs):
+            connection = real_get_connection(*args, **kwargs)
+            connections.append(connection)
+            return connection
+
+        with mock.patch("sims.reports.delivery.get_connection", tracking_get_connection):
+            self.assertEqual(run_due_schedules(), 2)
+
+        self.assertEqual(len(connections), 1)
+        self.assertEqual(
+            sorted(message.to for message in mail.outbox),
+            [["a@example.com"], ["b@example.com"], ["c@example.com"]],
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(
+            first.last_result["deliveries"],
+            [
+                {"recipient": "a@example.com", "method": "attachment", "status": "sent"},
+                {"recipient": "b@example.com", "method": "attachment", "status": "sent"},
+            ],
+        )
+        self.assertTrue(second.last_result["success"])
+
+    @override_settings(REPORT_ATTACHMENT_MAX_BYTES=100, REPORT_DOWNLOAD_URL_MAX_AGE=0)
+    def test_large_reports_are_linked_not_attached(self) -> None:
+        from django.core import mail
+
+        schedule = self._schedule(params={"format": "xlsx"})
+        self.assertEqual(run_due_schedules(), 1)
+
+        message = mail.outbox[0]
+        self.assertEqual(message.attachments, [])
+        url = next(line for line in message.body.splitlines() if line.startswith("http"))
+        self.assertTrue(url.startswith("http://localhost:8000/"))
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.last_result["deliveries"][0]["method"], "link")
+        # Emailed links keep their own lifetime after API links would have expired.
+        response = APIClient().get(url.replace("http://localhost:8000", ""))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(EMAIL_BACKEND="sims.reports.tests.RefusingEmailBackend")
+    def test_refused_recipient_fails_only_its_schedule(self) -> None:
+        from django.core import mail
+
+        refused = self._schedule(email_to="ok@example.com, refused@example.com")
+        healthy = self._schedule(email_to="other@example.com")
+
+        with self.assertLogs("sims.reports.delivery", level="WARNING"):
+            self.assertEqual(run_due_schedules(), 1)
+
+        refused.refresh_from_db()
+        healthy.refresh_from_db()
+        statuses = {
+            result["recipient"]: result["status"] for result in refused.last_result["deliveries"]
+        }
+        self.assertEqual(statuses, {"ok@example.com": "sent", "refused@example.com": "failed"})
+        self.assertFalse(refused.last_result["success"])
+        self.assertIn("refused@example.com", refused.last_result["error"])
+        self.assertTrue(healthy.last_result["success"])
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class ReportDefinitionTests(APITestCase):
+    def setUp(self) -> None:
+        self.admin = User.objects.create_user(username="admin", password="testpass", role="admin")
+        self.supervisor = User.objects.create_user(
+            username="sup",
+            password="testpass",
+            role="supervisor",
+            specialty="surgery",
+            first_name="Sam",
+            last_name="Sup",
+        )
+        self.pg = User.objects.create_user(
+            username="pg",
+            password="testpass",
+            role="pg",
+            specialty="surgery",
+            year="1",
+            supervisor=self.supervisor,
+            first_name="Pat",
+            last_name="Grad",
+        )
+        other_supervisor = User.objects.create_user(
+            username="sup2", password="testpass", role="supervisor", specialty="surgery"
+        )
+        self.other_pg = User.objects.create_user(
+            username="pg2",
+            password="testpass",
+            role="pg",
+            specialty="surgery",
+            year="1",
+            supervisor=other_supervisor,
+        )
+        for pg, day, status in (
+            (self.pg, date(2024, 1, 1), "approved"),
+            (self.pg, date(2024, 2, 1), "pending"),
+            (self.pg, date(2024, 3, 1), "approved"),
+            (self.other_pg, date(2024, 1, 15), "approved"),
+        ):
+            LogbookEntry.objects.create(
+                pg=pg,
+                case_title=f"Case {day:%b}",
+                date=day,
+                location_of_activity="Ward",
+                patient_history_summary="History",
+                management_action="Action",
+                topic_subtopic="Topic",
+                status=status,
+                supervisor=pg.supervisor,
+            )
+
+    def test_builtin_logbook_summary_is_scoped_and_filtered(self) -> None:
+        definition = ReportDefinition(BUILTIN_DEFINITIONS["logbook-summary"])
+
+        # Scope, filters, joins and choice labels all resolve in one projected query.
+        with self.assertNumQueries(1):
+            rows = list(definition.rows(self.supervisor, {"start_date": "2024-02-01"}))
+
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "Date": "2024-03-01",
+                    "Postgraduate": "Pat Grad",
+                    "Supervisor": "Sam Sup",
+                    "Case Title": "Case Mar",
+                    "Status": "Approved",
+                },
+                {
+                    "Date": "2024-02-01",
+                    "Postgraduate": "Pat Grad",
+                    "Supervisor": "Sam Sup",
+                    "Case Title": "Case Feb",
+                    "Status": "Pending Supervisor Review",
+                },
+            ],
+        )
+        everyone = list(definition.rows(self.admin, {"pg_id": str(self.other_pg.pk)}))
+        self.assertEqual([row["Supervisor"] for row in everyone], [""])
+
+    def test_template_definition_groups_without_code(self) -> None:
+        template = ReportTemplate.objects.create(
+            slug="entries-per-status",
+            name="Entries per status",
+            template_name="reports/logbook_summary.html",
+            definition={
+                "source": "logbook.LogbookEntry",
+                "columns": [
+                    {"label": "Status", "field": "status"},
+                    {"label": "Entries", "aggregate": "count"},
+                    {"label": "Latest", "aggregate": "max", "field": "date"},
+                ],
+                "where": [{"field": "date", "lookup": "lt", "value": "2024-03-01"}],
+                "ordering": ["-Entries"],
+            },
+        )
+        template.full_clean()
+
+        definition = template_definition(template)
+        queryset = definition.queryset(self.admin)
+        self.assertIn("GROUP BY", str(queryset.query))
+        self.assertEqual(
+            list(definition.rows(self.admin)),
+            [
+                {"Status": "Approved", "Entries": 2, "Latest": "2024-01-15"},
+                {"Status": "Pending Supervisor Review", "Entries": 1, "Latest": "2024-02-01"},
+            ],
+        )
+
+        report = ReportService(self.admin).generate(template, {}, "xlsx")
+        try:
+            sheet = load_workbook(io.BytesIO(report.content)).active
+        finally:
+            report.discard()
+        self.assertEqual([cell.value for cell in sheet[1]], ["Status", "Entries", "Latest"])
+        self.assertEqual(sheet.cell(row=2, column=2).value, 2)
+
+    def test_invalid_definitions_are_rejected(self) -> None:
+        base = {"source": "logbook.LogbookEntry", "columns": [{"label": "Date", "field": "date"}]}
+        invalid = [
+            {**base, "source": "users.User"},
+            {**base, "columns": [{"label": "Nope", "field": "missing"}]},
+            {**base, "columns": [{"label": "Hash", "field": "pg__password"}]},
+            {**base, "columns": [{"label": "Reviews", "field": "reviews"}]},
+            {**base, "columns": [{"label": "Date", "field": "date__year"}]},
+            {**base, "filters": {"q": {"field": "case_title", "lookup": "regex"}}},
+            {**base, "columns": [{"label": "Total", "aggregate": "median"}]},
+            {**base, "columns": []},
+        ]
+        for spec in invalid:
+            with self.subTest(spec=spec), self.assertRaises(ReportDefinitionError):
+                ReportDefinition(spec)
+
+        template = ReportTemplate(
+            slug="broken", name="Broken", template_name="x.html", definition=invalid[2]
+        )
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+
+        definition = ReportDefinition(BUILTIN_DEFINITIONS["logbook-summary"])
+        with self.assertRaises(ReportDefinitionError):
+            list(definition.rows(self.admin, {"start_date": "not-a-date"}))
@@ -4,6 +4,9 @@ from django.urls import path
 
 from sims.reports.views import (
     ReportGenerateView,
+    ReportJobCreateView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
     ReportTemplateListView,
     ScheduledReportDetailView,
     ScheduledReportListCreateView,
@@ -14,6 +17,13 @@ app_name = "reports_api"
 urlpatterns = [
     path("templates/", ReportTemplateListView.as_view(), name="templates"),
     path("generate/", ReportGenerateView.as_view(), name="generate"),
+    path("jobs/", ReportJobCreateView.as_view(), name="job_create"),
+    path("jobs/<int:pk>/", ReportJobDetailView.as_view(), name="job_detail"),
+    path(
+        "jobs/download/<str:token>/",
+        ReportJobDownloadView.as_view(),
+        name="job_download",
+    ),
     path("scheduled/", ScheduledReportListCreateView.as_view(), name="scheduled_list"),
     path(
         "scheduled/<int:pk>/",
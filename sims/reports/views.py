@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from sims.reports.models import ReportTemplate, ScheduledReport
+from sims.reports.jobs import job_for_token, job_payload, open_artifact, request_report
+from sims.reports.models import ReportJob, ReportTemplate, ScheduledReport
 from sims.reports.serializers import (
+    ReportJobRequestSerializer,
     ReportRequestSerializer,
     ReportTemplateSerializer,
     ScheduledReportSerializer,
@@ -35,14 +38,107 @@ class ReportGenerateView(APIView):
         params = serializer.validated_data.get("params", {})
         service = ReportService(request.user)
         report = service.generate(template, params, serializer.validated_data["format"])
-        payload = {
-            "filename": report.filename,
-            "content_type": report.content_type,
-            "content": report.as_base64(),
-        }
+        if serializer.validated_data["delivery"] == "download":
+            # The open handle keeps the spooled file readable after it is unlinked.
+            handle = report.open()
+            report.discard()
+            return FileResponse(
+                handle,
+                as_attachment=True,
+                filename=report.filename,
+                content_type=report.content_type,
+            )
+        try:
+            payload = {
+                "filename": report.filename,
+                "content_type": report.content_type,
+                "content": report.as_base64(),
+            }
+        finally:
+            report.discard()
         return Response(payload, status=status.HTTP_200_OK)
 
 
+class ReportJobCreateView(APIView):
+    """
+    POST /api/reports/jobs/
+
+    Queues a background render of a report template.
+
+    Request body:
+    {
+        "template_slug": "logbook-summary",
+        "format": "pdf" | "xlsx",
+        "params": {"start_date": "2024-01-01"}   (optional)
+    }
+
+    Returns 202 with the queued job. Returns 200 with a completed job when an
+    identical report (same template, parameters, visible data and data version)
+    has already been rendered, or with the caller's matching in-flight job.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        serializer = ReportJobRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        template = get_object_or_404(
+            ReportTemplate, slug=serializer.validated_data["template_slug"]
+        )
+        try:
+            job, queued = request_report(
+                request.user,
+                template,
+                serializer.validated_data["format"],
+                serializer.validated_data.get("params", {}),
+            )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            job_payload(job, request),
+            status=status.HTTP_202_ACCEPTED if queued else status.HTTP_200_OK,
+        )
+
+
+class ReportJobDetailView(APIView):
+    """
+    GET /api/reports/jobs/<id>/
+
+    Status of a report job; includes a signed ``download_url`` once complete.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        try:
+            job = ReportJob.objects.select_related("template").get(pk=pk, user=request.user)
+        except ReportJob.DoesNotExist:
+            return Response({"error": "Report job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job_payload(job, request))
+
+
+class ReportJobDownloadView(APIView):
+    """
+    GET /api/reports/jobs/download/<token>/
+
+    Serves a finished report. The signed token is the credential, so links can
+    be handed to a browser download without an auth header until they expire.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request: Request, token: str):
+        job = job_for_token(token)
+        handle = open_artifact(job) if job else None
+        if handle is None:
+            raise Http404("Report link is invalid or has expired")
+        return FileResponse(
+            handle,
+            as_attachment=True,
+            filename=f"{job.template.slug}.{job.format}",
+        )
+
+
 class ScheduledReportListCreateView(generics.ListCreateAPIView):
     serializer_class = ScheduledReportSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -65,6 +161,9 @@ class ScheduledReportDetailView(generics.RetrieveUpdateAPIView):
 __all__ = [
     "ReportTemplateListView",
     "ReportGenerateView",
+    "ReportJobCreateView",
+    "ReportJobDetailView",
+    "ReportJobDownloadView",
     "ScheduledReportListCreateView",
     "ScheduledReportDetailView",
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, Score
+from .models import Exam, Score, Transcript
 
 
 @admin.register(Exam)
@@ -42,3 +42,10 @@ class ScoreAdmin(admin.ModelAdmin):
         ("Additional", {"fields": ("remarks", "entered_by")}),
         ("Timestamps", {"fields": ("created_at", "updated_at"), "classes": ("collapse",)}),
     )
+
+
+@admin.register(Transcript)
+class TranscriptAdmin(admin.ModelAdmin):
+    list_display = ["student", "updated_at"]
+    search_fields = ["student__first_name", "student__last_name", "student__username"]
+    readonly_fields = ["student", "document", "updated_at"]
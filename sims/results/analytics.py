@@ -0,0 +1,151 @@
+"""Per-exam score analytics, computed from one query and cached until scores change."""
+
+from __future__ import annotations
+
+import statistics
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import GRADE_BOUNDARIES, Exam, Score
+
+# Score and exam saves/deletes and grade-sheet upserts drop the snapshot, so the
+# timeout only bounds drift from raw SQL edits and students changing batch.
+EXAM_STATS_CACHE_SECONDS = 60 * 60
+EXAM_STATS_CACHE_KEY = "results:exam-stats:{exam_id}"
+PERCENTILES = (10, 25, 50, 75, 90)
+PERFORMERS_LIMIT = 5
+UNASSIGNED = "Unassigned"
+
+_PROFILE = "student__student_profile__batch"
+SCORE_COLUMNS = (
+    "student_id",
+    "student__username",
+    "student__first_name",
+    "student__last_name",
+    f"{_PROFILE}__name",
+    f"{_PROFILE}__department__name",
+    "marks_obtained",
+    "percentage",
+    "grade",
+    "is_passing",
+)
+
+
+def _stats_key(exam_id: int) -> str:
+    return EXAM_STATS_CACHE_KEY.format(exam_id=exam_id)
+
+
+def _rate(passed: int, total: int) -> float:
+    return round(passed / total * 100, 2) if total else 0.0
+
+
+def _percentiles(marks: List[float]) -> Dict[str, float]:
+    if len(marks) == 1:
+        return {f"p{pct}": marks[0] for pct in PERCENTILES}
+    cuts = statistics.quantiles(marks, n=100, method="inclusive")
+    return {f"p{pct}": round(cuts[pct - 1], 2) for pct in PERCENTILES}
+
+
+def _pass_rates(groups: Dict[str, List[bool]]) -> List[dict]:
+    return [
+        {
+            "name": name,
+            "total": len(results),
+            "passed": sum(results),
+            "pass_percentage": _rate(sum(results), len(results)),
+        }
+        for name, results in sorted(groups.items())
+    ]
+
+
+def _performer(row: dict) -> dict:
+    return {key: row[key] for key in ("student", "name", "marks_obtained", "percentage", "grade")}
+
+
+def compute_exam_statistics(exam: Exam) -> Optional[dict]:
+    """
+    Full statistics for ``exam``, or ``None`` when it has no scores.
+
+    Every score is read in a single query joined to the student's batch and
+    department; the distribution, percentiles and group pass rates are then
+    derived in Python, which is cheap at exam-sized row counts.
+    """
+    rows = []
+    for values in Score.objects.filter(exam=exam).values_list(*SCORE_COLUMNS):
+        row = dict(zip(SCORE_COLUMNS, values))
+        full_name = f"{row['student__first_name']} {row['student__last_name']}".strip()
+        rows.append(
+            {
+                "student": row["student_id"],
+                "name": full_name or row["student__username"],
+                "batch": row[f"{_PROFILE}__name"] or UNASSIGNED,
+                "department": row[f"{_PROFILE}__department__name"] or UNASSIGNED,
+                "marks_obtained": float(row["marks_obtained"]),
+                "percentage": float(row["percentage"]),
+                "grade": row["grade"],
+                "is_passing": row["is_passing"],
+            }
+        )
+    if not rows:
+        return None
+
+    marks = sorted(row["marks_obtained"] for row in rows)
+    passed = sum(row["is_passing"] for row in rows)
+    grades = Counter(row["grade"] for row in rows)
+    by_department: Dict[str, List[bool]] = defaultdict(list)
+    by_batch: Dict[str, List[bool]] = defaultdict(list)
+    for row in rows:
+        by_department[row["department"]].append(row["is_passing"])
+        by_batch[row["batch"]].append(row["is_passing"])
+    ranked = sorted(rows, key=lambda row: (-row["marks_obtained"], row["name"]))
+
+    return {
+        "total_students": len(rows),
+        "passed": passed,
+        "failed": len(rows) - passed,
+        "pass_percentage": _rate(passed, len(rows)),
+        "average_marks": round(statistics.fmean(marks), 2),
+        "median_marks": round(statistics.median(marks), 2),
+        "std_dev": round(statistics.pstdev(marks), 2),
+        "min_marks": marks[0],
+        "max_marks_obtained": marks[-1],
+        "max_marks": float(exam.max_marks),
+        "passing_marks": float(exam.passing_marks),
+        "percentiles": _percentiles(marks),
+        "grade_distribution": {
+            grade: grades.get(grade, 0) for _, grade in reversed(GRADE_BOUNDARIES)
+        },
+        "pass_rate_by_department": _pass_rates(by_department),
+        "pass_rate_by_batch": _pass_rates(by_batch),
+        "top_performers": [_performer(row) for row in ranked[:PERFORMERS_LIMIT]],
+        "bottom_performers": [_performer(row) for row in ranked[::-1][:PERFORMERS_LIMIT]],
+        "generated_at": timezone.now().isoformat(),
+    }
+
+
+def exam_statistics(exam: Exam) -> Optional[dict]:
+    """Cached :func:`compute_exam_statistics` snapshot for ``exam``."""
+
+    key = _stats_key(exam.pk)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = compute_exam_statistics(exam)
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, EXAM_STATS_CACHE_SECONDS)
+    return snapshot
+
+
+def invalidate_exam_statistics(exam_ids: Iterable[int]) -> None:
+    cache.delete_many([_stats_key(pk) for pk in exam_ids])
+
+
+__all__ = [
+    "EXAM_STATS_CACHE_SECONDS",
+    "compute_exam_statistics",
+    "exam_statistics",
+    "invalidate_exam_statistics",
+]
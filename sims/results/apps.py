@@ -5,3 +5,7 @@ class ResultsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sims.results"
     verbose_name = "Results & Exams"
+
+    def ready(self):
+        # Drop exam statistics and rebuild transcripts when scores change.
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+"""Attendance eligibility for exam scores, resolved for many students at once."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Tuple
+
+from sims.attendance.eligibility import get_attendance_threshold, latest_eligibility
+
+
+class ExamEligibilityResolver:
+    """
+    Eligibility of an exam's students, from one ``EligibilitySummary`` query.
+
+    Students without a summary on or before the exam date count as eligible,
+    as do all students of exams that do not require eligibility.
+    """
+
+    def __init__(self, exam, student_ids: Iterable[int]):
+        self.exam = exam
+        self._latest: Dict[int, Tuple[bool, float]] = {}
+        if exam.requires_eligibility:
+            self._latest = latest_eligibility(set(student_ids), exam.date)
+
+    def resolve(self, student_id: int) -> Tuple[bool, str]:
+        """``(is_eligible, reason)`` for one student."""
+
+        summary = self._latest.get(student_id)
+        if summary is None or summary[0]:
+            return True, ""
+        return False, f"Attendance below {get_attendance_threshold()}% ({summary[1]}%)"
+
+    def apply(self, score) -> None:
+        """Set ``is_eligible``/``ineligibility_reason`` on an unsaved score."""
+
+        score.is_eligible, score.ineligibility_reason = self.resolve(score.student_id)
+
+
+__all__ = ["ExamEligibilityResolver"]
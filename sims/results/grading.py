@@ -0,0 +1,135 @@
+"""Whole-exam grade-sheet entry."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .analytics import invalidate_exam_statistics
+from .eligibility import ExamEligibilityResolver
+from .models import Score, grade_for
+from .transcripts import schedule_transcript_rebuild
+
+User = get_user_model()
+
+SCORE_UPSERT_FIELDS = [
+    "marks_obtained",
+    "percentage",
+    "grade",
+    "is_passing",
+    "is_eligible",
+    "ineligibility_reason",
+    "entered_by",
+    "updated_at",
+]
+
+
+@dataclass
+class GradeSheetResult:
+    created: int = 0
+    updated: int = 0
+    row_errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.row_errors
+
+    @property
+    def errors(self) -> List[str]:
+        return [f"Row {row_num}: {message}" for row_num, message in sorted(self.row_errors)]
+
+
+def _parse_marks(raw, max_marks: Decimal) -> Decimal:
+    try:
+        marks = Decimal(str(raw).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid marks '{raw}'")
+    if not marks.is_finite() or marks < 0 or marks > max_marks:
+        raise ValueError(f"Marks must be between 0 and {max_marks}")
+    if marks.as_tuple().exponent < -2:
+        raise ValueError("Marks can have at most 2 decimal places")
+    return marks
+
+
+def _parse_rows(exam, rows: Iterable[dict], errors: List[Tuple[int, str]]) -> Dict[int, dict]:
+    """Validate a sheet in Python; returns ``{student_id: row}``."""
+
+    parsed: Dict[int, dict] = {}
+    for row_num, row in enumerate(rows, start=1):
+        raw_student = str(row.get("student", "")).strip()
+        try:
+            student_id = int(raw_student)
+        except ValueError:
+            errors.append((row_num, f"Invalid student '{raw_student}'"))
+            continue
+        try:
+            marks = _parse_marks(row.get("marks_obtained", ""), exam.max_marks)
+        except ValueError as exc:
+            errors.append((row_num, str(exc)))
+            continue
+        if student_id in parsed:
+            errors.append((row_num, f"Student {student_id} appears more than once"))
+            continue
+        parsed[student_id] = {"row_num": row_num, "marks": marks, "remarks": row.get("remarks")}
+    return parsed
+
+
+def enter_grade_sheet(exam, rows: Iterable[dict], entered_by) -> GradeSheetResult:
+    """
+    Validate and upsert a whole exam's marks; all-or-nothing.
+
+    Rows carry ``student`` (user id), ``marks_obtained`` and optional
+    ``remarks``. Students, existing scores and eligibility are each loaded with
+    one query, and every score is written by a single upsert on
+    ``(exam, student)``.
+    """
+    result = GradeSheetResult()
+    parsed = _parse_rows(exam, rows, result.row_errors)
+
+    known = set(User.objects.filter(pk__in=parsed, role="pg").values_list("pk", flat=True))
+    for student_id, row in parsed.items():
+        if student_id not in known:
+            result.row_errors.append((row["row_num"], f"Student with ID {student_id} is not a PG"))
+    if result.row_errors or not parsed:
+        return result
+
+    resolver = ExamEligibilityResolver(exam, parsed)
+    with_remarks = any(row["remarks"] is not None for row in parsed.values())
+    scores = []
+    for student_id, row in parsed.items():
+        percentage = exam.calculate_percentage(row["marks"])
+        score = Score(
+            exam=exam,
+            student_id=student_id,
+            marks_obtained=row["marks"],
+            percentage=percentage,
+            grade=grade_for(percentage),
+            is_passing=exam.is_passing(row["marks"]),
+            remarks=row["remarks"] or "",
+            entered_by=entered_by,
+        )
+        resolver.apply(score)
+        scores.append(score)
+
+    update_fields = SCORE_UPSERT_FIELDS + (["remarks"] if with_remarks else [])
+    with transaction.atomic():
+        existing = Score.objects.filter(exam=exam, student_id__in=parsed).count()
+        Score.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=["exam", "student"],
+            update_fields=update_fields,
+        )
+    # The upsert bypasses Score signals.
+    invalidate_exam_statistics([exam.pk])
+    schedule_transcript_rebuild(parsed)
+    result.updated = existing
+    result.created = len(scores) - existing
+    return result
+
+
+__all__ = ["GradeSheetResult", "enter_grade_sheet"]
@@ -0,0 +1,35 @@
+"""Management command to rebuild the materialised student transcripts."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from sims.results.models import Score
+from sims.results.transcripts import rebuild_transcripts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored transcript document of every student with scores"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Students rebuilt per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        ids = Score.objects.order_by("student_id").values_list("student_id", flat=True).distinct()
+
+        rebuilt = 0
+        last_pk = 0
+        while True:
+            batch = list(ids.filter(student_id__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            rebuilt += rebuild_transcripts(batch)
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt transcripts for {rebuilt} students"))
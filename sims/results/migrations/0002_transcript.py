@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('results', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(help_text='Student this transcript summarises', limit_choices_to={'role': 'pg'}, on_delete=django.db.models.deletion.CASCADE, related_name='transcript', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transcript',
+                'verbose_name_plural': 'Transcripts',
+            },
+        ),
+    ]
@@ -4,8 +4,11 @@ Models for Results and Exams in SIMS.
 This module defines:
 - Exam: Examination/assessment records
 - Score: Individual student scores for exams
+- Transcript: Materialised per-student results summary
 """
 
+from bisect import bisect_right
+
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -135,6 +138,25 @@ class Exam(models.Model):
         return 0.0
 
 
+# (lowest percentage, grade), ascending; shared by Score.save and grade sheets.
+GRADE_BOUNDARIES = (
+    (0, "F"),
+    (40, "C"),
+    (50, "C+"),
+    (60, "B"),
+    (70, "B+"),
+    (80, "A"),
+    (90, "A+"),
+)
+_GRADE_LOWER_BOUNDS = [bound for bound, _ in GRADE_BOUNDARIES]
+
+
+def grade_for(percentage) -> str:
+    """Letter grade for a percentage, from ``GRADE_BOUNDARIES``."""
+    index = bisect_right(_GRADE_LOWER_BOUNDS, percentage) - 1
+    return GRADE_BOUNDARIES[max(index, 0)][1]
+
+
 class Score(models.Model):
     """Individual student score for an exam."""
 
@@ -239,20 +261,7 @@ class Score(models.Model):
         self.is_passing = self.exam.is_passing(self.marks_obtained)
 
         # Auto-assign grade based on percentage
-        if self.percentage >= 90:
-            self.grade = "A+"
-        elif self.percentage >= 80:
-            self.grade = "A"
-        elif self.percentage >= 70:
-            self.grade = "B+"
-        elif self.percentage >= 60:
-            self.grade = "B"
-        elif self.percentage >= 50:
-            self.grade = "C+"
-        elif self.percentage >= 40:
-            self.grade = "C"
-        else:
-            self.grade = "F"
+        self.grade = grade_for(self.percentage)
 
         super().save(*args, **kwargs)
 
@@ -261,29 +270,33 @@ class Score(models.Model):
         Check if student is eligible based on attendance.
         Returns tuple (is_eligible, reason).
         """
-        if not self.exam.requires_eligibility:
-            return True, ""
-
-        # Check attendance eligibility from attendance app
-        from sims.attendance.models import EligibilitySummary
-        from django.conf import settings
-
-        threshold = getattr(settings, "ATTENDANCE_THRESHOLD", 75.0)
-
-        # Find the most recent eligibility summary for this student
-        eligibility = (
-            EligibilitySummary.objects.filter(
-                user=self.student,
-                end_date__lte=self.exam.date,
-            )
-            .order_by("-end_date")
-            .first()
-        )
-
-        if eligibility and eligibility.is_eligible:
-            return True, ""
-        elif eligibility:
-            return False, f"Attendance below {threshold}% ({eligibility.percentage_present}%)"
-        else:
-            # No eligibility record found, assume eligible
-            return True, ""
+        from sims.results.eligibility import ExamEligibilityResolver
+
+        return ExamEligibilityResolver(self.exam, [self.student_id]).resolve(self.student_id)
+
+
+class Transcript(models.Model):
+    """
+    Materialised results summary for one student.
+
+    ``document`` is rebuilt by ``sims.results.transcripts`` whenever one of the
+    student's scores (or an exam they sat) changes, so transcript reads never
+    rescan the scores table.
+    """
+
+    student = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transcript",
+        limit_choices_to={"role": "pg"},
+        help_text="Student this transcript summarises",
+    )
+    document = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Transcript"
+        verbose_name_plural = "Transcripts"
+
+    def __str__(self):
+        return f"Transcript - {self.student}"
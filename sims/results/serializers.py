@@ -6,6 +6,10 @@ class ExamSerializer(serializers.ModelSerializer):
     conducted_by_name = serializers.CharField(source="conducted_by.get_full_name", read_only=True)
     rotation_name = serializers.CharField(source="rotation.name", read_only=True)
     total_scores = serializers.IntegerField(read_only=True)
+    passed_scores = serializers.IntegerField(read_only=True)
+    average_marks = serializers.DecimalField(
+        max_digits=6, decimal_places=2, read_only=True, allow_null=True
+    )
 
     class Meta:
         model = Exam
@@ -28,10 +32,18 @@ class ExamSerializer(serializers.ModelSerializer):
             "instructions",
             "remarks",
             "total_scores",
+            "passed_scores",
+            "average_marks",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["created_at", "updated_at", "total_scores"]
+        read_only_fields = [
+            "created_at",
+            "updated_at",
+            "total_scores",
+            "passed_scores",
+            "average_marks",
+        ]
 
     def validate(self, data):
         """Validate exam data."""
@@ -74,13 +86,12 @@ class ScoreSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["percentage", "grade", "is_passing", "created_at", "updated_at"]
 
-    def validate_marks_obtained(self, value):
+    def validate(self, data):
         """Validate marks are within exam max marks."""
-        exam = self.initial_data.get("exam")
-        if exam:
-            exam_obj = Exam.objects.get(pk=exam)
-            if value > exam_obj.max_marks:
-                raise serializers.ValidationError(
-                    f"Marks cannot exceed maximum marks ({exam_obj.max_marks})"
-                )
-        return value
+        exam = data.get("exam") or getattr(self.instance, "exam", None)
+        marks = data.get("marks_obtained")
+        if exam is not None and marks is not None and marks > exam.max_marks:
+            raise serializers.ValidationError(
+                {"marks_obtained": f"Marks cannot exceed maximum marks ({exam.max_marks})"}
+            )
+        return data
@@ -0,0 +1,27 @@
+"""Signal handlers for the results app."""
+
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sims.results.analytics import invalidate_exam_statistics
+from sims.results.models import Exam, Score
+from sims.results.transcripts import schedule_transcript_rebuild
+
+
+@receiver(post_save, sender=Score)
+@receiver(post_delete, sender=Score)
+def score_changed(sender, instance, **kwargs) -> None:
+    invalidate_exam_statistics([instance.exam_id])
+    schedule_transcript_rebuild([instance.student_id])
+
+
+@receiver(post_save, sender=Exam)
+def exam_changed(sender, instance, created, **kwargs) -> None:
+    # Pass marks, maximum marks and exam details feed both documents too.
+    if not created:
+        invalidate_exam_statistics([instance.pk])
+        schedule_transcript_rebuild(
+            Score.objects.filter(exam=instance).values_list("student_id", flat=True)
+        )
@@ -1 +1,529 @@
-# Results app tests will be added here
+"""Tests for exams, scores and exam eligibility."""
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from sims.academics.models import Batch, Department, StudentProfile
+from sims.attendance.eligibility import get_attendance_threshold
+from sims.attendance.models import EligibilitySummary
+from sims.results.analytics import exam_statistics
+from sims.results.eligibility import ExamEligibilityResolver
+from sims.results.models import Exam, Score, Transcript, grade_for
+from sims.results.transcripts import student_transcript
+from sims.users.models import User
+
+
+def _summary(user, end_day, eligible, percentage):
+    return EligibilitySummary(
+        user=user,
+        period="monthly",
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 3, end_day),
+        percentage_present=percentage,
+        is_eligible=eligible,
+    )
+
+
+class ExamEligibilityTests(TestCase):
+    """Tests for resolving attendance eligibility on exam scores."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="testpass", role="admin", email="admin@example.com"
+        )
+        self.students = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(4)
+        )
+        self.exam = Exam.objects.create(
+            title="Midterm",
+            exam_type="midterm",
+            date=date(2024, 3, 20),
+            requires_eligibility=True,
+        )
+        pg0, pg1, pg2, _ = self.students
+        EligibilitySummary.objects.bulk_create(
+            [
+                # pg0 fell below the threshold last month but recovered.
+                _summary(pg0, 1, False, 40.0),
+                _summary(pg0, 15, True, 90.0),
+                _summary(pg1, 15, False, 50.0),
+                # Summaries ending after the exam are ignored.
+                _summary(pg2, 31, False, 10.0),
+            ]
+        )
+        self.client = APIClient()
+
+    def test_resolver_loads_latest_summaries_in_one_query(self):
+        pg0, pg1, pg2, pg3 = self.students
+
+        with self.assertNumQueries(1):
+            resolver = ExamEligibilityResolver(self.exam, [s.pk for s in self.students])
+            results = {student.pk: resolver.resolve(student.pk) for student in self.students}
+
+        self.assertEqual(results[pg0.pk], (True, ""))
+        self.assertEqual(results[pg1.pk], (False, "Attendance below 75.0% (50.0%)"))
+        self.assertEqual(results[pg2.pk], (True, ""))
+        self.assertEqual(results[pg3.pk], (True, ""))
+
+    def test_exams_without_eligibility_skip_the_lookup(self):
+        self.exam.requires_eligibility = False
+
+        with self.assertNumQueries(0):
+            resolver = ExamEligibilityResolver(self.exam, [self.students[1].pk])
+            self.assertEqual(resolver.resolve(self.students[1].pk), (True, ""))
+
+    def test_threshold_is_cached_and_follows_setting_changes(self):
+        self.assertEqual(get_attendance_threshold(), 75.0)
+        with self.settings(ATTENDANCE_THRESHOLD=80.0):
+            self.assertEqual(get_attendance_threshold(), 80.0)
+            score = Score(exam=self.exam, student=self.students[1], marks_obtained=10)
+            self.assertEqual(score.check_eligibility(), (False, "Attendance below 80.0% (50.0%)"))
+        self.assertEqual(get_attendance_threshold(), 75.0)
+
+    def test_score_entry_is_a_single_insert_with_eligibility(self):
+        self.client.force_authenticate(self.admin)
+        url = reverse("score-list")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url,
+                {"exam": self.exam.pk, "student": self.students[1].pk, "marks_obtained": "55"},
+            )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(("INSERT", "UPDATE")) and "results_score" in query["sql"]
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith("INSERT"))
+        score = Score.objects.get(pk=response.data["id"])
+        self.assertFalse(score.is_eligible)
+        self.assertEqual(score.ineligibility_reason, "Attendance below 75.0% (50.0%)")
+        self.assertTrue(score.is_passing)
+        self.assertEqual(score.grade, "C+")
+
+
+class GradeSheetTests(TestCase):
+    """Tests for whole-exam grade-sheet entry."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="testpass", role="admin", email="admin@example.com"
+        )
+        self.students = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(30)
+        )
+        self.exam = Exam.objects.create(
+            title="Final",
+            exam_type="final",
+            date=date(2024, 3, 20),
+            requires_eligibility=True,
+        )
+        EligibilitySummary.objects.create(
+            user=self.students[0],
+            period="monthly",
+            start_date=date(2024, 2, 1),
+            end_date=date(2024, 3, 1),
+            percentage_present=50.0,
+            is_eligible=False,
+        )
+        self.url = reverse("exam-grade-sheet", args=[self.exam.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_grade_for_uses_lower_bounds(self):
+        self.assertEqual(grade_for(Decimal("0")), "F")
+        self.assertEqual(grade_for(Decimal("39.99")), "F")
+        self.assertEqual(grade_for(Decimal("40")), "C")
+        self.assertEqual(grade_for(Decimal("69.99")), "B")
+        self.assertEqual(grade_for(Decimal("90")), "A+")
+        self.assertEqual(grade_for(Decimal("100")), "A+")
+
+    def test_json_sheet_is_graded_in_constant_queries(self):
+        rows = [
+            {"student": student.pk, "marks_obtained": str(35 + idx)}
+            for idx, student in enumerate(self.students)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"scores": rows}, format="json")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {"created": 30, "updated": 0})
+        self.assertLessEqual(len(queries), 10)
+        first = Score.objects.get(exam=self.exam, student=self.students[0])
+        self.assertEqual((first.grade, first.is_passing), ("F", False))
+        self.assertFalse(first.is_eligible)
+        self.assertEqual(first.entered_by, self.admin)
+        last = Score.objects.get(exam=self.exam, student=self.students[-1])
+        self.assertEqual((last.percentage, last.grade, last.is_passing), (64, "B", True))
+
+    def test_csv_sheet_updates_existing_scores(self):
+        Score.objects.create(exam=self.exam, student=self.students[1], marks_obtained=20)
+        upload = SimpleUploadedFile(
+            "marks.csv",
+            (
+                "student,marks_obtained,remarks\n"
+                f"{self.students[1].pk},85,Re-marked\n"
+                f"{self.students[2].pk},55.5,\n"
+            ).encode(),
+            content_type="text/csv",
+        )
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {"created": 1, "updated": 1})
+        remarked = Score.objects.get(exam=self.exam, student=self.students[1])
+        self.assertEqual((remarked.marks_obtained, remarked.grade), (85, "A"))
+        self.assertEqual(remarked.remarks, "Re-marked")
+        self.assertEqual(Score.objects.filter(exam=self.exam).count(), 2)
+
+    def test_invalid_rows_reject_the_whole_sheet(self):
+        rows = [
+            {"student": self.students[0].pk, "marks_obtained": "50"},
+            {"student": self.students[1].pk, "marks_obtained": "120"},
+            {"student": self.admin.pk, "marks_obtained": "60"},
+            {"student": self.students[0].pk, "marks_obtained": "70"},
+            {"student": "abc", "marks_obtained": "10"},
+        ]
+
+        response = self.client.post(self.url, {"scores": rows}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                "Row 2: Marks must be between 0 and 100.00",
+                f"Row 3: Student with ID {self.admin.pk} is not a PG",
+                f"Row 4: Student {self.students[0].pk} appears more than once",
+                "Row 5: Invalid student 'abc'",
+            ],
+        )
+        self.assertFalse(Score.objects.exists())
+
+    def test_pg_cannot_enter_grade_sheets(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.post(self.url, {"scores": []}, format="json")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ResultsQueryCountTests(TestCase):
+    """Listing endpoints must cost the same number of queries for any page size."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="testpass", role="admin", email="admin@example.com"
+        )
+        department = Department.objects.create(name="Surgery", code="SURG")
+        self.batch = Batch.objects.create(
+            name="2024 Batch",
+            program="mbbs",
+            department=department,
+            start_date=date(2024, 1, 1),
+            end_date=date(2028, 12, 31),
+        )
+        self.created = 0
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _add_exams(self, count, students_per_exam=3):
+        for _ in range(count):
+            self.created += 1
+            students = User.objects.bulk_create(
+                User(
+                    username=f"pg{self.created}-{idx}",
+                    role="pg",
+                    specialty="surgery",
+                    year="1",
+                )
+                for idx in range(students_per_exam)
+            )
+            StudentProfile.objects.bulk_create(
+                StudentProfile(
+                    user=student,
+                    batch=self.batch,
+                    roll_number=f"R{student.pk}",
+                    admission_date=date(2024, 1, 1),
+                )
+                for student in students
+            )
+            exam = Exam.objects.create(
+                title=f"Exam {self.created}",
+                exam_type="midterm",
+                date=date(2024, 3, 20),
+                conducted_by=self.admin,
+            )
+            Score.objects.bulk_create(
+                Score(
+                    exam=exam,
+                    student=student,
+                    marks_obtained=30 + idx * 20,
+                    is_passing=idx > 0,
+                    entered_by=self.admin,
+                )
+                for idx, student in enumerate(students)
+            )
+        return exam
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def assertConstantQueries(self, url, grow):
+        """``url`` costs the same queries before and after ``grow()`` adds rows."""
+        small, _ = self._count_queries(url)
+        grow()
+        large, data = self._count_queries(url)
+        self.assertEqual(small, large)
+        return data
+
+    def test_exam_list_is_annotated(self):
+        self._add_exams(2)
+
+        data = self.assertConstantQueries(reverse("exam-list"), lambda: self._add_exams(8))
+
+        results = data["results"]
+        self.assertEqual(len(results), 10)
+        exam = results[0]
+        self.assertEqual(exam["total_scores"], 3)
+        self.assertEqual(exam["passed_scores"], 2)
+        self.assertEqual(exam["average_marks"], "50.00")
+        self.assertEqual(exam["conducted_by_name"], self.admin.get_full_name())
+
+    def test_score_list_selects_student_profiles(self):
+        self._add_exams(2)
+
+        data = self.assertConstantQueries(reverse("score-list"), lambda: self._add_exams(5))
+
+        results = data["results"]
+        self.assertEqual(len(results), 21)
+        self.assertTrue(all(row["student_roll"].startswith("R") for row in results))
+
+    def test_exam_scores_action_selects_related(self):
+        exam = self._add_exams(1, students_per_exam=2)
+        url = reverse("exam-scores", args=[exam.pk])
+
+        data = self.assertConstantQueries(
+            url,
+            lambda: Score.objects.bulk_create(
+                Score(exam=exam, student=student, marks_obtained=60)
+                for student in User.objects.bulk_create(
+                    User(username=f"late{idx}", role="pg", specialty="surgery", year="1")
+                    for idx in range(5)
+                )
+            ),
+        )
+
+        self.assertEqual(len(data), 7)
+
+
+class ExamStatisticsTests(TestCase):
+    """Tests for the exam analytics snapshot and its cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username="admin", password="testpass", role="admin", email="admin@example.com"
+        )
+        surgery = Department.objects.create(name="Surgery", code="SURG")
+        medicine = Department.objects.create(name="Medicine", code="MED")
+        batches = [
+            Batch.objects.create(
+                name=f"{department.code} 2024",
+                program="ms",
+                department=department,
+                start_date=date(2024, 1, 1),
+                end_date=date(2027, 12, 31),
+            )
+            for department in (surgery, medicine)
+        ]
+        self.students = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(6)
+        )
+        # pg0-pg2 in surgery, pg3-pg4 in medicine, pg5 without a profile.
+        StudentProfile.objects.bulk_create(
+            StudentProfile(
+                user=student,
+                batch=batches[idx // 3],
+                roll_number=f"R{idx}",
+                admission_date=date(2024, 1, 1),
+            )
+            for idx, student in enumerate(self.students[:5])
+        )
+        self.exam = Exam.objects.create(title="Final", exam_type="final", date=date(2024, 3, 20))
+        for student, marks in zip(self.students, [95, 82, 35, 60, 45, 20]):
+            Score.objects.create(exam=self.exam, student=student, marks_obtained=marks)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_snapshot_covers_distribution_and_groups(self):
+        with self.assertNumQueries(1):
+            stats = exam_statistics(self.exam)
+
+        self.assertEqual((stats["total_students"], stats["passed"], stats["failed"]), (6, 4, 2))
+        self.assertEqual(stats["pass_percentage"], 66.67)
+        self.assertEqual(stats["average_marks"], 56.17)
+        self.assertEqual(stats["median_marks"], 52.5)
+        self.assertEqual(stats["std_dev"], 26.05)
+        self.assertEqual(stats["percentiles"]["p50"], 52.5)
+        self.assertEqual(stats["percentiles"]["p25"], 37.5)
+        self.assertEqual(
+            stats["grade_distribution"],
+            {"A+": 1, "A": 1, "B+": 0, "B": 1, "C+": 0, "C": 1, "F": 2},
+        )
+        self.assertEqual(
+            stats["pass_rate_by_department"],
+            [
+                {"name": "Medicine", "total": 2, "passed": 2, "pass_percentage": 100.0},
+                {"name": "Surgery", "total": 3, "passed": 2, "pass_percentage": 66.67},
+                {"name": "Unassigned", "total": 1, "passed": 0, "pass_percentage": 0.0},
+            ],
+        )
+        self.assertEqual([row["name"] for row in stats["pass_rate_by_batch"]][0], "MED 2024")
+        self.assertEqual(stats["top_performers"][0]["student"], self.students[0].pk)
+        self.assertEqual(stats["bottom_performers"][0]["student"], self.students[5].pk)
+
+    def test_snapshot_is_cached_until_scores_change(self):
+        first = exam_statistics(self.exam)
+        with self.assertNumQueries(0):
+            self.assertEqual(exam_statistics(self.exam), first)
+
+        score = Score.objects.get(exam=self.exam, student=self.students[5])
+        score.marks_obtained = 75
+        score.save()
+
+        self.assertEqual(exam_statistics(self.exam)["passed"], 5)
+
+    def test_grade_sheet_upsert_invalidates_snapshot(self):
+        exam_statistics(self.exam)
+
+        response = self.client.post(
+            reverse("exam-grade-sheet", args=[self.exam.pk]),
+            {"scores": [{"student": self.students[2].pk, "marks_obtained": "90"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(exam_statistics(self.exam)["passed"], 5)
+
+    def test_statistics_endpoint(self):
+        url = reverse("exam-statistics", args=[self.exam.pk])
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_students"], 6)
+        self.assertIn("grade_distribution", response.data)
+
+        empty = Exam.objects.create(title="Quiz", exam_type="quiz", date=date(2024, 4, 1))
+        response = self.client.get(reverse("exam-statistics", args=[empty.pk]))
+        self.assertEqual(response.data, {"message": "No scores recorded yet"})
+
+
+class TranscriptTests(TestCase):
+    """Tests for the materialised per-student transcript."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username="admin", password="testpass", role="admin", email="admin@example.com"
+        )
+        self.student, self.other = User.objects.bulk_create(
+            User(username=f"pg{idx}", role="pg", specialty="surgery", year="1") for idx in range(2)
+        )
+        self.exams = [
+            Exam.objects.create(
+                title=f"Exam {idx}",
+                exam_type="quiz" if idx % 2 else "theory",
+                date=date(2024, 1 + idx, 1),
+            )
+            for idx in range(6)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            # Older exams scored lower, so the trend is improving.
+            for exam, marks in zip(self.exams, [30, 40, 50, 70, 80, 90]):
+                Score.objects.create(exam=exam, student=self.student, marks_obtained=marks)
+        self.client = APIClient()
+
+    def test_document_is_materialised_when_scores_change(self):
+        document = Transcript.objects.get(student=self.student).document
+
+        self.assertEqual(
+            (document["exams_taken"], document["passed"], document["failed"]), (6, 5, 1)
+        )
+        self.assertEqual(document["cumulative_percentage"], 60.0)
+        self.assertEqual(
+            document["by_exam_type"]["quiz"],
+            {"exams": 3, "passed": 3, "average_percentage": 66.67},
+        )
+        self.assertEqual(
+            document["trend"],
+            {"direction": "improving", "recent_average": 80.0, "previous_average": 40.0},
+        )
+        titles = [row["exam_title"] for row in document["scores"]]
+        self.assertEqual(titles[:2], ["Exam 5", "Exam 4"])
+
+        score = Score.objects.get(exam=self.exams[0], student=self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            score.delete()
+
+        self.assertEqual(Transcript.objects.get(student=self.student).document["exams_taken"], 5)
+
+    def test_reads_do_not_touch_scores(self):
+        with self.assertNumQueries(0):
+            student_transcript(self.student.pk)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            student_transcript(self.student.pk)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("results_score", queries[0]["sql"])
+
+    def test_grade_sheet_rebuilds_transcripts(self):
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("exam-grade-sheet", args=[self.exams[0].pk]),
+                {"scores": [{"student": self.other.pk, "marks_obtained": "45"}]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(student_transcript(self.other.pk)["exams_taken"], 1)
+
+    def test_my_scores_and_transcript_endpoints(self):
+        self.client.force_authenticate(self.student)
+
+        response = self.client.get(reverse("score-my-scores"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(response.data[0]["marks_obtained"], "90.00")
+        # my_scores keeps the ScoreSerializer contract; the transcript adds the summaries.
+        self.assertEqual(response.data[0]["student"], self.student.pk)
+        self.assertIn("student_name", response.data[0])
+        self.assertIn("updated_at", response.data[0])
+
+        response = self.client.get(reverse("score-transcript"))
+        self.assertEqual(response.data["exams_taken"], 6)
+
+        self.client.force_authenticate(self.admin)
+        url = reverse("score-transcript")
+        self.assertEqual(self.client.get(url, {"student": self.other.pk}).data["exams_taken"], 0)
+        self.assertEqual(self.client.get(url, {"student": self.admin.pk}).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 400)
@@ -0,0 +1,202 @@
+"""Per-student transcript documents, rebuilt whenever a student's scores change."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Score, Transcript
+
+User = get_user_model()
+
+# Rebuilds overwrite the cached copy, so the timeout only bounds memory use.
+TRANSCRIPT_CACHE_SECONDS = 60 * 60
+TRANSCRIPT_CACHE_KEY = "results:transcript:{student_id}"
+# The trend compares the latest TREND_WINDOW exams with the TREND_WINDOW before
+# them; averages within TREND_TOLERANCE percentage points count as steady.
+TREND_WINDOW = 3
+TREND_TOLERANCE = 2.0
+
+SCORE_COLUMNS = (
+    "student_id",
+    "id",
+    "exam_id",
+    "exam__title",
+    "exam__exam_type",
+    "exam__date",
+    "exam__rotation_id",
+    "exam__rotation__department__name",
+    "exam__max_marks",
+    "marks_obtained",
+    "percentage",
+    "grade",
+    "is_passing",
+    "is_eligible",
+    "ineligibility_reason",
+    "remarks",
+)
+
+
+def _transcript_key(student_id: int) -> str:
+    return TRANSCRIPT_CACHE_KEY.format(student_id=student_id)
+
+
+def _average(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _group(rows: List[dict]) -> dict:
+    return {
+        "exams": len(rows),
+        "passed": sum(row["is_passing"] for row in rows),
+        "average_percentage": _average([float(row["percentage"] or 0) for row in rows]),
+    }
+
+
+def _trend(rows: List[dict]) -> dict:
+    # rows are newest first.
+    percentages = [float(row["percentage"] or 0) for row in rows]
+    recent = _average(percentages[:TREND_WINDOW])
+    previous = _average(percentages[TREND_WINDOW : 2 * TREND_WINDOW])
+    direction = None
+    if recent is not None and previous is not None:
+        if recent - previous > TREND_TOLERANCE:
+            direction = "improving"
+        elif previous - recent > TREND_TOLERANCE:
+            direction = "declining"
+        else:
+            direction = "steady"
+    return {"direction": direction, "recent_average": recent, "previous_average": previous}
+
+
+def build_transcript(student_id: int, rows: List[dict]) -> dict:
+    """Transcript document for ``rows``, one dict of ``SCORE_COLUMNS`` per score, newest first."""
+
+    by_type: Dict[str, List[dict]] = defaultdict(list)
+    by_rotation: Dict[int, List[dict]] = defaultdict(list)
+    for row in rows:
+        by_type[row["exam__exam_type"]].append(row)
+        if row["exam__rotation_id"] is not None:
+            by_rotation[row["exam__rotation_id"]].append(row)
+
+    total_max = sum(row["exam__max_marks"] for row in rows)
+    passed = sum(row["is_passing"] for row in rows)
+    return {
+        "student": student_id,
+        "exams_taken": len(rows),
+        "passed": passed,
+        "failed": len(rows) - passed,
+        "cumulative_percentage": (
+            round(float(sum(row["marks_obtained"] for row in rows) / total_max * 100), 2)
+            if total_max
+            else None
+        ),
+        "by_exam_type": {exam_type: _group(group) for exam_type, group in by_type.items()},
+        "by_rotation": [
+            {
+                "rotation": rotation_id,
+                "department": group[0]["exam__rotation__department__name"],
+                **_group(group),
+            }
+            for rotation_id, group in by_rotation.items()
+        ],
+        "trend": _trend(rows),
+        "scores": [
+            {
+                "id": row["id"],
+                "exam": row["exam_id"],
+                "exam_title": row["exam__title"],
+                "exam_type": row["exam__exam_type"],
+                "exam_date": row["exam__date"].isoformat(),
+                "rotation": row["exam__rotation_id"],
+                "marks_obtained": str(row["marks_obtained"]),
+                "max_marks": str(row["exam__max_marks"]),
+                "percentage": None if row["percentage"] is None else str(row["percentage"]),
+                "grade": row["grade"],
+                "is_passing": row["is_passing"],
+                "is_eligible": row["is_eligible"],
+                "ineligibility_reason": row["ineligibility_reason"],
+                "remarks": row["remarks"],
+            }
+            for row in rows
+        ],
+        "updated_at": timezone.now().isoformat(),
+    }
+
+
+def _rebuild(student_ids: Iterable[int]) -> Dict[int, dict]:
+    wanted = set(student_ids)
+    existing = set(User.objects.filter(pk__in=wanted).values_list("pk", flat=True))
+    cache.delete_many([_transcript_key(pk) for pk in wanted - existing])
+    if not existing:
+        return {}
+
+    rows: Dict[int, List[dict]] = defaultdict(list)
+    scores = (
+        Score.objects.filter(student_id__in=existing)
+        .order_by("-exam__date", "exam__title")
+        .values_list(*SCORE_COLUMNS)
+    )
+    for values in scores:
+        row = dict(zip(SCORE_COLUMNS, values))
+        rows[row["student_id"]].append(row)
+
+    documents = {pk: build_transcript(pk, rows[pk]) for pk in existing}
+    Transcript.objects.bulk_create(
+        [Transcript(student_id=pk, document=document) for pk, document in documents.items()],
+        update_conflicts=True,
+        unique_fields=["student"],
+        update_fields=["document", "updated_at"],
+    )
+    cache.set_many(
+        {_transcript_key(pk): document for pk, document in documents.items()},
+        TRANSCRIPT_CACHE_SECONDS,
+    )
+    return documents
+
+
+def rebuild_transcripts(student_ids: Iterable[int]) -> int:
+    """
+    Rebuild, store and cache the transcripts of ``student_ids``; returns how many.
+
+    All of the students' scores are read in one query and the documents are
+    written with a single upsert. Ids of since-deleted users are dropped.
+    """
+    return len(_rebuild(student_ids))
+
+
+def schedule_transcript_rebuild(student_ids: Iterable[int]) -> None:
+    """Rebuild the transcripts once the current transaction commits."""
+
+    ids = list(student_ids)
+    transaction.on_commit(lambda: rebuild_transcripts(ids))
+
+
+def student_transcript(student_id: int) -> dict:
+    """The student's transcript from the cache, then the stored row, building it if missing."""
+
+    key = _transcript_key(student_id)
+    document = cache.get(key)
+    if document is None:
+        document = (
+            Transcript.objects.filter(student_id=student_id)
+            .values_list("document", flat=True)
+            .first()
+        )
+        if document is None:
+            return _rebuild([student_id]).get(student_id) or build_transcript(student_id, [])
+        cache.set(key, document, TRANSCRIPT_CACHE_SECONDS)
+    return document
+
+
+__all__ = [
+    "build_transcript",
+    "rebuild_transcripts",
+    "schedule_transcript_rebuild",
+    "student_transcript",
+]
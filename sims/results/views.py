@@ -1,15 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import models
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from sims.domain.uploads import iter_upload_rows
+from .analytics import exam_statistics
+from .eligibility import ExamEligibilityResolver
+from .grading import enter_grade_sheet
 from .models import Exam, Score
 from .serializers import ExamSerializer, ScoreSerializer
+from .transcripts import student_transcript
+
+User = get_user_model()
+
+# Every relation ScoreSerializer traverses, so score listings stay O(1) queries.
+SCORE_RELATED = ("exam", "student", "student__student_profile", "entered_by")
 
 
 class ExamViewSet(viewsets.ModelViewSet):
     """ViewSet for Exam CRUD operations."""
 
-    queryset = Exam.objects.all()
+    # Meta.ordering is dropped from aggregate queries, so restate it.
+    queryset = (
+        Exam.objects.select_related("rotation", "conducted_by")
+        .annotate(
+            total_scores=models.Count("scores"),
+            passed_scores=models.Count("scores", filter=models.Q(scores__is_passing=True)),
+            average_marks=models.Avg("scores__marks_obtained"),
+        )
+        .order_by(*Exam._meta.ordering)
+    )
     serializer_class = ExamSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["exam_type", "status", "rotation", "requires_eligibility"]
@@ -20,43 +41,61 @@ class ExamViewSet(viewsets.ModelViewSet):
     def scores(self, request, pk=None):
         """Get all scores for this exam."""
         exam = self.get_object()
-        scores = exam.scores.all()
+        scores = exam.scores.select_related(*SCORE_RELATED)
         serializer = ScoreSerializer(scores, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=["post"], url_path="grade-sheet")
+    def grade_sheet(self, request, pk=None):
+        """
+        Enter a whole exam's marks at once, as JSON ``{"scores": [...]}`` or a
+        CSV/Excel ``file`` with ``student``, ``marks_obtained`` and optional
+        ``remarks`` columns. Nothing is written unless every row is valid.
+        """
+        if request.user.role not in ["admin", "supervisor"]:
+            return Response(
+                {"error": "Only admins and supervisors can enter grade sheets"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        exam = self.get_object()
+
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                rows = iter_upload_rows(upload, required_columns=("student", "marks_obtained"))
+            else:
+                rows = request.data.get("scores")
+                if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+                    return Response(
+                        {"error": "Provide a 'scores' list or a 'file' upload"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+            result = enter_grade_sheet(exam, rows, request.user)
+        except ValidationError as exc:
+            return Response({"error": exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not result.success:
+            return Response({"errors": result.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"created": result.created, "updated": result.updated})
+
     @action(detail=True, methods=["get"])
     def statistics(self, request, pk=None):
-        """Get exam statistics."""
+        """
+        Get exam statistics: pass rate, mean, median, standard deviation,
+        percentiles, grade distribution, pass rates by department and batch, and
+        top/bottom performers. Snapshots are cached until the exam's scores change.
+        """
         exam = self.get_object()
-        scores = exam.scores.all()
-
-        if not scores.exists():
+        snapshot = exam_statistics(exam)
+        if snapshot is None:
             return Response({"message": "No scores recorded yet"})
-
-        total_students = scores.count()
-        passed = scores.filter(is_passing=True).count()
-        failed = total_students - passed
-        average_marks = scores.aggregate(avg=models.Avg("marks_obtained"))["avg"]
-
-        return Response(
-            {
-                "total_students": total_students,
-                "passed": passed,
-                "failed": failed,
-                "pass_percentage": (
-                    round((passed / total_students) * 100, 2) if total_students > 0 else 0
-                ),
-                "average_marks": round(average_marks, 2) if average_marks else 0,
-                "max_marks": exam.max_marks,
-                "passing_marks": exam.passing_marks,
-            }
-        )
+        return Response(snapshot)
 
 
 class ScoreViewSet(viewsets.ModelViewSet):
     """ViewSet for Score CRUD operations."""
 
-    queryset = Score.objects.select_related("exam", "student", "entered_by")
+    queryset = Score.objects.select_related(*SCORE_RELATED)
     serializer_class = ScoreSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["exam", "student", "is_passing", "is_eligible", "grade"]
@@ -78,25 +117,59 @@ class ScoreViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        """Set entered_by to current user and check eligibility."""
-        score = serializer.save(entered_by=self.request.user)
+        """Set entered_by to current user and check eligibility before the insert."""
+        exam = serializer.validated_data["exam"]
+        student = serializer.validated_data["student"]
+        extra = {"entered_by": self.request.user}
 
-        # Check eligibility if required
-        if score.exam.requires_eligibility:
-            is_eligible, reason = score.check_eligibility()
-            score.is_eligible = is_eligible
-            score.ineligibility_reason = reason
-            score.save()
+        if exam.requires_eligibility:
+            is_eligible, reason = ExamEligibilityResolver(exam, [student.pk]).resolve(student.pk)
+            extra.update(is_eligible=is_eligible, ineligibility_reason=reason)
+        serializer.save(**extra)
 
     @action(detail=False, methods=["get"])
     def my_scores(self, request):
-        """Get current user's scores."""
+        """
+        Get current user's scores as full ``ScoreSerializer`` rows.
+
+        The compact per-exam summaries live in the transcript document; see
+        :meth:`transcript`.
+        """
         if request.user.role != "pg":
             return Response(
                 {"error": "Only PG students can access this endpoint"},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        scores = Score.objects.filter(student=request.user)
+        scores = Score.objects.select_related(*SCORE_RELATED).filter(student=request.user)
         serializer = self.get_serializer(scores, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def transcript(self, request):
+        """
+        Get a student's transcript: pass/fail counts, cumulative percentage,
+        breakdowns by exam type and rotation, trend and every score. PG students
+        get their own; supervisors and admins pass ``?student=<id>``.
+        """
+        user = request.user
+        if user.role == "pg":
+            return Response(student_transcript(user.pk))
+
+        students = User.objects.filter(role="pg")
+        if user.role == "supervisor":
+            students = students.filter(supervisor=user)
+        elif user.role != "admin":
+            return Response(
+                {"error": "You do not have permission to view transcripts"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        student_id = request.query_params.get("student")
+        if not student_id or not student_id.isdigit():
+            return Response(
+                {"error": "Provide a numeric 'student' parameter"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not students.filter(pk=student_id).exists():
+            return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(student_transcript(int(student_id)))
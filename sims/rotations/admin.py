@@ -7,6 +7,9 @@ from django.utils.html import format_html
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
+from sims.inbox.models import ReviewInboxItem
+from sims.inbox.services import sync_items
+
 from .models import Department, Hospital, Rotation, RotationEvaluation
 
 
@@ -397,7 +400,10 @@ class RotationAdmin(ImportExportModelAdmin):
             messages.error(request, "You don't have permission to reject rotations.")
             return
 
-        count = queryset.filter(status="pending").update(status="cancelled")
+        pks = list(queryset.filter(status="pending").values_list("pk", flat=True))
+        count = queryset.filter(pk__in=pks, status="pending").update(status="cancelled")
+        # update() sends no signals, so drop the inbox rows explicitly.
+        sync_items(ReviewInboxItem.TYPE_ROTATION, pks)
         messages.success(request, f"Successfully rejected {count} rotations.")
 
     reject_rotations.short_description = "Reject selected rotations"
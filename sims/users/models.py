@@ -259,41 +259,10 @@ class User(AbstractUser):
         if not self.is_supervisor():
             return 0
 
-        count = 0
-        try:
-            # Import here to avoid circular imports
-            from django.apps import apps
-
-            # Check if apps exist before importing
-            if apps.is_installed("sims.certificates"):
-                from sims.certificates.models import Certificate
-
-                for pg in self.get_assigned_pgs():
-                    count += Certificate.objects.filter(pg=pg, status="pending").count()
-
-            if apps.is_installed("sims.rotations"):
-                from sims.rotations.models import Rotation
-
-                for pg in self.get_assigned_pgs():
-                    count += Rotation.objects.filter(pg=pg, status="pending").count()
+        # Import here to avoid circular imports
+        from sims.inbox.services import pending_counts
 
-            if apps.is_installed("sims.logbook"):
-                from sims.logbook.models import LogbookEntry
-
-                for pg in self.get_assigned_pgs():
-                    count += LogbookEntry.objects.filter(pg=pg, status="pending").count()
-
-            if apps.is_installed("sims.cases"):
-                from sims.cases.models import ClinicalCase
-
-                for pg in self.get_assigned_pgs():
-                    count += ClinicalCase.objects.filter(pg=pg, status="pending").count()
-
-        except ImportError:
-            # Handle case where related models don't exist yet
-            pass
-
-        return count
+        return pending_counts(self)["total"]
 
     def get_documents_submitted_count(self):
         """Get count of documents submitted by this PG"""
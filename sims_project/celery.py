@@ -22,16 +22,31 @@ app.autodiscover_tasks()
 
 # Celery Beat schedule for periodic tasks
 app.conf.beat_schedule = {
-    # Example: Generate daily reports at 2 AM
-    "generate-daily-reports": {
-        "task": "sims.reports.tasks.generate_daily_reports",
-        "schedule": crontab(hour=2, minute=0),
+    # Queue scheduled reports whose cron expression has come due
+    "dispatch-scheduled-reports": {
+        "task": "sims.reports.tasks.dispatch_scheduled_reports",
+        "schedule": crontab(),  # every minute, the finest cron resolution
     },
     # Example: Clean up old notifications weekly
     "cleanup-old-notifications": {
         "task": "sims.notifications.tasks.cleanup_old_notifications",
         "schedule": crontab(day_of_week=0, hour=3, minute=0),  # Sunday at 3 AM
     },
+    # Re-enqueue bulk operations left behind by a crashed worker
+    "resume-stalled-bulk-operations": {
+        "task": "sims.bulk.tasks.resume_stalled_bulk_operations",
+        "schedule": crontab(minute="*/10"),
+    },
+    # Move buffered QR/kiosk check-ins into attendance records
+    "flush-attendance-checkins": {
+        "task": "sims.attendance.tasks.flush_checkins",
+        "schedule": 10.0,
+    },
+    # Delete logbook export files once their download links have expired
+    "purge-logbook-exports": {
+        "task": "sims.logbook.tasks.purge_logbook_exports",
+        "schedule": crontab(minute=15),  # hourly
+    },
     # Example: Calculate monthly attendance summaries
     "calculate-monthly-attendance": {
         "task": "sims.attendance.tasks.calculate_monthly_summaries",
@@ -90,6 +90,7 @@ INSTALLED_APPS = [
     "sims.reports",
     "sims.attendance",
     "sims.results",
+    "sims.inbox",
 ]
 
 MIDDLEWARE = [
@@ -278,6 +279,7 @@ REST_FRAMEWORK = {
         "anon": os.environ.get("THROTTLE_ANON_RATE", "100/hour"),
         "user": os.environ.get("THROTTLE_USER_RATE", "1000/hour"),
         "search": os.environ.get("THROTTLE_SEARCH_RATE", "30/min"),
+        "autocomplete": os.environ.get("THROTTLE_AUTOCOMPLETE_RATE", "120/min"),
     },
 }
 
@@ -612,6 +614,34 @@ SIMPLE_JWT = {
 # Attendance eligibility threshold
 ATTENDANCE_THRESHOLD = float(os.environ.get("ATTENDANCE_THRESHOLD", "75.0"))
 
+# QR/kiosk check-in: lifetime of a displayed check-in token, and minutes after a
+# session's start time from which a check-in is recorded as late
+ATTENDANCE_CHECKIN_TOKEN_SECONDS = int(os.environ.get("ATTENDANCE_CHECKIN_TOKEN_SECONDS", "300"))
+ATTENDANCE_LATE_AFTER_MINUTES = int(os.environ.get("ATTENDANCE_LATE_AFTER_MINUTES", "10"))
+
+# Background logbook exports
+LOGBOOK_EXPORT_CHUNK_SIZE = int(os.environ.get("LOGBOOK_EXPORT_CHUNK_SIZE", "500"))
+# Identical export requests inside this window reuse the existing job
+LOGBOOK_EXPORT_DEDUP_SECONDS = int(os.environ.get("LOGBOOK_EXPORT_DEDUP_SECONDS", "300"))
+# Lifetime of signed download links, in seconds
+LOGBOOK_EXPORT_URL_MAX_AGE = int(os.environ.get("LOGBOOK_EXPORT_URL_MAX_AGE", "3600"))
+
+# Background report jobs: lifetime of signed download links, in seconds
+REPORT_DOWNLOAD_URL_MAX_AGE = int(os.environ.get("REPORT_DOWNLOAD_URL_MAX_AGE", "3600"))
+# Scheduled report emails: larger artifacts are linked instead of attached
+REPORT_ATTACHMENT_MAX_BYTES = int(
+    os.environ.get("REPORT_ATTACHMENT_MAX_BYTES", str(5 * 1024 * 1024))
+)
+# Emailed download links outlive API ones; they are built on this absolute base URL
+REPORT_EMAIL_LINK_MAX_AGE = int(os.environ.get("REPORT_EMAIL_LINK_MAX_AGE", str(7 * 24 * 3600)))
+REPORT_LINK_BASE_URL = os.environ.get("REPORT_LINK_BASE_URL", "http://localhost:8000")
+# Messages sent over one SMTP connection before it is reopened
+REPORT_EMAIL_BATCH_SIZE = int(os.environ.get("REPORT_EMAIL_BATCH_SIZE", "50"))
+
+# Background bulk operations: queued/running operations whose checkpoint has not
+# advanced for this many seconds are re-enqueued and resume from it
+BULK_OPERATION_STALE_SECONDS = int(os.environ.get("BULK_OPERATION_STALE_SECONDS", "900"))
+
 # CORS Configuration for frontend - explicit origins only
 # Supports both localhost and VPS deployments
 cors_origins_env = os.environ.get("CORS_ALLOWED_ORIGINS", "")
@@ -95,6 +95,7 @@ urlpatterns = [
     path("api/reports/", include("sims.reports.urls")),
     path("api/logbook/", include("sims.logbook.api_urls")),
     path("api/attendance/", include("sims.attendance.urls")),
+    path("api/inbox/", include("sims.inbox.urls")),
     # New apps
     path("academics/", include("sims.academics.urls")),
     path("results/", include("sims.results.urls")),